@@ -0,0 +1,5 @@
+"""
+Benchmarks für die Auswertemethoden mit synthetischen Schweißnahtprofilen.
+
+Aufruf aus dem Projektordner, z.B.: python -m benchmark.runbenchmark --output bench.json
+"""
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+# Module, die nur NumPy laden dürfen (Auswertekern), und Module, die erst bei Bedarf geladen werden
+CORE_MODULES = ['funcderivation', 'funcevalCM', 'funcevalLSM', 'funcevalIM', 'funcevalangle', 'funcevalprofile']
+HEAVY_MODULES = ['scipy', 'matplotlib', 'pandas']
+
+_SCRIPT = """
+import sys, json, time, importlib
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'time': elapsed, 'heavy': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def funcimporttime(module, repeat=5):
+    """
+    Misst die Importzeit eines Moduls in einem neuen Python-Prozess (wie beim Start eines Arbeitsprozesses).
+
+    Parameters:
+    module (str): Name des Moduls im Projektordner (z.B. 'main').
+    repeat (int): Anzahl der Messungen (Minimum wird verwendet).
+
+    Returns:
+    dict: 'time' in s (ohne Start des Interpreters), 'heavy' (geladene Module aus HEAVY_MODULES) und
+          'error' (None oder Fehlermeldung).
+    """
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    record = {'time': np.nan, 'heavy': [], 'error': None}
+    times = []
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-c', _SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+                                 cwd=folder, capture_output=True, text=True)
+        if process.returncode != 0:
+            record['error'] = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'import failed'
+            return record
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        times.append(result['time'])
+        record['heavy'] = result['heavy']
+    record['time'] = min(times)
+    return record
+
+
+def funcrunimporttime(modules, repeat=5):
+    """
+    Misst die Importzeit mehrerer Module und prüft, dass der Auswertekern keine schweren Module lädt.
+
+    Parameters:
+    modules (list of str): Zu messende Module.
+    repeat (int): Anzahl der Messungen je Modul.
+
+    Returns:
+    dict: 'python', 'numpy' (Importzeit von NumPy als Bezug) und 'modules' mit je Modul dem Ergebnis
+          aus funcimporttime und 'ok' (False bei Fehler oder schweren Modulen in CORE_MODULES).
+    """
+    results = {'python': sys.version.split()[0], 'numpy': funcimporttime('numpy', repeat)['time'], 'modules': {}}
+    for module in modules:
+        record = funcimporttime(module, repeat)
+        record['ok'] = record['error'] is None and not (module in CORE_MODULES and record['heavy'])
+        results['modules'][module] = record
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import time of the toolkit modules in fresh interpreters.')
+    parser.add_argument('--modules', nargs='+', default=CORE_MODULES + ['funcbatch', 'main'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--limit', type=float, default=None,
+                        help='maximum import time of "main" relative to importing numpy alone')
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args(argv)
+
+    results = funcrunimporttime(args.modules, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=1, default=float)
+
+    failed = False
+    print(f"numpy           {results['numpy'] * 1e3:8.1f} ms")
+    for module, record in results['modules'].items():
+        line = f"{module:15s} {record['time'] * 1e3:8.1f} ms"
+        if record['heavy']:
+            line += f"  loads {', '.join(record['heavy'])}"
+        if record['error']:
+            line += f"  {record['error']}"
+        if not record['ok']:
+            line += '  FAILED'
+            failed = True
+        print(line)
+
+    main_time = results['modules'].get('main', {}).get('time', np.nan)
+    if args.limit is not None and main_time > args.limit * results['numpy']:
+        print(f"Import of main takes {main_time / results['numpy']:.1f} x numpy (limit {args.limit:g})")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import subprocess
+import tracemalloc
+import numpy as np
+from loadsettings import loadsettings
+from funcevalCM import funcevalCM
+from funcevalLSM import funcevalLSM
+from funcevalIM import funcevalIM
+from funcevalangle import funcevalangle
+from funcderivation import ProfileContext, funcderivationsettings
+from funccompact import ACCURACY_BUDGET, funccompactcheck, funccompactprofile
+from funcevalprofile import funcevalprofile
+from funcevalincremental import funcincrementalcheck
+from benchmark.weldprofiles import funcweldprofile, funcweldsequence
+
+
+def funcbenchstage(func, repeat):
+    """
+    Misst Laufzeit und Spitzenspeicher einer Auswertestufe.
+
+    Parameters:
+    func (callable): Auszuführende Stufe ohne Argumente.
+    repeat (int): Anzahl der Wiederholungen für die Zeitmessung (Minimum wird verwendet).
+
+    Returns:
+    result: Rückgabewert der Stufe (None bei Fehler).
+    record (dict): 'time' in s, 'peak_memory' in Byte und 'error' (None oder Fehlermeldung).
+    """
+    record = {'time': np.nan, 'peak_memory': np.nan, 'error': None}
+    try:
+        # Speicher in einem eigenen Durchlauf messen, da tracemalloc die Laufzeit verfälscht
+        tracemalloc.start()
+        result = func()
+        record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        record['time'] = min(times)
+    except Exception as error:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        record['error'] = f'{type(error).__name__}: {error}'
+        result = None
+    return result, record
+
+
+def funcbenchcase(profile, truth, settings, repeat=3):
+    """
+    Wertet ein synthetisches Profil mit allen Methoden aus und vergleicht mit den Sollwerten.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    truth (dict): Sollwerte aus funcweldprofile.
+    settings (dict): Einstellungen aus loadsettings.
+    repeat (int): Anzahl der Wiederholungen je Stufe.
+
+    Returns:
+    dict: Je Stufe Laufzeit, Spitzenspeicher, Fehlermeldung und (für Radien und Winkel) Ergebnis und
+          absolute Abweichung zum Sollwert.
+    """
+    stages = {}
+
+    # Ableitungen (für die Methoden aus einem gemeinsamen Kontext)
+    derivations = {funcderivationsettings(settings[key]) for key in ['CM', 'LSM', 'IM', 'Angle']}
+    _, stages['derivation'] = funcbenchstage(
+        lambda: [ProfileContext(profile).derivation(*d) for d in derivations], repeat)
+    context = ProfileContext(profile)
+    for d in derivations:
+        context.derivation(*d)
+
+    radiusresults = {}
+    for method, func in [('CM', funcevalCM), ('LSM', funcevalLSM), ('IM', funcevalIM)]:
+        result, stages[method] = funcbenchstage(lambda: func(context, settings[method]), repeat)
+        radiusresults[method] = result
+        stages[method]['value'] = float(result['radius']) if result else np.nan
+        stages[method]['error_abs'] = abs(stages[method]['value'] - truth['radius'])
+
+    angle_stages = [('angle_MAX', 'MAX', None), ('angle_END_LSM', 'END', 'LSM'), ('angle_END_IM', 'END', 'IM')]
+    for name, method, radius_method in angle_stages:
+        radiusresult = radiusresults[radius_method] if radius_method else None
+        result, stages[name] = funcbenchstage(
+            lambda: funcevalangle(method, context, settings['Angle'], radiusresult), repeat)
+        stages[name]['value'] = float(result['angle']) if result else np.nan
+        stages[name]['error_abs'] = abs(stages[name]['value'] - truth['angle'])
+
+    return stages
+
+
+def funcrunbenchmark(kinds, lengths, spacings, noises, radius=1.0, angle=30.0, settings=None, repeat=3, seed=0):
+    """
+    Führt den Benchmark über ein Raster aus Nahtform, Profillänge, Punktabstand und Rauschen aus.
+
+    Parameters:
+    kinds (list of str): Nahtformen ('butt', 'fillet').
+    lengths (list of float): Profillängen in mm.
+    spacings (list of float): Punktabstände in mm (entspricht 'orderdistance').
+    noises (list of float): Standardabweichungen des Rauschens in mm.
+    radius (float): Sollwert des Nahtübergangsradius in mm.
+    angle (float): Sollwert des Nahtübergangswinkels in Grad.
+    settings (dict): Einstellungen aus loadsettings (None: Standardwerte).
+    repeat (int): Anzahl der Wiederholungen je Stufe.
+    seed (int): Startwert des Zufallsgenerators.
+
+    Returns:
+    dict: 'meta' (Umgebung und Parameter), 'cases' (eine Liste mit einem Eintrag je Rasterpunkt) und
+          'incremental' (Vergleich der inkrementellen mit der vollständigen Auswertung, funcincrementalcheck).
+    """
+    settings = settings or loadsettings()
+    cases = []
+    for kind, length, spacing, noise in itertools.product(kinds, lengths, spacings, noises):
+        profile, truth = funcweldprofile(kind, radius=radius, angle=angle, length=length, spacing=spacing,
+                                         noise=noise, seed=seed)
+        # Abweichung des kompakten Modus (float32) vom Budget in funccompact und Spitzenspeicher der
+        # gesamten Auswertung (Aufbereitung und alle Methoden) in beiden Modi
+        try:
+            compact = funccompactcheck(profile, settings)
+        except Exception as error:
+            compact = {'ok': None, 'error': f'{type(error).__name__}: {error}'}
+        for mode, source in [('off', profile), ('on', funccompactprofile(profile))]:
+            _, record = funcbenchstage(lambda: funcevalprofile(source, dict(settings, compact=mode)), 1)
+            compact[f'peak_memory_{mode}'] = record['peak_memory']
+        cases.append({
+            'kind': kind, 'length': length, 'spacing': spacing, 'noise': noise, 'n_points': len(profile),
+            'truth': truth, 'stages': funcbenchcase(profile, truth, settings, repeat), 'compact': compact
+        })
+
+    # Schnittfolge einer Stumpfnaht, deren schärferer Nahtübergang die Seite wechselt
+    try:
+        incremental = funcincrementalcheck(
+            funcweldsequence(6, radii=(0.8 * radius, 1.2 * radius), angle=angle), settings)
+    except Exception as error:
+        incremental = {'ok': None, 'error': f'{type(error).__name__}: {error}'}
+
+    meta = {
+        'version': _gitrevision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'settings': settings
+    }
+    return {'meta': meta, 'cases': cases, 'incremental': incremental}
+
+
+def funccomparebenchmark(current, previous, threshold=1.2):
+    """
+    Vergleicht die Laufzeiten zweier Benchmark-Ergebnisse und listet Verschlechterungen auf.
+
+    Parameters:
+    current (dict): Ergebnis aus funcrunbenchmark.
+    previous (dict): Früheres Ergebnis (z.B. aus einer JSON-Datei).
+    threshold (float): Faktor, ab dem eine längere Laufzeit als Verschlechterung gilt.
+
+    Returns:
+    list of dict: Verschlechterungen mit Rasterpunkt, Stufe, alter und neuer Laufzeit.
+    """
+    def key(case):
+        return case['kind'], case['length'], case['spacing'], case['noise']
+
+    previous_cases = {key(case): case for case in previous['cases']}
+    regressions = []
+    for case in current['cases']:
+        old = previous_cases.get(key(case))
+        if old is None:
+            continue
+        for stage, record in case['stages'].items():
+            old_time = old['stages'].get(stage, {}).get('time', np.nan)
+            if record['time'] > old_time * threshold:
+                regressions.append({'case': key(case), 'stage': stage, 'old': old_time, 'new': record['time']})
+    return regressions
+
+
+def _gitrevision():
+    """Git-Revision des Projektordners oder None."""
+    try:
+        folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=folder, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark of the weld toe evaluation methods on synthetic profiles.')
+    parser.add_argument('--kinds', nargs='+', default=['butt', 'fillet'])
+    parser.add_argument('--lengths', nargs='+', type=float, default=[20.0, 60.0])
+    parser.add_argument('--spacings', nargs='+', type=float, default=[0.05, 0.025])
+    parser.add_argument('--noises', nargs='+', type=float, default=[0.0, 0.002])
+    parser.add_argument('--radius', type=float, default=1.0)
+    parser.add_argument('--angle', type=float, default=30.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--settings', help='JSON file overriding entries of loadsettings')
+    parser.add_argument('--output', default='bench_results.json', help='JSON file for the results')
+    parser.add_argument('--compare', help='previous JSON result to check for timing regressions')
+    args = parser.parse_args(argv)
+
+    results = funcrunbenchmark(args.kinds, args.lengths, args.spacings, args.noises, radius=args.radius,
+                               angle=args.angle, settings=loadsettings(args.settings), repeat=args.repeat)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=1, default=float)
+
+    for case in results['cases']:
+        print(f"{case['kind']:6s} length={case['length']:6.1f} spacing={case['spacing']:.3f} "
+              f"noise={case['noise']:.4f} n={case['n_points']}")
+        for stage, record in case['stages'].items():
+            line = f"    {stage:14s} {record['time'] * 1e3:9.2f} ms {record['peak_memory'] / 1e6:8.2f} MB"
+            if 'error_abs' in record:
+                line += f"  value={record['value']:.4f} error={record['error_abs']:.4f}"
+            if record['error']:
+                line += f"  {record['error']}"
+            print(line)
+        compact = case['compact']
+        memory = (f"peak memory off/on {compact['peak_memory_off'] / 1e6:.2f}/"
+                  f"{compact['peak_memory_on'] / 1e6:.2f} MB")
+        if compact['ok'] is None:
+            print(f"    compact        {memory}  {compact['error']}")
+        else:
+            deviations = ' '.join(f'{column}={value:.2e}' for column, value in compact.items()
+                                  if column in ACCURACY_BUDGET)
+            print(f"    compact        {'within budget' if compact['ok'] else 'BUDGET EXCEEDED'}  {memory}  {deviations}")
+
+    incremental = results['incremental']
+    if incremental['ok'] is None:
+        print(f"incremental  {incremental['error']}")
+    else:
+        print(f"incremental  {'identical to full search' if incremental['ok'] else 'RESULTS DIFFER'}  "
+              f"{incremental['seeded']} of {incremental['sections']} sections seeded")
+    failed = incremental['ok'] is False
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = funccomparebenchmark(results, json.load(file))
+        for regression in regressions:
+            print(f"Regression {regression['case']} {regression['stage']}: "
+                  f"{regression['old'] * 1e3:.2f} ms -> {regression['new'] * 1e3:.2f} ms")
+        failed |= bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+def funcweldprofile(kind='butt', radius=1.0, angle=30.0, length=60.0, spacing=0.025, noise=0.0,
+                    height=2.0, width=12.0, seed=None):
+    """
+    Erzeugt ein synthetisches Schweißnahtprofil mit bekanntem Nahtübergangsradius und -winkel.
+
+    Der Grundwerkstoff liegt bei y = 0. Am Nahtübergang geht er über einen Kreisbogen mit dem Radius
+    radius tangential in die Nahtflanke mit dem Winkel angle über. Die Flanke steigt bis zur Höhe height.
+    - 'butt': Stumpfnaht, symmetrisch zu x = 0 mit ebener Decklage und zwei Nahtübergängen.
+    - 'fillet': Kehlnaht, das Profil endet an der Oberkante der Flanke.
+    Die Punkte haben den x-Abstand spacing und sind wie die Beispieldateien nach dem Einlesen
+    geordnet (x absteigend, Grundwerkstoff zuerst).
+
+    Parameters:
+    kind (str): 'butt' oder 'fillet'.
+    radius (float): Nahtübergangsradius in mm ('butt': auch Paar für die Nahtübergänge bei x > 0 und x < 0).
+    angle (float): Nahtübergangswinkel in Grad.
+    length (float): Länge des Profils in x in mm.
+    spacing (float): Abstand der Punkte in x in mm.
+    noise (float): Standardabweichung eines normalverteilten Rauschens der y-Werte in mm.
+    height (float): Höhe der Naht über dem Grundwerkstoff in mm.
+    width (float): Breite der Naht ('butt') bzw. Länge der Flanke in x ('fillet') in mm.
+    seed (int): Startwert des Zufallsgenerators für das Rauschen.
+
+    Returns:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    truth (dict): Sollwerte mit den Schlüsseln 'radius', 'angle' und 'x_toe' (x-Koordinaten der Nahtübergänge).
+    """
+    alpha = np.radians(angle)
+
+    def toe(s, radius):
+        # Höhe über dem Grundwerkstoff in Abhängigkeit vom Abstand s zum Nahtübergang (in Richtung Naht)
+        s_arc = radius * np.sin(alpha)  # Länge des Kreisbogens in x
+        y_arc = radius * (1 - np.cos(alpha))  # Höhe am Ende des Kreisbogens
+        y = np.zeros_like(s)
+        arc = (s > 0) & (s <= s_arc)
+        y[arc] = radius - np.sqrt(radius**2 - s[arc]**2)
+        flank = s > s_arc
+        y[flank] = y_arc + np.tan(alpha) * (s[flank] - s_arc)
+        return np.minimum(y, height)
+
+    if kind == 'butt':
+        x = np.arange(length / 2, -length / 2 - spacing / 2, -spacing)
+        x_toe = width / 2
+        radius_pos, radius_neg = np.broadcast_to(radius, 2)
+        y = np.where(x >= 0, toe(x_toe - np.abs(x), radius_pos), toe(x_toe - np.abs(x), radius_neg))
+        truth_x = [x_toe, -x_toe]
+    elif kind == 'fillet':
+        x = np.arange(length, -spacing / 2, -spacing)
+        x_toe = width
+        y = toe(x_toe - x, radius)
+        s_arc, y_arc = radius * np.sin(alpha), radius * (1 - np.cos(alpha))
+        keep = (x_toe - x) <= s_arc + (height - y_arc) / np.tan(alpha)  # Profil endet an der Oberkante
+        x, y = x[keep], y[keep]
+        truth_x = [x_toe]
+    else:
+        raise ValueError('Unknown weld kind')
+
+    if noise > 0:
+        y = y + np.random.default_rng(seed).normal(0, noise, len(y))
+
+    return np.column_stack((x, y)), {'radius': radius, 'angle': angle, 'x_toe': truth_x}
+
+
+def funcweldsequence(n, radii=(0.8, 1.2), period=3, seed=None, **kwargs):
+    """
+    Erzeugt eine Folge von Schnitten einer Stumpfnaht, in der der schärfere Nahtübergang nach jeweils
+    period Schnitten die Seite wechselt (Prüfung der inkrementellen Auswertung).
+
+    Parameters:
+    n (int): Anzahl der Schnitte.
+    radii (tuple): Radien der Nahtübergänge bei x > 0 und x < 0 in mm.
+    period (int): Anzahl der Schnitte, nach der die Radien vertauscht werden.
+    seed (int): Startwert des Zufallsgenerators für das Rauschen (je Schnitt um den Index erhöht).
+    kwargs: Weitere Parameter für funcweldprofile (außer kind und radius).
+
+    Returns:
+    list: Profile (2D-Arrays mit x- und y-Werten) in der Reihenfolge entlang der Naht.
+    """
+    return [funcweldprofile('butt', radius=radii[::1 if (i // period) % 2 == 0 else -1],
+                            seed=None if seed is None else seed + i, **kwargs)[0] for i in range(n)]
@@ -0,0 +1,187 @@
+import os
+import csv
+import glob
+import warnings
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from funcevalprofile import funcloadfile, funcevalprofile, funcresultrow
+from funcinstrument import Instrument, MemorySink, NULL_INSTRUMENT
+from funcrenderresults import funcplotselect, funcplotpath, RenderQueue
+from funcstagecache import funcstagecache, funcfilehash, funcsettingskey
+from funcresultstore import funcresultrecord, funcsourcestamp
+
+# Spalten der Ergebnistabelle (allresults)
+RESULT_COLUMNS = ['radius_CM', 'radius_LSM', 'radius_IM', 'angle_MAX', 'angle_END_LSM', 'angle_END_IM']
+
+
+def funcexpandpaths(paths, pattern='*.asc'):
+    """
+    Erstellt die Dateiliste für die Auswertung aus Pfaden, Ordnern und Glob-Mustern.
+
+    Parameters:
+    paths (list of str): Dateien, Ordner (alle Dateien nach pattern) oder Glob-Muster.
+    pattern (str): Dateimuster für Ordner.
+
+    Returns:
+    list of str: Dateipfade in der angegebenen Reihenfolge, innerhalb eines Eintrags sortiert, ohne Duplikate.
+    """
+    file_list = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(path, pattern)))
+        elif glob.has_magic(path):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+        file_list.extend(f for f in matches if f not in file_list)
+    return file_list
+
+
+def funcevalfile(filepath, settings, instrument=NULL_INSTRUMENT):
+    """
+    Wertet eine Datei aus und fängt Fehler ab, damit ein Batchlauf nicht abbricht.
+
+    Mit settings['stagecache'] = 'on' werden die Stufenergebnisse zwischengespeichert (siehe funcstagecache).
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei.
+    settings (dict): Einstellungen aus loadsettings.
+    instrument (Instrument): Optional, Messung der Stufen (siehe funcinstrument).
+
+    Returns:
+    tuple: Ergebniszeile (6 Werte, NaN bei Fehler), Fehlermeldung (None bei Erfolg), Auftrag für das
+           Ergebnisdiagramm (None, wenn kein Diagramm ausgegeben werden soll, siehe funcrenderresults)
+           und alle Ergebnisse der Auswertemethoden (siehe funcresultrecord).
+    """
+    with instrument.file(filepath):
+        try:
+            # Mit Zwischenspeicher wird die Datei nur gelesen, wenn ein Stufenergebnis fehlt
+            cache = funcstagecache(settings)
+            source_key = funcfilehash(filepath) if cache.enabled else None
+            results = funcevalprofile(lambda: funcloadfile(filepath, settings)[0], settings, instrument, cache, source_key)
+            plotjob = None
+            if settings.get('plotresult') == 'file' and funcplotselect(results['radius'], settings):
+                plotjob = (funcplotpath(filepath, settings), results['profile'], results['radius'], results['angle'])
+            return funcresultrow(results), None, plotjob, funcresultrecord(results)
+        except Exception as error:
+            return np.full(len(RESULT_COLUMNS), np.nan), f'{type(error).__name__}: {error}', None, funcresultrecord(None)
+
+
+def _evalfileworker(filepath, settings, instrumented):
+    """Auswertung im Prozesspool; die Messwerte werden an den Hauptprozess zurückgegeben."""
+    if not instrumented:
+        return funcevalfile(filepath, settings) + ([],)
+    sink = MemorySink(keep_records=True)
+    return funcevalfile(filepath, settings, Instrument([sink])) + (sink.records,)
+
+
+def funcbatch(file_list, settings, workers=None, chunksize=None, instrument=NULL_INSTRUMENT, store=None):
+    """
+    Wertet viele Dateien parallel in einem Prozesspool aus.
+
+    Die Dateien werden blockweise (chunksize) auf die Prozesse verteilt. Die Reihenfolge der Ergebnisse
+    entspricht immer der Reihenfolge von file_list. Mit settings['plotresult'] = 'file' werden die
+    Ergebnisdiagramme in einem eigenen Prozesspool erstellt, sobald die Ergebnisse einer Datei vorliegen
+    (siehe RenderQueue).
+
+    Mit store werden alle Ergebnisse der Auswertemethoden während des Laufs blockweise gespeichert.
+    Dateien, deren Ergebnis bereits ohne Fehler mit denselben Einstellungen und demselben Stand der
+    Datei (Größe und Änderungszeit) gespeichert ist, werden nicht erneut ausgewertet, sodass ein
+    abgebrochener Lauf fortgesetzt werden kann; ihre Ergebnisse werden aus dem Speicher gelesen.
+    Wurden Dateien mit anderen Einstellungen gespeichert, werden sie mit einer Warnung neu ausgewertet.
+    Nach einem vollständigen Lauf werden die Blöcke des Speichers zu einem zusammengefasst.
+
+    Parameters:
+    file_list (list of str): Pfade der auszuwertenden Dateien.
+    settings (dict): Einstellungen aus loadsettings.
+    workers (int): Anzahl der Prozesse (None: Anzahl der CPU-Kerne, 1: ohne Prozesspool).
+    chunksize (int): Anzahl der Dateien je Auftrag an einen Prozess (None: automatisch).
+    instrument (Instrument): Optional, Messung der Stufen. Im Prozesspool werden die Messwerte der
+                             Prozesse gesammelt und an instrument weitergegeben (ohne ProfileSink).
+    store (ResultStore): Optional, Ergebnisspeicher mit dem Dateipfad als Schlüssel (siehe funcresultstore).
+
+    Returns:
+    allresults (np.ndarray): Ergebnisse mit der Form (Anzahl Dateien, 6), Spalten wie RESULT_COLUMNS.
+    errors (list): Fehlermeldung der Auswertung je Datei oder None.
+    plot_errors (list): Fehlermeldung der Diagrammausgabe je Datei oder None.
+    """
+    allresults = np.full((len(file_list), len(RESULT_COLUMNS)), np.nan)
+    errors = [None] * len(file_list)
+    plot_errors = [None] * len(file_list)
+    if not file_list:
+        return allresults, errors, plot_errors
+
+    workers = workers or os.cpu_count() or 1
+
+    # Bereits gültig gespeicherte Dateien überspringen
+    indices = list(range(len(file_list)))
+    if store is not None:
+        settings_key = funcsettingskey(settings)
+        sources = {filepath: funcsourcestamp(filepath) for filepath in file_list}
+        stored, other_settings = store.completed(sources, settings_key)
+        if other_settings:
+            warnings.warn(f'{other_settings} files in the result store were evaluated with other settings '
+                          f'and are evaluated again')
+        indices = [loop_nr for loop_nr in indices if file_list[loop_nr] not in stored]
+        stored_nrs = [loop_nr for loop_nr in range(len(file_list)) if file_list[loop_nr] in stored]
+        if stored_nrs:
+            rows, stored_errors = store.table([file_list[loop_nr] for loop_nr in stored_nrs])
+            allresults[stored_nrs] = rows
+            for loop_nr, error in zip(stored_nrs, stored_errors):
+                errors[loop_nr] = error
+    pending_files = [file_list[loop_nr] for loop_nr in indices]
+
+    render = RenderQueue(workers) if settings.get('plotresult') == 'file' else None
+
+    def collect(rows):
+        for loop_nr, (row, error, plotjob, result_record, records) in zip(indices, rows):
+            allresults[loop_nr], errors[loop_nr] = row, error
+            if plotjob is not None:
+                render.submit(loop_nr, plotjob)
+            if store is not None:
+                store.append(file_list[loop_nr], result_record, error, sources[file_list[loop_nr]], settings_key)
+            for record in records:
+                instrument.record(record)
+
+    try:
+        if workers == 1:
+            collect(funcevalfile(filepath, settings, instrument) + ([],) for filepath in pending_files)
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(pending_files) // (workers * 4))
+            evalfile = functools.partial(_evalfileworker, settings=settings, instrumented=instrument.enabled)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                collect(executor.map(evalfile, pending_files, chunksize=chunksize))
+    finally:
+        # Auch bei einem Abbruch die bisherigen Ergebnisse speichern und ausstehende Diagramme erstellen
+        if store is not None:
+            store.flush()
+        if render is not None:
+            for loop_nr, plot_error in render.close().items():
+                plot_errors[loop_nr] = plot_error
+
+    # Nach einem vollständigen Lauf alle Blöcke zusammenfassen (speicherabgebildete Abfragen)
+    if store is not None:
+        store.consolidate()
+
+    return allresults, errors, plot_errors
+
+
+def funcwriteresults(outputpath, file_list, allresults, errors, plot_errors=None):
+    """
+    Schreibt die Ergebnistabelle als CSV-Datei.
+
+    Parameters:
+    outputpath (str): Pfad der CSV-Datei.
+    file_list (list of str): Pfade der ausgewerteten Dateien.
+    allresults (np.ndarray): Ergebnisse aus funcbatch.
+    errors (list): Fehlermeldungen aus funcbatch.
+    plot_errors (list): Optional, Fehlermeldungen der Diagrammausgabe aus funcbatch (eigene Spalte).
+    """
+    with open(outputpath, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['file'] + RESULT_COLUMNS + ['error'] + (['plot_error'] if plot_errors is not None else []))
+        for nr, (filepath, row, error) in enumerate(zip(file_list, allresults, errors)):
+            writer.writerow([filepath] + [f'{value:.6f}' for value in row] + [error or '']
+                            + ([plot_errors[nr] or ''] if plot_errors is not None else []))
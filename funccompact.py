@@ -0,0 +1,134 @@
+import numbers
+import numpy as np
+
+# Zulässige Abweichung der Ergebnisse im kompakten Modus ('compact': 'on') gegenüber float64,
+# je Spalte der Ergebnistabelle: ('rel', relative Abweichung) oder ('abs', absolute Abweichung).
+# Die Profilpunkte werden als float32 gespeichert (Rundung etwa 6e-8 relativ, 4e-6 mm bei x = 60 mm);
+# Ableitungen und Auswertung rechnen in float64. CM ist am empfindlichsten, da die Rundung der
+# x-Werte in der zweiten Ableitung mit 1 / Punktabstand² verstärkt wird. IM sucht Radien in Schritten
+# von 0.01 mm und kann daher um einen Schritt abweichen. Bei zwei gleich starken Nahtübergängen
+# (symmetrische Naht) kann die Rundung den anderen Nahtübergang auswählen; das Budget gilt dann nicht
+# (funccompactcheck meldet die Überschreitung, beide Seiten liefert functoes).
+ACCURACY_BUDGET = {
+    'radius_CM': ('rel', 2e-3),
+    'radius_LSM': ('rel', 1e-4),
+    'radius_IM': ('abs', 0.0101),
+    'angle_MAX': ('abs', 1e-3),
+    'angle_END_LSM': ('abs', 1e-3),
+    'angle_END_IM': ('abs', 1e-3)
+}
+
+
+def funccompactprofile(profile):
+    """
+    Profil als zusammenhängendes float32-Array (n, 2); ohne Kopie, wenn es bereits so vorliegt.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y, optional weitere Spalten).
+
+    Returns:
+    np.ndarray: float32-Array (n, 2).
+    """
+    return np.ascontiguousarray(profile[:, :2], dtype=np.float32)
+
+
+class ResultRecord:
+    """
+    Ergebnis einer Auswertemethode mit festen Feldern (__slots__) statt eines Dictionarys.
+
+    Der Zugriff erfolgt wie bei einem Dictionary (record['radius'], 'DP_EP' in record, keys(), get(),
+    copy()), sodass Records überall verwendet werden können, wo Ergebnisse aus funcevalCM, funcevalLSM,
+    funcevalIM oder funcevalangle erwartet werden. Nicht gesetzte Felder sind nicht enthalten.
+    NumPy-Skalare werden als int bzw. float gespeichert.
+    """
+
+    __slots__ = ('method', 'radius', 'DP_toe', 'DP_SP', 'DP_EP', 'SP', 'MP', 'EP', 'maxdist', 'angle', 'DP', 'sign')
+
+    def __init__(self, results=(), **fields):
+        for key, value in dict(results, **fields).items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if isinstance(value, np.generic):
+            value = int(value) if isinstance(value, numbers.Integral) else value.item()
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        return dict(self.items()) == dict(other.items()) if hasattr(other, 'items') else NotImplemented
+
+    def __repr__(self):
+        return f'ResultRecord({dict(self.items())!r})'
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def copy(self):
+        return ResultRecord(self.items())
+
+
+def funccompactresults(results):
+    """
+    Ersetzt die Ergebnisse der Auswertemethoden in den Ergebnissen aus funcevalprofile durch ResultRecord.
+
+    Parameters:
+    results (dict): Ergebnisse aus funcevalprofile mit 'radius' und 'angle'.
+
+    Returns:
+    dict: Ergebnisse mit Tupeln von ResultRecord für 'radius' und 'angle'.
+    """
+    compact = dict(results)
+    compact['radius'] = tuple(ResultRecord(r) for r in results['radius'])
+    compact['angle'] = tuple(ResultRecord(a) for a in results['angle'])
+    return compact
+
+
+def funccompactcheck(profile, settings):
+    """
+    Vergleicht die Ergebnisse im kompakten Modus mit der Auswertung in float64 (ACCURACY_BUDGET).
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y) in float64.
+    settings (dict): Einstellungen aus loadsettings (settings['compact'] wird für beide Läufe gesetzt).
+
+    Returns:
+    dict: Je Spalte aus ACCURACY_BUDGET die Abweichung (relativ oder absolut wie im Budget) sowie
+          'ok' (True, wenn alle Abweichungen innerhalb des Budgets liegen).
+    """
+    from funcevalprofile import funcevalprofile, funcresultrow
+
+    reference = funcresultrow(funcevalprofile(profile, dict(settings, compact='off')))
+    compact = funcresultrow(funcevalprofile(funccompactprofile(profile), dict(settings, compact='on')))
+    deviations = {'ok': True}
+    for (column, (kind, limit)), value, expected in zip(ACCURACY_BUDGET.items(), compact, reference):
+        deviation = abs(value - expected)
+        if kind == 'rel':
+            deviation /= abs(expected)
+        if np.isnan(value) and np.isnan(expected):
+            deviation = 0.0
+        deviations[column] = float(deviation)
+        deviations['ok'] &= bool(deviation <= limit)
+    return deviations
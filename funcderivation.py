@@ -1,46 +1,242 @@
 import numpy as np
-from funcfilterprofile import funcfilterprofile
 
-def func_derivation(profile, smoothparam):
+# Verfahren der Ableitungsberechnung (Einstellung 'derivative' der Auswertemethoden)
+DERIVATIVE_METHODS = ['difference', 'spline', 'savgol']
+
+
+def func_derivation(profile, smoothparam, method='difference'):
     """
     Berechnet den Gradienten und die Krümmung eines Profils.
 
+    Gradient und Krümmung werden an den inneren Punkten des Profils berechnet (Länge n - 2).
+
     Parameters:
         profile (numpy.ndarray): Ein 2D-Array mit x- und y-Werten.
-        smoothparam (float): Glättungsparameter, muss zwischen 0.8 und 1.0 liegen.
+        smoothparam (float): Glättungsparameter, Bedeutung abhängig von method:
+                             - 'difference': zwischen 0.8 und 1.0, unter 1.0 wird das Profil vorher
+                               mit einem Smoothing-Spline geglättet.
+                             - 'spline': zwischen 0.8 und 1.0, Ableitungen des Smoothing-Splines
+                               (1.0: interpolierender Spline).
+                             - 'savgol': Fensterlänge des Savitzky-Golay-Filters in Punkten (ungerade, ab 5).
+        method (str): 'difference' (Differenzenquotienten), 'spline' (analytische Ableitungen eines
+                      Smoothing-Splines) oder 'savgol' (Savitzky-Golay-Ableitungsfilter).
 
     Returns:
         gradient (numpy.ndarray): Gradient des Profils.
         curvature (numpy.ndarray): Krümmung des Profils.
     """
-    if 0.8 <= smoothparam < 1.0:
-        # Glättung des Profils mit einem Smoothing-Spline
-        splice_x = funcfilterprofile(profile, smoothparam)
-        smoothed_y = spline_x(profile[:, 0])
-        profile = np.column_stack((profile[:, 0], smoothed_y))
-    elif smoothparam == 1.0:
-        pass
-    else:
-        raise ValueError("smoothparam must be between 0.8 and 1.0!")
+    x = profile[:, 0]
+    y = profile[:, 1]
+    if method == 'difference':
+        if 0.8 <= smoothparam < 1.0:
+            # Glättung des Profils mit einem Smoothing-Spline
+            y = _smoothingspline(x, y, smoothparam)(x)
+        elif smoothparam != 1.0:
+            raise ValueError("smoothparam must be between 0.8 and 1.0!")
 
-    # Erste Ableitung
-    diff1_x = profile[:-1, 0] + np.diff(profile[:, 0]) / 2
-    diff1_y = np.diff(profile[:, 1]) / np.diff(profile[:, 0])
-    diff1 = np.column_stack((diff1_x, diff1_y))
+        # Erste Ableitung
+        dx = np.diff(x)
+        diff1_x = x[:-1] + dx / 2
+        diff1_y = np.diff(y) / dx
 
-    # Zweite Ableitung
-    diff2_x = diff1[:-1, 0] + np.diff(diff1[:, 0]) / 2
-    diff2_y = np.diff(diff1[:, 1]) / np.diff(diff1[:, 0])
-    diff2 = np.column_stack((diff2_x, diff2_y))
+        # Zweite Ableitung
+        diff2_y = np.diff(diff1_y) / np.diff(diff1_x)
 
-    # Gradient (erste Ableitung mit Länge wie zweite Ableitung)
-    gradient_x = diff1[:-1, 0] + np.diff(diff1[:, 0]) / 2
-    gradient_y = diff1[:-1, 1] + np.diff(diff1[:, 1]) / 2
-    gradient = np.column_stack((gradient_x, gradient_y))
+        # Gradient (erste Ableitung mit Länge wie zweite Ableitung)
+        gradient_x = diff1_x[:-1] + np.diff(diff1_x) / 2
+        gradient_y = diff1_y[:-1] + np.diff(diff1_y) / 2
+        curvature_y = diff2_y
+    elif method == 'spline':
+        if not 0.8 <= smoothparam <= 1.0:
+            raise ValueError("smoothparam must be between 0.8 and 1.0!")
+        # Analytische Ableitungen des Splines an den inneren Punkten
+        spline = _smoothingspline(x, y, smoothparam)
+        gradient_x = x[1:-1]
+        gradient_y = spline(gradient_x, 1)
+        curvature_y = spline(gradient_x, 2)
+    elif method == 'savgol':
+        return _savgolderivation(profile, smoothparam)
+    else:
+        raise ValueError("Unknown derivative method")
+
+    gradient = np.empty((len(gradient_x), 2))
+    gradient[:, 0] = gradient_x
+    gradient[:, 1] = gradient_y
 
     # Krümmung
-    curvature_x = gradient[:, 0]
-    curvature_y = diff2[:, 1] / ((1 + gradient[:, 1]**2)**(3 / 2))
-    curvature = np.column_stack((curvature_x, curvature_y))
+    curvature = np.empty_like(gradient)
+    curvature[:, 0] = gradient_x
+    curvature[:, 1] = curvature_y / ((1 + gradient_y**2)**(3 / 2))
+
+    return gradient, curvature
+
+
+def _savgolderivation(profiles, smoothparam):
+    """
+    Gradient und Krümmung mit einem Savitzky-Golay-Ableitungsfilter (Polynomgrad 3).
+
+    Die Ableitungen von x und y nach dem Punktindex werden gefiltert und über die Kettenregel in
+    Ableitungen nach x umgerechnet. Mehrere Profile gleicher Länge (..., n_points, 2) werden gemeinsam
+    berechnet.
+    """
+    window = int(smoothparam)
+    if window != smoothparam or window < 5 or window % 2 == 0:
+        raise ValueError("smoothparam must be an odd number of points >= 5 for method 'savgol'!")
+    if profiles.shape[-2] < window:
+        raise ValueError("Profile has less points than the savgol window!")
+    from scipy.signal import savgol_filter  # erst bei Bedarf laden (Startzeit)
+
+    first = savgol_filter(profiles, window, 3, deriv=1, axis=-2, mode='interp')[..., 1:-1, :]
+    second = savgol_filter(profiles, window, 3, deriv=2, axis=-2, mode='interp')[..., 1:-1, :]
+    dx_i, dy_i = first[..., 0], first[..., 1]
+    ddx_i, ddy_i = second[..., 0], second[..., 1]
+
+    gradient = np.empty_like(first)
+    gradient[..., 0] = profiles[..., 1:-1, 0]
+    gradient[..., 1] = dy_i / dx_i
+    curvature = np.empty_like(first)
+    curvature[..., 0] = gradient[..., 0]
+    curvature[..., 1] = (ddy_i * dx_i - dy_i * ddx_i) / dx_i**3 / ((1 + gradient[..., 1]**2)**(3 / 2))
+    return gradient, curvature
+
+
+def _smoothingspline(x, y, smoothparam):
+    """
+    Kubischer Smoothing-Spline mit dem Glättungsparameter p wie csaps in MATLAB.
+
+    csaps minimiert p * Summe der Abweichungen² + (1 - p) * Integral der zweiten Ableitung²,
+    make_smoothing_spline dasselbe Funktional mit lam = (1 - p) / p.
+    """
+    from scipy.interpolate import make_smoothing_spline  # erst bei Bedarf laden (Startzeit)
+
+    if len(x) > 1 and x[0] > x[-1]:
+        # Absteigende x-Werte (Profil von rechts nach links)
+        x, y = x[::-1], y[::-1]
+    return make_smoothing_spline(x, y, lam=(1 - smoothparam) / smoothparam)
+
+
+class ProfileContext:
+    """
+    Profil mit zwischengespeicherten Ableitungen für die Auswertemethoden.
+
+    Gradient und Krümmung werden erst bei der ersten Anfrage berechnet und je Glättungsparameter
+    gespeichert. Wird derselbe Kontext an alle Auswertefunktionen übergeben, erfolgt die
+    Ableitungsberechnung je Profil und Glättungsparameter nur einmal.
+
+    Attributes:
+        profile (numpy.ndarray): Ein 2D-Array mit x- und y-Werten.
+    """
+
+    def __init__(self, profile):
+        # Auswertung immer in float64; für float32-Profile (kompakter Modus) entsteht eine Kopie,
+        # im Ablauf von StagePipeline nur des Auswertebereichs
+        self.profile = np.asarray(profile, dtype=float)
+        self._derivations = {}
+
+    @classmethod
+    def wrap(cls, profile):
+        """
+        Gibt einen Kontext für das Profil zurück; bestehende Kontexte werden unverändert übernommen.
+
+        Parameters:
+            profile (numpy.ndarray or ProfileContext): Profil oder bereits erstellter Kontext.
+
+        Returns:
+            ProfileContext: Kontext des Profils.
+        """
+        if isinstance(profile, cls):
+            return profile
+        return cls(profile)
+
+    def derivation(self, smoothparam, method='difference'):
+        """
+        Gradient und Krümmung des Profils, wie von func_derivation berechnet.
+
+        Parameters:
+            smoothparam (float): Glättungsparameter (siehe func_derivation).
+            method (str): Verfahren der Ableitungsberechnung (siehe func_derivation).
+
+        Returns:
+            gradient (numpy.ndarray): Gradient des Profils.
+            curvature (numpy.ndarray): Krümmung des Profils.
+        """
+        key = (smoothparam, method)
+        if key not in self._derivations:
+            self._derivations[key] = func_derivation(self.profile, smoothparam, method)
+        return self._derivations[key]
+
+    def gradient(self, smoothparam, method='difference'):
+        """Gradient des Profils für den Glättungsparameter smoothparam."""
+        return self.derivation(smoothparam, method)[0]
+
+    def curvature(self, smoothparam, method='difference'):
+        """Krümmung des Profils für den Glättungsparameter smoothparam."""
+        return self.derivation(smoothparam, method)[1]
+
+
+def funcderivationsettings(settings):
+    """
+    Argumente für ProfileContext.derivation aus den Einstellungen einer Auswertemethode.
+
+    Parameters:
+        settings (dict): Einstellungen einer Methode (z.B. settings['LSM']) mit 'smoothparam' und
+                         optional 'derivative' (Standard: 'difference').
+
+    Returns:
+        tuple: (smoothparam, method).
+    """
+    return settings['smoothparam'], settings.get('derivative', 'difference')
+
+
+def func_derivationbatch(profiles, lengths, smoothparam, method='difference'):
+    """
+    Berechnet Gradient und Krümmung vieler Profile gemeinsam (wie func_derivation je Profil).
+
+    Parameters:
+        profiles (numpy.ndarray): 3D-Array (n_sections, n_points, 2), die gültigen Punkte eines Schnitts
+                                  stehen am Anfang der Zeile, danach folgen NaN-Werte.
+        lengths (numpy.ndarray): Anzahl der gültigen Punkte je Schnitt.
+        smoothparam (float): Glättungsparameter (siehe func_derivation).
+        method (str): Verfahren der Ableitungsberechnung (siehe func_derivation).
+
+    Returns:
+        gradient (numpy.ndarray): 3D-Array (n_sections, n_points - 2, 2), außerhalb von lengths - 2 NaN.
+        curvature (numpy.ndarray): 3D-Array (n_sections, n_points - 2, 2), außerhalb von lengths - 2 NaN.
+    """
+    if smoothparam != 1.0 or method != 'difference':
+        # Glättung je Profil, Savitzky-Golay für vollständige Schnitte gemeinsam
+        n_sections, n_points = profiles.shape[:2]
+        gradient = np.full((n_sections, max(n_points - 2, 0), 2), np.nan)
+        curvature = np.full_like(gradient, np.nan)
+        single = np.ones(n_sections, dtype=bool)
+        if method == 'savgol' and n_points >= 3:
+            full = np.asarray(lengths) == n_points
+            if np.any(full):
+                gradient[full], curvature[full] = _savgolderivation(profiles[full], smoothparam)
+                single &= ~full
+        for i, n in enumerate(lengths):
+            if single[i] and n >= 3:
+                gradient[i, :n - 2], curvature[i, :n - 2] = func_derivation(profiles[i, :n], smoothparam, method)
+        return gradient, curvature
+
+    # Die NaN-Werte nach den gültigen Punkten ergeben NaN in den Ableitungen nach lengths - 2
+    x = profiles[..., 0]
+    y = profiles[..., 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Erste Ableitung
+        diff1_x = x[:, :-1] + np.diff(x, axis=1) / 2
+        diff1_y = np.diff(y, axis=1) / np.diff(x, axis=1)
+
+        # Zweite Ableitung
+        diff2_y = np.diff(diff1_y, axis=1) / np.diff(diff1_x, axis=1)
+
+        # Gradient (erste Ableitung mit Länge wie zweite Ableitung)
+        gradient_x = diff1_x[:, :-1] + np.diff(diff1_x, axis=1) / 2
+        gradient_y = diff1_y[:, :-1] + np.diff(diff1_y, axis=1) / 2
+
+        # Krümmung
+        curvature_y = diff2_y / ((1 + gradient_y**2)**(3 / 2))
 
+    gradient = np.stack((gradient_x, gradient_y), axis=-1)
+    curvature = np.stack((gradient_x, curvature_y), axis=-1)
     return gradient, curvature
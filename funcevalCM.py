@@ -1,13 +1,13 @@
 import numpy as np
-from funcderivation import func_derivation
+from funcderivation import ProfileContext, funcderivationsettings
 
 def funcevalCM(profile, settings):
     """
     Berechnet Nahtparameterauswertung gemäß der Methode 'CM'.
 
     Parameters:
-    profile (np.ndarray): 2D-Array mit den Profilpunkten, wobei die erste Spalte x-Werte und die zweite Spalte y-Werte enthält.
-    settings (dict): Dictionary mit den Einstellungen, erwartet einen Schlüssel 'smoothparam'.
+    profile (np.ndarray or ProfileContext): 2D-Array mit den Profilpunkten, wobei die erste Spalte x-Werte und die zweite Spalte y-Werte enthält.
+    settings (dict): Dictionary mit den Einstellungen, erwartet 'smoothparam' und optional 'derivative' (siehe func_derivation).
 
     Returns:
     dict: Ergebnisse mit folgenden Schlüsseln:
@@ -21,7 +21,9 @@ def funcevalCM(profile, settings):
     results = {'method': 'CM'}
 
     # Gradient und Krümmung berechnen
-    gradient, curvature = func_derivation(profile, settings['smoothparam'])
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    gradient, curvature = context.derivation(*funcderivationsettings(settings))
     profile = profile[1:-1, :]  # Profile kürzen, damit es zu curvature und gradient passt
 
     # Radius als Kehrwert der maximalen Krümmung
@@ -44,7 +46,7 @@ def funcevalCM(profile, settings):
     dp_start = np.where(DP_MP_dist <= results['radius'])[0][0]
     dp_end = np.where(DP_MP_dist <= results['radius'])[0][-1]
 
-    if dp_start is not None and dp_end is not None:
+    if dp_end > dp_start:
         results['maxdist'] = np.max(np.abs(DP_MP_dist[dp_start:dp_end] - results['radius']))
     else:
         results['maxdist'] = np.nan  # Kein gültiger Bereich gefunden
@@ -1,15 +1,22 @@
 import numpy as np
-from funcderivation import func_derivation
+from funcderivation import ProfileContext, funcderivationsettings
 
-def funcevalIM(profile, settings):
+def funcevalIM(profile, settings, DP_SP_range=None, radius_range=None):
     """
     Berechnet Nahtparameterauswertung gemäß der Methode 'IM'.
 
+    Die Suche über alle Startpunkte und Radien ist vektorisiert: je Startpunkt werden die Radien
+    blockweise ausgewertet, sodass der Speicherbedarf linear mit der Profillänge wächst.
+
     Parameters:
-    profile (np.ndarray): 2D-Array mit den Profilpunkten, wobei die erste Spalte x-Werte und die zweite Spalte y-Werte enthält.
+    profile (np.ndarray or ProfileContext): 2D-Array mit den Profilpunkten, wobei die erste Spalte x-Werte und die zweite Spalte y-Werte enthält.
     settings (dict): Dictionary mit den Einstellungen. Erwartet die Schlüssel:
                      - 'smoothparam': Glättungsparameter für die Krümmungsberechnung.
+                     - 'derivative' (optional): Verfahren der Ableitungsberechnung (siehe func_derivation).
                      - 'crit1', 'crit2', 'crit3': Kriterien für die Bewertung.
+                     - 'batchsize' (optional): Anzahl der Radien, die gemeinsam ausgewertet werden.
+    DP_SP_range (tuple): Optional, kleinster und größter zu prüfender Startpunkt-Index (z.B. aus dem vorherigen Schnitt).
+    radius_range (tuple): Optional, kleinster und größter zu prüfender Radius.
 
     Returns:
     dict: Ergebnisse mit folgenden Schlüsseln:
@@ -42,15 +49,22 @@ def funcevalIM(profile, settings):
     delta_x_notch = 2.0
 
     # Krümmung berechnen
-    _, curvature = func_derivation(profile, settings['smoothparam'])
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    curvature = context.curvature(*funcderivationsettings(settings))
 
     # Punkt mit maximaler Krümmung finden
-    DP_toe = np.argmax(curvature[:, 1] >= max(curvature[:, 1]) * 0.9) + 1
+    DP_toe = _im_toe(curvature)
 
     # Bereich für mögliche Startpunkte (SP)
     DP_toe_start = DP_toe - np.argmax(np.flip(np.abs(profile[:DP_toe, 0] - profile[DP_toe, 0]) >= delta_x_notch)) + 1
     DP_toe_end = DP_toe + np.argmax(np.abs(profile[DP_toe:, 0] - profile[DP_toe, 0]) >= delta_x_notch) + 1
 
+    # Eingeschränkter Suchbereich für den Startpunkt
+    if DP_SP_range is not None:
+        DP_toe_start = max(DP_toe_start, DP_SP_range[0])
+        DP_toe_end = min(DP_toe_end, DP_SP_range[1])
+
     # Korrektur der Neigung
     m = 0  # Annahme: keine Regression durchgeführt, m = 0
     av = np.array([1, m])  # Richtungsvektor
@@ -60,52 +74,208 @@ def funcevalIM(profile, settings):
     # Berechne lokale y-Werte
     local_y = profile[:, 0] * np.sin(np.arctan(m)) + profile[:, 1] * np.cos(np.arctan(m))
 
-    # Vorberechnung der Distanzen zwischen Profilpunkten und Mittelpunkt
-    distances = np.sqrt((profile[:, 0][:, None] - profile[:, 0])**2 + (profile[:, 1][:, None] - profile[:, 1])**2)
+    radii = np.arange(radius_min, radius_max + radius_delta, radius_delta)
+    if radius_range is not None:
+        radii = radii[(radii >= radius_range[0]) & (radii <= radius_range[1])]
+        if len(radii) == 0:
+            return results
+    batchsize = int(settings.get('batchsize', 250))
 
     bestQ = 1000  # Initialer hoher Wert für den Quotienten
 
     for DP_SP in range(DP_toe_start, DP_toe_end + 1):
         SP_x, SP_y = profile[DP_SP, :]
 
-        for rad in np.arange(radius_min, radius_max + radius_delta, radius_delta):
-            # Mittelpunkt des Kreises berechnen
+        # Gültige Kombinationen (Radius, Endpunkt) für diesen Startpunkt vektorisiert bestimmen
+        bounds = _im_tail_bounds(profile, DP_SP, av_ortho_norm, radii[-1])
+        rad_idx, DP_EP_all, Qk_all = [], [], []
+        for batch_start in range(0, len(radii), batchsize):
+            batch = _im_search_batch(profile, local_y, DP_SP, radii[batch_start:batch_start + batchsize],
+                                     av_ortho_norm, bounds, settings)
+            rad_idx.append(batch[0] + batch_start)
+            DP_EP_all.append(batch[1])
+            Qk_all.append(batch[2])
+        rad_idx = np.concatenate(rad_idx)
+        if len(rad_idx) == 0:
+            continue
+        DP_EP_all = np.concatenate(DP_EP_all)
+        Qk_all = np.concatenate(Qk_all)
+
+        # Nur Kandidaten, die das Minimum erreichen können, exakt in der ursprünglichen Reihenfolge prüfen
+        shortlist = Qk_all <= np.min(Qk_all) * (1 + 1e-9) + 1e-300
+        for k in np.flatnonzero(shortlist):
+            rad = radii[rad_idx[k]]
+            DP_EP = DP_SP + DP_EP_all[k]
             MP_x = SP_x + av_ortho_norm[0] * rad
             MP_y = SP_y + av_ortho_norm[1] * rad
 
-            # Endpunkt (EP) bestimmen
-            MPp_x = profile[DP_SP + 1:, 0]
-            MPp_y = profile[DP_SP + 1:, 1]
-            distances = (MPp_x - MP_x) ** 2 + (MPp_y - MP_y) ** 2
-            DP_EP_candidates = np.where(distances <= rad**2 + 0.01)[0]
+            # Maximale Abweichung zwischen Profil und Kreis
+            delta_ri = np.abs(np.sqrt((profile[DP_SP + 1:DP_EP, 0] - MP_x)**2 + (profile[DP_SP + 1:DP_EP, 1] - MP_y)**2) - rad)
 
-            if len(DP_EP_candidates) == 0:
-                continue
+            sum_delta = np.sum(delta_ri)
+            n_DP = len(delta_ri)
+            Qk = sum_delta / (n_DP**2)
 
-            DP_EP = DP_SP + DP_EP_candidates[-1]
+            if Qk < bestQ:
+                bestQ = Qk
 
-            if local_y[DP_EP] >= local_y[DP_SP] + min(0.1, settings['crit1'] * rad):
-                # Maximale Abweichung zwischen Profil und Kreis
-                delta_ri = np.abs(np.sqrt((profile[DP_SP + 1:DP_EP, 0] - MP_x)**2 + (profile[DP_SP + 1:DP_EP, 1] - MP_y)**2) - rad)
+                # Ergebnisse speichern
+                results['radius'] = rad
+                results['MP'] = [MP_x, MP_y]
+                results['SP'] = [SP_x, SP_y]
+                results['EP'] = profile[DP_EP, :]
+                results['maxdist'] = np.max(delta_ri)
+                results['DP_SP'] = DP_SP
+                results['DP_EP'] = DP_EP
 
-                # Zählen der Abstände, die größer als das Kriterium sind
-                count_larger = np.sum(delta_ri >= settings['crit2'])
+    return results
 
-                if count_larger == 0:
-                    sum_delta = np.sum(delta_ri)
-                    n_DP = len(delta_ri)
-                    Qk = sum_delta / (n_DP**2)
 
-                    if n_DP >= settings['crit3'] and Qk < bestQ:
-                        bestQ = Qk
+def _im_search_batch(profile, local_y, DP_SP, rad, av_ortho_norm, bounds, settings):
+    """
+    Wertet einen Block von Radien für einen Startpunkt der Methode 'IM' vektorisiert aus.
 
-                        # Ergebnisse speichern
-                        results['radius'] = rad
-                        results['MP'] = [MP_x, MP_y]
-                        results['SP'] = [SP_x, SP_y]
-                        results['EP'] = profile[DP_EP, :]
-                        results['maxdist'] = np.max(delta_ri)
-                        results['DP_SP'] = DP_SP
-                        results['DP_EP'] = DP_EP
+    Ein Radius ist gültig, wenn alle Punkte zwischen Start- und Endpunkt weniger als 'crit2' vom Kreis
+    entfernt sind. Dafür wird zunächst je Radius der erste Punkt außerhalb dieses Bandes gesucht. Punkte
+    hinter diesem Index, die im Kreis liegen, machen den Radius ungültig; sie werden über die
+    Grenzradien aller Profilpunkte erkannt, ohne den Kreis mit dem gesamten Profilrest zu schneiden.
+    Nur Radien, bei denen diese Abschätzung knapp ist, werden über den gesamten Profilrest berechnet.
 
-    return results
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    local_y (np.ndarray): Lokale y-Werte der Profilpunkte.
+    DP_SP (int): Index des Startpunkts.
+    rad (np.ndarray): Zu prüfende Radien (aufsteigend).
+    av_ortho_norm (np.ndarray): Normierter Vektor vom Startpunkt zum Kreismittelpunkt.
+    bounds (tuple): Grenzradien des Profilrests aus _im_tail_bounds.
+    settings (dict): Einstellungen der Methode 'IM' ('crit1', 'crit2', 'crit3').
+
+    Returns:
+    tuple: Indizes der gültigen Radien im Block, zugehörige Endpunkt-Offsets zu DP_SP und
+           Gütekennwerte Qk (bis auf Rundung wie in der Einzelauswertung).
+    """
+    empty = (np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0))
+
+    SP_x, SP_y = profile[DP_SP, :]
+    tail_x = profile[DP_SP + 1:, 0]
+    tail_y = profile[DP_SP + 1:, 1]
+    n_tail = len(tail_x)
+    if n_tail == 0:
+        return empty
+
+    MP_x = SP_x + av_ortho_norm[0] * rad
+    MP_y = SP_y + av_ortho_norm[1] * rad
+    rad_limit = rad**2 + 0.01
+
+    def _dist(rows, cols):
+        return (tail_x[cols][None, :] - MP_x[rows, None])**2 + (tail_y[cols][None, :] - MP_y[rows, None])**2
+
+    # Erster Punkt außerhalb des Bandes crit2 (n_tail, falls keiner existiert)
+    first_out = np.full(len(rad), n_tail)
+    active = np.arange(len(rad))
+    col_start, block = 0, 32
+    while len(active) and col_start < n_tail:
+        cols = np.arange(col_start, min(col_start + block, n_tail))
+        delta = np.abs(np.sqrt(_dist(active, cols)) - rad[active, None])
+        out = delta >= settings['crit2']
+        found = np.any(out, axis=1)
+        first_out[active[found]] = col_start + np.argmax(out[found], axis=1)
+        active = active[~found]
+        col_start += len(cols)
+        block *= 2
+
+    pos_lo, pos_hi, neg_lo, neg_hi, zero_maybe, zero_sure = bounds
+
+    # Punkte hinter first_out + 1 dürfen nicht im Kreis liegen
+    k = np.minimum(first_out + 2, n_tail)
+    clean = (rad < pos_lo[k]) & (rad > neg_hi[k]) & ~zero_maybe[k]
+    invalid = (rad > pos_hi[k]) | (rad < neg_lo[k]) | zero_sure[k]
+    unclear = ~clean & ~invalid
+
+    # Letzter Punkt im Kreis (Endpunkt), -1 falls keiner existiert
+    last_in = np.full(len(rad), -1)
+    rows = np.flatnonzero(clean)
+    if len(rows):
+        cols = np.arange(np.max(k[rows]))
+        inside = (_dist(rows, cols) <= rad_limit[rows, None]) & (cols[None, :] < k[rows, None])
+        has = np.any(inside, axis=1)
+        last_in[rows[has]] = len(cols) - 1 - np.argmax(inside[has, ::-1], axis=1)
+    rows = np.flatnonzero(unclear)
+    if len(rows):
+        cols = np.arange(n_tail)
+        inside = _dist(rows, cols) <= rad_limit[rows, None]
+        has = np.any(inside, axis=1)
+        last_in[rows[has]] = n_tail - 1 - np.argmax(inside[has, ::-1], axis=1)
+
+    # Kriterien: Endpunkt vorhanden, Band eingehalten, Höhe des Endpunkts, Anzahl der Punkte
+    n_DP = np.maximum(last_in - 1, 0)
+    valid = (last_in >= 0) & (n_DP <= first_out) & (n_DP > 0) & (n_DP >= settings['crit3'])
+    valid[valid] = local_y[DP_SP + last_in[valid]] >= local_y[DP_SP] + np.minimum(0.1, settings['crit1'] * rad[valid])
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return empty
+
+    # Gütekennwert Qk = Summe der Abweichungen / n_DP^2
+    cols = np.arange(np.max(n_DP[rows]))
+    delta = np.abs(np.sqrt(_dist(rows, cols)) - rad[rows, None])
+    sum_delta = np.sum(np.where(cols[None, :] < n_DP[rows, None], delta, 0), axis=1)
+    Qk = sum_delta / n_DP[rows]**2
+
+    return rows, last_in[rows], Qk
+
+
+def _im_toe(curvature):
+    """Profilindex des ersten Punkts mit mindestens 90 % der maximalen Krümmung (Mitte des Startpunktbereichs)."""
+    return np.argmax(curvature[:, 1] >= max(curvature[:, 1]) * 0.9) + 1
+
+
+def _im_tail_bounds(profile, DP_SP, av_ortho_norm, rad_max):
+    """
+    Berechnet die Grenzradien der Punkte hinter dem Startpunkt für die Methode 'IM'.
+
+    Ein Punkt liegt im Kreis mit Radius rad, wenn a - 2 * v * rad <= 0 gilt (a: quadrierter Abstand
+    zum Startpunkt abzüglich 0.01, v: Abstand in Richtung des Kreismittelpunkts). Für v > 0 ist das
+    ab dem Grenzradius a / (2 * v) der Fall, für v < 0 bis zu diesem. Die Grenzradien werden mit einer
+    Rundungstoleranz als Suffix-Minima bzw. -Maxima abgelegt, sodass für jeden Index k geprüft werden
+    kann, ob ein Punkt ab k sicher, möglicherweise oder sicher nicht im Kreis liegt.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    DP_SP (int): Index des Startpunkts.
+    av_ortho_norm (np.ndarray): Normierter Vektor vom Startpunkt zum Kreismittelpunkt.
+    rad_max (float): Größter untersuchter Radius.
+
+    Returns:
+    tuple: Suffix-Arrays (Länge n+1) pos_lo, pos_hi, neg_lo, neg_hi, zero_maybe, zero_sure.
+    """
+    SP_x, SP_y = profile[DP_SP, :]
+    tail_x = profile[DP_SP + 1:, 0]
+    tail_y = profile[DP_SP + 1:, 1]
+
+    du_x = tail_x - SP_x
+    du_y = tail_y - SP_y
+    v = du_x * av_ortho_norm[0] + du_y * av_ortho_norm[1]
+    a = du_x**2 + du_y**2 - 0.01
+    tol_g = 1e-12 * (du_x**2 + du_y**2 + 2 * rad_max * np.abs(v) + rad_max**2 + 1)
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        rho = a / (2 * v)
+        tol_rho = tol_g / (2 * np.abs(v)) + 1e-12 * np.abs(rho)
+        # Bei sehr kleinem v ist der Grenzradius unendlich (exakt, ohne Toleranz, statt inf - inf = NaN)
+        rho_lo = np.where(np.isinf(rho), rho, rho - tol_rho)
+        rho_hi = np.where(np.isinf(rho), rho, rho + tol_rho)
+    pos = v > 0
+    neg = v < 0
+    zero = v == 0
+
+    def _suffix(values, mask, fill, accumulate):
+        arr = np.append(np.where(mask, values, fill), fill)
+        return accumulate(arr[::-1])[::-1]
+
+    pos_lo = _suffix(rho_lo, pos, np.inf, np.minimum.accumulate)
+    pos_hi = _suffix(rho_hi, pos, np.inf, np.minimum.accumulate)
+    neg_lo = _suffix(rho_lo, neg, -np.inf, np.maximum.accumulate)
+    neg_hi = _suffix(rho_hi, neg, -np.inf, np.maximum.accumulate)
+    zero_maybe = _suffix(a <= tol_g, zero, False, np.logical_or.accumulate)
+    zero_sure = _suffix(a < -tol_g, zero, False, np.logical_or.accumulate)
+
+    return pos_lo, pos_hi, neg_lo, neg_hi, zero_maybe, zero_sure
@@ -1,12 +1,13 @@
 import numpy as np
-from funcderivation import func_derivation
+from funcderivation import ProfileContext, funcderivationsettings
+from funcmomentindex import MomentIndex
 
 def funcevalLSM(profile, settings):
     """
     Berechnet die Nahtparameterauswertung gemäß der Methode 'LSM'.
 
     Parameters:
-        profile (np.ndarray): 2D-Array mit Profilpunkten (erste Spalte: x-Werte, zweite Spalte: y-Werte).
+        profile (np.ndarray or ProfileContext): 2D-Array mit Profilpunkten (erste Spalte: x-Werte, zweite Spalte: y-Werte).
         settings (dict): Dictionary mit den Einstellungen, z.B. 'smoothparam', 'factor'.
 
     Returns:
@@ -21,7 +22,9 @@ def funcevalLSM(profile, settings):
     results = {'method': 'LSM'}
 
     # Krümmung berechnen
-    _, curvature = func_derivation(profile, settings['smoothparam'])
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    curvature = context.curvature(*funcderivationsettings(settings))
 
     # Bestimmung der Schweißnahtpunkte
     results['DP_toe'] = np.argmax(curvature[:, 1])  # Index des maximalen Krümmungswertes (0-basiert)
@@ -60,3 +63,60 @@ def funcevalLSM(profile, settings):
     results['maxdist'] = np.max(np.abs(DP_MP_dist[DP_toe_all] - results['radius']))
 
     return results
+
+
+def funcevalLSMsweep(profile, settings, factors):
+    """
+    Berechnet die Methode 'LSM' für viele Werte von 'factor' in einem Durchlauf.
+
+    Krümmung und Nahtübergang werden einmal bestimmt. Die Start- und Endpunkte aller Faktoren ergeben
+    sich über laufende Minima der Krümmung ab dem Nahtübergang per Binärsuche, die Kreisanpassungen
+    werden über einen MomentIndex in konstanter Zeit je Faktor gelöst. Indizes entsprechen funcevalLSM,
+    Radien und Mittelpunkte bis auf Rundungsfehler (NaN bei weniger als drei Punkten).
+
+    Parameters:
+        profile (np.ndarray or ProfileContext): 2D-Array mit Profilpunkten (erste Spalte: x-Werte, zweite Spalte: y-Werte).
+        settings (dict): Dictionary mit den Einstellungen, erwartet 'smoothparam' und optional 'derivative' (siehe func_derivation).
+        factors (array_like): Zu prüfende Faktoren.
+
+    Returns:
+        dict: Spaltenweise Ergebnisse (ein Eintrag je Faktor) mit den Schlüsseln:
+            - 'method': Verwendete Methode ('LSM').
+            - 'factor': Geprüfte Faktoren.
+            - 'DP_toe': Index des maximalen Krümmungswertes (für alle Faktoren gleich).
+            - 'DP_SP', 'DP_EP': 1D-Arrays der Indizes.
+            - 'radius': 1D-Array der Radien.
+            - 'MP': 2D-Array der Kreismittelpunkte.
+            - 'maxdist': 1D-Array der maximalen Abweichung zwischen Profil und Kreis.
+    """
+    factors = np.atleast_1d(np.asarray(factors, dtype=float))
+
+    # Krümmung berechnen
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    curvature = context.curvature(*funcderivationsettings(settings))[:, 1]
+    DP_toe = np.argmax(curvature)
+    threshold = curvature[DP_toe] * factors
+
+    # Laufende Minima rückwärts und vorwärts ab dem Nahtübergang (fallend, daher Binärsuche möglich)
+    min_before = np.minimum.accumulate(curvature[:DP_toe][::-1])
+    min_after = np.minimum.accumulate(curvature[DP_toe:])
+    steps_before = np.searchsorted(-min_before, -threshold, side='left')
+    steps_after = np.searchsorted(-min_after, -threshold, side='left')
+    DP_SP = np.where(steps_before < len(min_before), DP_toe - steps_before + 1, DP_toe + 1)
+    DP_EP = np.where(steps_after < len(min_after), DP_toe + steps_after - 1, DP_toe - 1)
+
+    # Nahtübergangsradius: Kreisanpassung je Faktor aus den kumulierten Momenten
+    MP, radius = MomentIndex(profile, anchor=DP_toe + 1).fit(DP_SP, DP_EP)
+
+    # Maximale Abweichung zwischen Profil und Kreis (Bereiche auf die größte Breite aufgefüllt)
+    count = np.maximum(DP_EP - DP_SP + 1, 0)
+    offsets = np.arange(max(np.max(count), 1))
+    indices = np.clip(DP_SP[:, None] + offsets, 0, len(profile) - 1)
+    DP_MP_dist = np.sqrt(np.sum((profile[indices] - MP[:, None, :])**2, axis=2))
+    with np.errstate(invalid='ignore'):
+        deviation = np.where(offsets < count[:, None], np.abs(DP_MP_dist - radius[:, None]), -np.inf)
+    maxdist = np.where(np.isnan(radius), np.nan, np.max(deviation, axis=1))
+
+    return {'method': 'LSM', 'factor': factors, 'DP_toe': DP_toe, 'DP_SP': DP_SP, 'DP_EP': DP_EP,
+            'radius': radius, 'MP': MP, 'maxdist': maxdist}
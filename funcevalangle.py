@@ -1,5 +1,5 @@
 import numpy as np
-from funcderivation import func_derivation
+from funcderivation import ProfileContext, funcderivationsettings
 
 def funcevalangle(method, profile, settings, radiusresults):
     """
@@ -7,9 +7,10 @@ def funcevalangle(method, profile, settings, radiusresults):
 
     Parameters:
     method (str): Methode zur Berechnung des Winkels ('MAX' oder 'END').
-    profile (np.ndarray): 2D-Array mit den Profilpunkten, wobei die erste Spalte x-Werte und die zweite Spalte y-Werte enthält.
+    profile (np.ndarray or ProfileContext): 2D-Array mit den Profilpunkten, wobei die erste Spalte x-Werte und die zweite Spalte y-Werte enthält.
     settings (dict): Dictionary mit den Einstellungen. Erwartet die Schlüssel:
                      - 'smoothparam': Glättungsparameter für die Ableitungsberechnung.
+                     - 'derivative' (optional): Verfahren der Ableitungsberechnung (siehe func_derivation).
                      - 'smoothlen': Glättungslänge für die Mittelwertbildung.
     radiusresults (dict): Ergebnisse der Radiusberechnung, mit dem Schlüssel 'DP_EP' (Endpunkt-Index).
 
@@ -19,7 +20,9 @@ def funcevalangle(method, profile, settings, radiusresults):
           - 'DP': Index des Datenpunkts, an dem der Winkel berechnet wurde.
           - 'sign': Vorzeichen des Gradienten am berechneten Punkt.
     """
-    gradient, _ = func_derivation(profile, settings['smoothparam'])
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    gradient = context.gradient(*funcderivationsettings(settings))
     results = {}
 
     if method == 'MAX':
@@ -78,3 +81,88 @@ def funcevalangle(method, profile, settings, radiusresults):
         raise ValueError("Method does not exist")
 
     return results
+
+
+def funcevalangles(profile, settings, endpoints):
+    """
+    Berechnet den Winkel 'MAX' und die Winkel 'END' für beliebig viele Endpunkte in einem Durchlauf.
+
+    Die Ergebnisse entsprechen funcevalangle. Gradient und kumulative Bogenlänge werden einmal je Profil
+    berechnet, die Länge der Glättungsbereiche ergibt sich daraus für alle Endpunkte über eine Suche.
+    Der gleitende Durchschnitt für 'MAX' verwendet kumulative Summen des Gradienten, die lineare
+    Regression für 'END' wird für alle Endpunkte gemeinsam zentriert gelöst.
+
+    Parameters:
+    profile (np.ndarray or ProfileContext): 2D-Array mit den Profilpunkten (x, y).
+    settings (dict): Einstellungen settings['Angle'] mit den Schlüsseln 'smoothparam' und 'smoothlen'.
+    endpoints (list of int): Endpunkt-Indizes 'DP_EP' der Radiusberechnung (z.B. LSM und IM).
+                             Ungültige Endpunkte (NaN, None) ergeben NaN in allen Werten.
+
+    Returns:
+    list of dict: Ergebnis 'MAX' gefolgt von einem Ergebnis 'END' je Endpunkt (Schlüssel wie funcevalangle).
+    """
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    gradient = context.gradient(*funcderivationsettings(settings))[:, 1]
+    smoothlen = settings['smoothlen']
+    n_points = len(profile)
+
+    # Kumulative Bogenlänge, distance[j] - distance[i] ist die Bogenlänge von Punkt i bis j
+    distance = np.concatenate(([0.0], np.cumsum(np.sqrt(np.diff(profile[:, 0])**2 + np.diff(profile[:, 1])**2))))
+
+    # Winkel MAX
+    DP = np.argmax(np.abs(gradient))
+    if smoothlen == 0:
+        angle_MAX = np.degrees(np.arctan(np.abs(gradient[DP])))
+    else:
+        # Anzahl der Punkte nach DP + 1 mit einer Bogenlänge kleiner als smoothlen
+        DP_nr = np.searchsorted(distance, distance[min(DP + 1, n_points - 1)] + smoothlen) - (DP + 2)
+        DP_nr = max(DP_nr, 5)  # Mindestens 5 Punkte verwenden
+
+        # Gleitender Durchschnitt des Gradienten über kumulative Summen
+        if DP_nr <= len(gradient):
+            cumulated = np.concatenate(([0.0], np.cumsum(gradient)))
+            moving_avg = (cumulated[DP_nr:] - cumulated[:-DP_nr]) / DP_nr
+        else:
+            moving_avg = np.sum(gradient) / DP_nr
+        angle_MAX = np.degrees(np.arctan(np.max(np.abs(moving_avg))))
+    results = [{'angle': angle_MAX, 'DP': DP, 'sign': np.sign(gradient[DP])}]
+
+    # Winkel END für alle gültigen Endpunkte
+    DP_EP = np.array([np.nan if e is None else e for e in endpoints], dtype=float)
+    valid = np.isfinite(DP_EP)
+    DP_EP = DP_EP[valid].astype(int)
+    if smoothlen == 0:
+        angles = np.degrees(np.arctan(np.abs(gradient[DP_EP - 1])))
+    else:
+        # Anzahl der Punkte ab DP_EP im Glättungsbereich (wie die Suche in funcevalangle)
+        DP_nr = np.searchsorted(distance, distance[DP_EP] + smoothlen) - (DP_EP + 1)
+        DP_nr = np.clip(DP_nr, 0, None)
+
+        # Lineare Regression aller Glättungsbereiche gemeinsam (Bereiche bis zur größten Länge aufgefüllt)
+        offsets = np.arange(max(np.max(DP_nr, initial=0), 1))
+        inside = offsets < DP_nr[:, None]
+        DP_all = np.minimum(DP_EP[:, None] + offsets, n_points - 1)
+        n = np.maximum(DP_nr, 1)
+        x = np.where(inside, profile[DP_all, 0], 0.0)
+        y = np.where(inside, profile[DP_all, 1], 0.0)
+        x = np.where(inside, x - (np.sum(x, axis=1) / n)[:, None], 0.0)
+        y = np.where(inside, y - (np.sum(y, axis=1) / n)[:, None], 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = np.sum(x * y, axis=1) / np.sum(x * x, axis=1)
+        angles = np.abs(np.degrees(np.arctan(slope)))
+        angles[DP_nr == 0] = np.nan
+        # Ein Punkt: np.polyfit in funcevalangle liefert die Lösung minimaler Norm mit der Steigung y / (2 x)
+        single = DP_nr == 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            angles[single] = np.abs(np.degrees(np.arctan(profile[DP_EP[single], 1] / (2 * profile[DP_EP[single], 0]))))
+
+    angles_iter = iter(angles)
+    DP_iter = iter(DP_EP - 1)
+    for is_valid in valid:
+        if is_valid:
+            DP_END = next(DP_iter)
+            results.append({'angle': next(angles_iter), 'DP': DP_END, 'sign': np.sign(gradient[DP_END])})
+        else:
+            results.append({'angle': np.nan, 'DP': np.nan, 'sign': np.nan})
+    return results
@@ -0,0 +1,289 @@
+import numpy as np
+from funcderivation import func_derivationbatch, funcderivationsettings
+from funcprofilesorting import _stacksections
+
+
+def funcalignsections(profiles, mask=None):
+    """
+    Bringt Schnitte in ein 3D-Array, in dem die gültigen Punkte jedes Schnitts am Zeilenanfang stehen.
+
+    Parameters:
+    profiles (np.ndarray or list): 3D-Array (n_sections, n_points, 2) oder Liste von 2D-Arrays (x, y).
+    mask (np.ndarray): Optional, 2D-Array (n_sections, n_points), True für gültige Punkte (z.B. aus
+                       funcprofilesortingbatch). Ohne Maske sind alle Punkte gültig, die nicht NaN sind.
+
+    Returns:
+    profiles (np.ndarray): 3D-Array (n_sections, n_points, 2), nach den gültigen Punkten mit NaN aufgefüllt.
+    lengths (np.ndarray): Anzahl der gültigen Punkte je Schnitt.
+    """
+    if isinstance(profiles, (list, tuple)):
+        if len(profiles) == 0:
+            return np.empty((0, 0, 2)), np.zeros(0, dtype=int)
+        profiles, stack_mask = _stacksections([np.asarray(p, dtype=float)[:, :2] for p in profiles])
+        mask = stack_mask if mask is None else mask
+    profiles = np.asarray(profiles, dtype=float)
+    if mask is None:
+        mask = ~np.any(np.isnan(profiles), axis=-1)
+
+    lengths = np.sum(mask, axis=1)
+    prefix = np.arange(profiles.shape[1]) < lengths[:, None]
+    if np.array_equal(mask, prefix):
+        return np.where(prefix[..., None], profiles, np.nan), lengths
+
+    # Gültige Punkte unter Beibehaltung der Reihenfolge nach vorne schieben
+    order = np.argsort(~mask, axis=1, kind='stable')
+    aligned = np.take_along_axis(profiles, order[..., None], axis=1)
+    aligned[~prefix] = np.nan
+    return aligned, lengths
+
+
+def funcevalCMbatch(profiles, settings, mask=None):
+    """
+    Berechnet die Methode 'CM' für viele Schnitte gemeinsam (Ergebnisse wie funcevalCM je Schnitt).
+
+    Parameters:
+    profiles (np.ndarray or list): 3D-Array (n_sections, n_points, 2) oder Liste von 2D-Arrays (x, y).
+    settings (dict): Dictionary mit den Einstellungen, erwartet 'smoothparam' und optional 'derivative' (siehe func_derivation).
+    mask (np.ndarray): Optional, 2D-Array (n_sections, n_points), True für gültige Punkte.
+
+    Returns:
+    dict: Spaltenweise Ergebnisse (ein Eintrag je Schnitt) mit folgenden Schlüsseln:
+          - 'method': Verwendete Methode ('CM').
+          - 'radius': 1D-Array der Radien.
+          - 'DP_toe': 1D-Array der Indizes des Punktes mit maximaler Krümmung (-1 ohne Ergebnis).
+          - 'SP', 'MP': 2D-Arrays (n_sections, 2) der Punkte mit maximaler Krümmung und der Kreismittelpunkte.
+          - 'maxdist': 1D-Array der maximalen Abweichung zwischen Profil und Kreis (NaN ohne gültigen Bereich).
+    """
+    profiles, lengths = funcalignsections(profiles, mask)
+    n_sections = len(profiles)
+    gradient, curvature = func_derivationbatch(profiles, lengths, *funcderivationsettings(settings))
+    valid = ~np.isnan(curvature[..., 1])
+    has_result = np.any(valid, axis=1)
+    rows = np.arange(n_sections)
+    trimmed = profiles[:, 1:-1, :]  # Profile kürzen, damit sie zu curvature und gradient passen
+
+    # Radius als Kehrwert der maximalen Krümmung
+    DP_toe = np.argmax(np.where(valid, curvature[..., 1], -np.inf), axis=1) if curvature.shape[1] else np.zeros(n_sections, dtype=int)
+    max_curvature = curvature[rows, DP_toe, 1] if curvature.shape[1] else np.full(n_sections, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radius = np.where(max_curvature != 0, 1 / max_curvature, np.inf)
+    radius[~has_result] = np.nan
+
+    # Normalisierter Normalenvektor, Schweißnahtpunkt (SP) und Kreismittelpunkt (MP)
+    SP = np.full((n_sections, 2), np.nan)
+    MP = np.full((n_sections, 2), np.nan)
+    maxdist = np.full(n_sections, np.nan)
+    if np.any(has_result):
+        normalv = np.stack((-gradient[rows, DP_toe, 1], np.ones(n_sections)), axis=1)
+        normalv /= np.linalg.norm(normalv, axis=1)[:, None]
+        SP = trimmed[rows, DP_toe]
+        with np.errstate(invalid='ignore'):
+            MP = SP + normalv * radius[:, None]
+
+            # Maximale Abweichung im Bereich zwischen erstem und letztem Punkt innerhalb des Kreises
+            DP_MP_dist = np.sqrt(np.sum((MP[:, None, :] - trimmed) ** 2, axis=2))
+            inside = valid & (DP_MP_dist <= radius[:, None])
+        index = np.arange(trimmed.shape[1])
+        dp_start = np.argmax(inside, axis=1)
+        dp_end = trimmed.shape[1] - 1 - np.argmax(inside[:, ::-1], axis=1)
+        window = (index >= dp_start[:, None]) & (index < dp_end[:, None])
+        deviation = np.where(window, np.abs(DP_MP_dist - radius[:, None]), -np.inf)
+        found = np.any(window, axis=1)
+        maxdist[found] = np.max(deviation[found], axis=1)
+    DP_toe = np.where(has_result, DP_toe, -1)
+
+    return {'method': 'CM', 'radius': radius, 'DP_toe': DP_toe, 'SP': SP, 'MP': MP, 'maxdist': maxdist}
+
+
+def funcevalLSMbatch(profiles, settings, mask=None):
+    """
+    Berechnet die Methode 'LSM' für viele Schnitte gemeinsam (Ergebnisse wie funcevalLSM je Schnitt).
+
+    Die Kreisanpassung erfolgt für alle Schnitte über die Normalgleichungen der Kleinste-Quadrate-
+    Anpassung in um den Schwerpunkt der Punkte verschobenen Koordinaten; die Ergebnisse entsprechen
+    np.linalg.lstsq bis auf Rundungsfehler.
+
+    Parameters:
+    profiles (np.ndarray or list): 3D-Array (n_sections, n_points, 2) oder Liste von 2D-Arrays (x, y).
+    settings (dict): Dictionary mit den Einstellungen, z.B. 'smoothparam', 'factor'.
+    mask (np.ndarray): Optional, 2D-Array (n_sections, n_points), True für gültige Punkte.
+
+    Returns:
+    dict: Spaltenweise Ergebnisse (ein Eintrag je Schnitt) mit folgenden Schlüsseln:
+          - 'method': Verwendete Methode ('LSM').
+          - 'DP_toe', 'DP_SP', 'DP_EP': 1D-Arrays der Indizes (-1 ohne Ergebnis).
+          - 'radius': 1D-Array der Radien (NaN ohne Punkte für die Anpassung).
+          - 'MP', 'SP', 'EP': 2D-Arrays (n_sections, 2) der Kreismittelpunkte, Start- und Endpunkte.
+          - 'maxdist': 1D-Array der maximalen Abweichung zwischen Profil und Kreis.
+    """
+    profiles, lengths = funcalignsections(profiles, mask)
+    n_sections, n_points = profiles.shape[:2]
+    _, curvature = func_derivationbatch(profiles, lengths, *funcderivationsettings(settings))
+    valid = ~np.isnan(curvature[..., 1])
+    has_result = np.any(valid, axis=1)
+    rows = np.arange(n_sections)
+    empty = {key: np.full(n_sections, -1) for key in ['DP_toe', 'DP_SP', 'DP_EP']}
+    empty.update({key: np.full((n_sections, 2), np.nan) for key in ['MP', 'SP', 'EP']})
+    results = dict(method='LSM', radius=np.full(n_sections, np.nan), maxdist=np.full(n_sections, np.nan), **empty)
+    if not np.any(has_result):
+        return results
+
+    # Bestimmung der Schweißnahtpunkte
+    curv = np.where(valid, curvature[..., 1], -np.inf)
+    DP_toe = np.argmax(curv, axis=1)
+    threshold = curvature[rows, DP_toe, 1] * settings['factor']
+    below = valid & (curvature[..., 1] <= threshold[:, None])
+    index = np.arange(curv.shape[1])
+
+    # Start: letzter Index unter der Schwelle vor DP_toe (Profilindex danach), sonst DP_toe + 1
+    before = below & (index < DP_toe[:, None])
+    last_before = curv.shape[1] - 1 - np.argmax(before[:, ::-1], axis=1)
+    DP_SP = np.where(np.any(before, axis=1), last_before + 2, DP_toe + 1)
+
+    # Ende: erster Index unter der Schwelle ab DP_toe minus eins, sonst DP_toe - 1
+    after = below & (index >= DP_toe[:, None])
+    DP_EP = np.where(np.any(after, axis=1), np.argmax(after, axis=1) - 1, DP_toe - 1)
+
+    # Punkte für die Anpassung: Fenster DP_SP bis DP_EP je Schnitt, auf die größte Fensterbreite aufgefüllt
+    count = np.where(has_result, np.clip(np.minimum(DP_EP, lengths - 1) - DP_SP + 1, 0, None), 0)
+    offsets = np.arange(max(np.max(count), 1))
+    fit = offsets < count[:, None]
+    window = np.take_along_axis(profiles, np.clip(DP_SP[:, None] + offsets, 0, n_points - 1)[..., None], axis=1)
+    window[~fit] = np.nan
+
+    # Nahtübergangsradius: Kleinste-Quadrate-Anpassung über die Normalgleichungen (3x3 je Schnitt)
+    solvable = count >= 3
+    x_mean = np.sum(np.where(fit, window[..., 0], 0.0), axis=1) / np.maximum(count, 1)
+    y_mean = np.sum(np.where(fit, window[..., 1], 0.0), axis=1) / np.maximum(count, 1)
+    u = np.where(fit, window[..., 0] - x_mean[:, None], 0.0)
+    v = np.where(fit, window[..., 1] - y_mean[:, None], 0.0)
+    d = u**2 + v**2
+    ATA = np.empty((n_sections, 3, 3))
+    ATA[:, 0, 0] = count
+    ATA[:, 0, 1] = ATA[:, 1, 0] = np.sum(u, axis=1)
+    ATA[:, 0, 2] = ATA[:, 2, 0] = np.sum(v, axis=1)
+    ATA[:, 1, 1] = np.sum(u * u, axis=1)
+    ATA[:, 1, 2] = ATA[:, 2, 1] = np.sum(u * v, axis=1)
+    ATA[:, 2, 2] = np.sum(v * v, axis=1)
+    ATD = np.stack((np.sum(d, axis=1), np.sum(u * d, axis=1), np.sum(v * d, axis=1)), axis=1)
+    ATA[~solvable] = np.eye(3)
+    solvable &= np.linalg.matrix_rank(ATA) == 3  # z.B. Punkte auf einer Geraden
+    ATA[~solvable] = np.eye(3)
+    c = np.linalg.solve(ATA, ATD[..., None])[..., 0]
+
+    MP = np.stack((c[:, 1] / 2 + x_mean, c[:, 2] / 2 + y_mean), axis=1)
+    with np.errstate(invalid='ignore'):
+        radius = np.sqrt(c[:, 0] + (c[:, 1] / 2)**2 + (c[:, 2] / 2)**2)
+
+    # Unterbestimmte Anpassungen (ein oder zwei Punkte, Punkte auf einer Geraden) wie in funcevalLSM mit lstsq
+    for i in np.flatnonzero(~solvable & (count > 0)):
+        points = window[i, :count[i]]
+        c_i = np.linalg.lstsq(np.column_stack((np.ones(count[i]), points)), np.sum(points**2, axis=1), rcond=None)[0]
+        MP[i] = c_i[1:] / 2
+        radius[i] = np.sqrt(c_i[0] + np.sum(MP[i]**2))
+        solvable[i] = True
+
+    # Maximale Abweichung zwischen Profil und Kreis
+    with np.errstate(invalid='ignore'):
+        DP_MP_dist = np.sqrt(np.sum((MP[:, None, :] - window)**2, axis=2))
+    maxdist = np.max(np.where(fit, np.abs(DP_MP_dist - radius[:, None]), -np.inf), axis=1)
+
+    indices = np.clip(np.stack((DP_SP, DP_EP), axis=1), 0, n_points - 1)
+    results['DP_toe'] = np.where(has_result, DP_toe, -1)
+    results['DP_SP'] = np.where(solvable, DP_SP, -1)
+    results['DP_EP'] = np.where(solvable, DP_EP, -1)
+    results['radius'] = np.where(solvable, radius, np.nan)
+    results['maxdist'] = np.where(solvable, maxdist, np.nan)
+    results['MP'] = np.where(solvable[:, None], MP, np.nan)
+    results['SP'] = np.where(solvable[:, None], profiles[rows, indices[:, 0]], np.nan)
+    results['EP'] = np.where(solvable[:, None], profiles[rows, indices[:, 1]], np.nan)
+    return results
+
+
+def funcevalanglesbatch(profiles, settings, endpoints, mask=None):
+    """
+    Berechnet die Winkel 'MAX' und 'END' für viele Schnitte gemeinsam (Ergebnisse wie funcevalangles je Schnitt).
+
+    Parameters:
+    profiles (np.ndarray or list): 3D-Array (n_sections, n_points, 2) oder Liste von 2D-Arrays (x, y).
+    settings (dict): Einstellungen settings['Angle'] mit den Schlüsseln 'smoothparam' und 'smoothlen'.
+    endpoints (list of np.ndarray): Je Winkel 'END' ein 1D-Array der Endpunkt-Indizes 'DP_EP' je Schnitt
+                                    (z.B. aus funcevalLSMbatch, -1 oder NaN ohne Ergebnis).
+    mask (np.ndarray): Optional, 2D-Array (n_sections, n_points), True für gültige Punkte.
+
+    Returns:
+    list of dict: Spaltenweise Ergebnisse 'MAX' gefolgt von einem Ergebnis 'END' je Eintrag in endpoints,
+                  jeweils mit den Schlüsseln 'angle', 'DP' und 'sign' (1D-Arrays, NaN ohne Ergebnis).
+    """
+    profiles, lengths = funcalignsections(profiles, mask)
+    n_sections, n_points = profiles.shape[:2]
+    gradient = func_derivationbatch(profiles, lengths, *funcderivationsettings(settings))[0][..., 1]
+    smoothlen = settings['smoothlen']
+    rows = np.arange(n_sections)
+    valid = ~np.isnan(gradient)
+    has_result = np.any(valid, axis=1)
+    n_gradient = np.sum(valid, axis=1)
+
+    # Kumulative Bogenlänge je Schnitt, nach den gültigen Punkten unendlich
+    segments = np.sqrt(np.diff(profiles[..., 0], axis=1)**2 + np.diff(profiles[..., 1], axis=1)**2)
+    distance = np.concatenate((np.zeros((n_sections, 1)), np.cumsum(segments, axis=1)), axis=1)
+    distance[np.arange(n_points) >= lengths[:, None]] = np.inf
+
+    def count_within(DP_from):
+        # Anzahl der Punkte ab DP_from mit einer Bogenlänge kleiner als smoothlen (ohne DP_from)
+        DP_from = np.clip(DP_from, 0, n_points - 1)
+        target = distance[rows, DP_from] + smoothlen
+        return np.sum(distance < target[:, None], axis=1) - (DP_from + 1)
+
+    # Winkel MAX
+    DP = np.argmax(np.where(valid, np.abs(gradient), -np.inf), axis=1) if gradient.shape[1] else np.zeros(n_sections, dtype=int)
+    gradient_DP = gradient[rows, DP] if gradient.shape[1] else np.full(n_sections, np.nan)
+    if smoothlen == 0:
+        angle_MAX = np.degrees(np.arctan(np.abs(gradient_DP)))
+    else:
+        DP_nr = np.maximum(count_within(DP + 1), 5)  # Mindestens 5 Punkte verwenden
+
+        # Gleitender Durchschnitt des Gradienten über kumulative Summen (Fensterlänge je Schnitt)
+        cumulated = np.concatenate((np.zeros((n_sections, 1)), np.cumsum(np.where(valid, gradient, 0.0), axis=1)), axis=1)
+        start = np.arange(gradient.shape[1])
+        inside = start <= (n_gradient - DP_nr)[:, None]
+        stop = np.clip(start + DP_nr[:, None], 0, gradient.shape[1])
+        moving_avg = (np.take_along_axis(cumulated, stop, axis=1) - cumulated[:, :-1]) / DP_nr[:, None]
+        max_avg = np.max(np.where(inside, np.abs(moving_avg), -np.inf), axis=1, initial=-np.inf)
+        # Fenster länger als der Gradient: Summe des Gradienten durch die Fensterlänge wie np.convolve
+        max_avg = np.where(DP_nr > n_gradient, np.abs(cumulated[:, -1] / DP_nr), max_avg)
+        angle_MAX = np.degrees(np.arctan(max_avg))
+    results = [{'angle': np.where(has_result, angle_MAX, np.nan),
+                'DP': np.where(has_result, DP, np.nan),
+                'sign': np.where(has_result, np.sign(gradient_DP), np.nan)}]
+
+    # Winkel END
+    for DP_EP in endpoints:
+        DP_EP = np.asarray(DP_EP, dtype=float)
+        found = has_result & np.isfinite(DP_EP) & (DP_EP >= 0)
+        DP_EP = np.where(found, DP_EP, 1).astype(int)
+        DP_END = DP_EP - 1
+        if smoothlen == 0:
+            angles = np.degrees(np.arctan(np.abs(gradient[rows, np.clip(DP_END, 0, None)])))
+        else:
+            DP_nr = np.where(found, np.clip(count_within(DP_EP), 0, None), 0)
+
+            # Lineare Regression aller Glättungsbereiche gemeinsam (Bereiche bis zur größten Länge aufgefüllt)
+            offsets = np.arange(max(np.max(DP_nr, initial=0), 1))
+            fit = offsets < DP_nr[:, None]
+            window = np.take_along_axis(profiles, np.clip(DP_EP[:, None] + offsets, 0, n_points - 1)[..., None], axis=1)
+            n = np.maximum(DP_nr, 1)
+            x = np.where(fit, window[..., 0], 0.0)
+            y = np.where(fit, window[..., 1], 0.0)
+            x = np.where(fit, x - (np.sum(x, axis=1) / n)[:, None], 0.0)
+            y = np.where(fit, y - (np.sum(y, axis=1) / n)[:, None], 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                slope = np.sum(x * y, axis=1) / np.sum(x * x, axis=1)
+                # Ein Punkt: Lösung minimaler Norm von np.polyfit wie in funcevalangle
+                slope = np.where(DP_nr == 1, window[:, 0, 1] / (2 * window[:, 0, 0]), slope)
+            angles = np.where(DP_nr > 0, np.abs(np.degrees(np.arctan(slope))), np.nan)
+        sign = np.sign(gradient[rows, np.clip(DP_END, 0, None)])
+        results.append({'angle': np.where(found, angles, np.nan),
+                        'DP': np.where(found, DP_END, np.nan),
+                        'sign': np.where(found, sign, np.nan)})
+    return results
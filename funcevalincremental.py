@@ -0,0 +1,129 @@
+import numpy as np
+from funcevalprofile import funcprepareprofile, funcevalprofile, funcresultrow
+from funcevalCM import funcevalCM
+from funcevalLSM import funcevalLSM
+from funcevalIM import funcevalIM, _im_toe
+from funcevalangle import funcevalangles
+from funcderivation import ProfileContext, funcderivationsettings
+from funcbatch import RESULT_COLUMNS
+
+
+def funcevalincremental(profiles, settings):
+    """
+    Wertet eine geordnete Folge von Schnitten einer Naht mit Vorgaben aus dem vorherigen Schnitt aus.
+
+    Benachbarte Schnitte haben nahezu dieselbe Lage des Nahtübergangs und denselben Radius. Für 'IM'
+    werden deshalb nur Startpunkte im Bereich 'toewindow' und Radien im Bereich 'radiusspan' um das
+    vorherige Ergebnis geprüft. Die Bereiche werden über die x-Koordinaten zugeordnet, sodass sich die
+    Punktanzahl der Schnitte unterscheiden darf. 'CM' und 'LSM' werden vollständig ausgewertet, da ihr
+    Nahtübergang ohnehin nur das Maximum der (zwischengespeicherten) Krümmung ist.
+
+    Das eingeschränkte Ergebnis wird verworfen und eine vollständige Suche durchgeführt, wenn
+    - der Punkt maximaler Krümmung, um den 'IM' die Startpunkte sucht, außerhalb des Bereichs liegt
+      (z.B. wenn bei einer Stumpfnaht der schärfere Nahtübergang die Seite wechselt),
+    - kein Ergebnis gefunden wurde oder es die Kriterien 'crit1' bis 'crit3' nicht erfüllt,
+    - das Ergebnis am Rand des Startpunkt- oder Radiusbereichs liegt (das Optimum kann außerhalb liegen).
+    Das eingeschränkte Ergebnis von 'IM' ist eine Näherung: Liegt das Optimum der vollständigen Suche
+    außerhalb der Bereiche und erfüllt ein Kandidat innerhalb dennoch alle Bedingungen, weicht es ab.
+    funcincrementalcheck vergleicht beide Auswertungen.
+
+    Parameters:
+    profiles (iterable): Profile (2D-Arrays mit x- und y-Werten in mm) in der Reihenfolge entlang der Naht.
+    settings (dict): Einstellungen aus loadsettings, zusätzlich settings['Incremental'] mit den Schlüsseln:
+                     - 'toewindow': Halbe Breite des Startpunktbereichs um den vorherigen Startpunkt in mm (x).
+                     - 'radiusspan': Halbe Breite des Radiusbereichs um den vorherigen Radius in mm.
+
+    Yields:
+    dict: Ergebnisse wie funcevalprofile, zusätzlich 'seeded': True wenn das eingeschränkte Ergebnis
+          von 'IM' übernommen wurde.
+    """
+    s = settings['Incremental']
+    previous_IM = None
+
+    for profile in profiles:
+        profile = funcprepareprofile(profile, settings)
+        context = ProfileContext(profile)
+        seeded = False
+
+        # Radius-Bewertung
+        results_CM = funcevalCM(context, settings["CM"])
+        results_LSM = funcevalLSM(context, settings["LSM"])
+
+        results_IM = None
+        if previous_IM is not None:
+            x_SP, radius = previous_IM
+            DP_range = _indexwindow(profile[:, 0], x_SP, s['toewindow'])
+            radius_range = (radius - s['radiusspan'], radius + s['radiusspan'])
+            DP_toe = _im_toe(context.curvature(*funcderivationsettings(settings["IM"])))
+            if DP_range is not None and DP_range[0] <= DP_toe <= DP_range[1]:
+                results_IM = funcevalIM(context, settings["IM"], DP_SP_range=DP_range, radius_range=radius_range)
+                if (_checkIM(profile, results_IM, settings["IM"])
+                        and _isinterior(results_IM['DP_SP'], DP_range, len(profile))
+                        and radius_range[0] < results_IM['radius'] - 0.005 and results_IM['radius'] + 0.005 < radius_range[1]):
+                    seeded = True
+                else:
+                    results_IM = None
+        if results_IM is None:
+            results_IM = funcevalIM(context, settings["IM"])
+        previous_IM = (results_IM['SP'][0], results_IM['radius']) if not np.isnan(results_IM['radius']) else None
+
+        # Winkel-Bewertung
+        angle_MAX, angle_END_LSM, angle_END_IM = funcevalangles(
+            context, settings["Angle"], [results_LSM['DP_EP'], results_IM['DP_EP']])
+
+        yield {
+            'profile': profile,
+            'radius': [results_CM, results_LSM, results_IM],
+            'angle': [angle_MAX, angle_END_LSM, angle_END_IM],
+            'seeded': seeded
+        }
+
+
+def funcincrementalcheck(profiles, settings):
+    """
+    Vergleicht die inkrementelle Auswertung einer Schnittfolge mit der vollständigen Auswertung jedes Schnitts.
+
+    Parameters:
+    profiles (list): Profile (2D-Arrays mit x- und y-Werten in mm) in der Reihenfolge entlang der Naht.
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    dict: 'sections' (Anzahl der Schnitte), 'seeded' (Anzahl übernommener eingeschränkter Ergebnisse),
+          je Spalte aus funcresultrow die größte absolute Abweichung und 'ok' (True, wenn alle Ergebnisse
+          übereinstimmen).
+    """
+    profiles = list(profiles)
+    incremental = [(funcresultrow(results), results['seeded']) for results in funcevalincremental(profiles, settings)]
+    full = np.array([funcresultrow(funcevalprofile(profile, settings)) for profile in profiles], dtype=float)
+    rows = np.array([row for row, _ in incremental], dtype=float)
+    deviation = np.where(np.isnan(rows) & np.isnan(full), 0.0, np.abs(rows - full))
+    check = {'sections': len(profiles), 'seeded': sum(seeded for _, seeded in incremental)}
+    for column, value in zip(RESULT_COLUMNS, deviation.max(axis=0, initial=0.0)):
+        check[column] = float(value)
+    check['ok'] = bool(np.all(deviation == 0))
+    return check
+
+
+def _indexwindow(x, x_center, halfwidth):
+    """Kleinster und größter Index mit |x - x_center| <= halfwidth, None wenn keiner existiert."""
+    inside = np.flatnonzero(np.abs(x - x_center) <= halfwidth)
+    if len(inside) == 0:
+        return None
+    return inside[0], inside[-1]
+
+
+def _isinterior(index, index_range, n_points):
+    """Prüft, ob ein Index nicht am Rand des Bereichs liegt (Profilenden zählen nicht als Rand)."""
+    lower_ok = index > index_range[0] or index_range[0] == 0
+    upper_ok = index < index_range[1] or index_range[1] == n_points - 1
+    return lower_ok and upper_ok
+
+
+def _checkIM(profile, results, settings):
+    """Prüft ein Ergebnis der Methode 'IM' auf die Kriterien crit1 bis crit3."""
+    if np.isnan(results['radius']):
+        return False
+    n_DP = results['DP_EP'] - results['DP_SP'] - 1
+    rise = profile[results['DP_EP'], 1] - profile[results['DP_SP'], 1]
+    return (n_DP >= settings['crit3'] and results['maxdist'] < settings['crit2']
+            and rise >= min(0.1, settings['crit1'] * results['radius']))
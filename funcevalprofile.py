@@ -0,0 +1,244 @@
+import hashlib
+import numpy as np
+from funcloadprofile import funcloadprofile
+from funcremoveoutlier import funcremoveoutlier
+from funcfilterprofile import funcfilterprofile
+from funcprofilesorting import funcprofilesorting
+from funcevalCM import funcevalCM
+from funcevalLSM import funcevalLSM
+from funcevalIM import funcevalIM
+from funcevalangle import funcevalangles
+from funcderivation import ProfileContext, funcderivationsettings
+from funcinstrument import NULL_INSTRUMENT
+from funclocatetoe import funclocatetoe, funcshiftresults
+from funcstagecache import NULL_CACHE, STAGE_PARENTS, funcstagekey
+from funccompact import funccompactprofile, ResultRecord
+
+# Stufen der Datenaufbereitung und der Radius-Bewertung
+_PREPARE_STAGES = {'outlier': funcremoveoutlier, 'filter': funcfilterprofile, 'sorting': funcprofilesorting}
+_RADIUS_STAGES = {'CM': funcevalCM, 'LSM': funcevalLSM, 'IM': funcevalIM}
+
+
+def funcloadfile(filepath, settings=None):
+    """
+    Liest einen Schweißnahtschnitt aus einer ASCII-Datei.
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei (Kopfzeile, danach x-, y- und z-Werte in cm).
+    settings (dict): Einstellungen aus loadsettings ('loadcache', 'cachefolder'); None ohne Zwischenspeicher.
+
+    Returns:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y) in mm.
+    header (dict): Metadaten aus der Kopfzeile (z.B. 'kt').
+    """
+    settings = settings or {}
+    data, header = funcloadprofile(filepath, settings.get('loadcache', 'off'), settings.get('cachefolder'))
+
+    # Profil anpassen (cm zu mm und Matrix umdrehen)
+    if settings.get('compact') == 'on':
+        # Eine float32-Kopie (n, 2); Umrechnung in float64 je Wert, ohne Zwischenkopie
+        profile = np.empty((len(data), 2), dtype=np.float32)
+        np.multiply(data[::-1, :2], 10, out=profile, casting='same_kind')
+        return profile, header
+    profile = data[:, :2] * 10  # Umrechnung von cm zu mm
+    profile = np.flipud(profile)  # Matrix umdrehen
+
+    return profile, header
+
+
+def funcprepareprofile(profile, settings, instrument=NULL_INSTRUMENT):
+    """
+    Führt die Datenaufbereitung (Ausreißer, Filter, Punktabstände) für einen Schnitt durch.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y) in mm.
+    settings (dict): Einstellungen aus loadsettings.
+    instrument (Instrument): Optional, Messung der Stufen (siehe funcinstrument).
+
+    Returns:
+    np.ndarray: Aufbereitetes Profil.
+    """
+    for name, func in _PREPARE_STAGES.items():
+        with instrument.stage(name, profile) as stage:
+            profile = func(profile, settings)
+            if settings.get('compact') == 'on':
+                profile = funccompactprofile(profile)
+            stage.output(profile)
+    return profile
+
+
+def funcevalprofile(profile, settings, instrument=NULL_INSTRUMENT, cache=NULL_CACHE, source_key=None):
+    """
+    Führt Datenaufbereitung, Radius- und Winkelbewertung für einen Schnitt durch.
+
+    Parameters:
+    profile (np.ndarray or callable): 2D-Array mit den Profilpunkten (x, y) in mm oder Funktion ohne
+                                      Argumente, die das Profil liefert (wird nur bei Bedarf aufgerufen).
+    settings (dict): Einstellungen aus loadsettings.
+    instrument (Instrument): Optional, Messung der Stufen (siehe funcinstrument).
+    cache (StageCache): Optional, Zwischenspeicher der Stufenergebnisse (siehe funcstagecache).
+    source_key (str): Optional, Schlüssel des Profils für den Zwischenspeicher (z.B. aus dem Inhalt der Datei).
+
+    Returns:
+    dict: Ergebnisse mit folgenden Schlüsseln:
+          - 'profile': Aufbereitetes Profil.
+          - 'radius': Liste der Radius-Ergebnisse [CM, LSM, IM].
+          - 'angle': Liste der Winkel-Ergebnisse [MAX, END (LSM), END (IM)].
+    """
+    return StagePipeline(profile, settings, instrument, cache, source_key).results()
+
+
+class StagePipeline:
+    """
+    Stufen der Auswertung eines Schnitts, die erst bei Bedarf berechnet werden.
+
+    Die Stufen und ihre Eingänge sind in funcstagecache (STAGE_PARENTS) festgelegt. Mit einem
+    Zwischenspeicher (cache) oder einem gemeinsamen Dictionary (memo) wird jedes Stufenergebnis unter
+    einem Schlüssel aus dem Profil und den relevanten Einstellungen abgelegt. Bereits vorhandene
+    Ergebnisse werden übernommen, ohne die vorherigen Stufen zu berechnen oder das Profil zu laden.
+
+    Parameters:
+        profile (np.ndarray or callable): Profil oder Funktion, die das Profil liefert.
+        settings (dict): Einstellungen aus loadsettings.
+        instrument (Instrument): Optional, Messung der Stufen (siehe funcinstrument).
+        cache (StageCache): Optional, Zwischenspeicher auf der Festplatte.
+        source_key (str): Optional, Schlüssel des Profils (None: aus den Profildaten berechnet).
+        memo (dict): Optional, Stufenergebnisse im Speicher, die mit anderen Abläufen geteilt werden.
+    """
+
+    def __init__(self, profile, settings, instrument=NULL_INSTRUMENT, cache=NULL_CACHE, source_key=None, memo=None):
+        self.profile = profile
+        self.settings = settings
+        self.instrument = instrument
+        self.cache = cache
+        self.source_key = source_key
+        self.memo = memo
+        self.values = {}
+        self.keys = {}
+        self._context = None
+
+    def key(self, stage):
+        """Schlüssel eines Stufenergebnisses (siehe funcstagekey)."""
+        if stage not in self.keys:
+            if stage == 'load':
+                if self.source_key is None:
+                    profile = np.ascontiguousarray(self.get('load'))
+                    self.source_key = hashlib.sha256(repr(profile.shape).encode() + profile.tobytes()).hexdigest()
+                parent_keys = [self.source_key]
+            else:
+                parent_keys = [self.key(parent) for parent in STAGE_PARENTS[stage]]
+            self.keys[stage] = funcstagekey(stage, self.settings, parent_keys)
+        return self.keys[stage]
+
+    def get(self, stage):
+        """Ergebnis einer Stufe aus dem Speicher, dem Zwischenspeicher oder neu berechnet."""
+        if stage in self.values:
+            return self.values[stage]
+
+        caching = self.cache.enabled or self.memo is not None
+        if caching and (stage != 'load' or self.source_key is not None):
+            key = self.key(stage)
+            if self.memo is not None and key in self.memo:
+                self.values[stage] = self.memo[key]
+                return self.values[stage]
+            found, value = self.cache.get(key)
+            if found:
+                self.values[stage] = value
+                if self.memo is not None:
+                    self.memo[key] = value
+                return value
+
+        value = self._compute(stage)
+        self.values[stage] = value
+        if caching:
+            key = self.key(stage)
+            self.cache.put(key, value)
+            if self.memo is not None:
+                self.memo[key] = value
+        return value
+
+    def context(self):
+        """
+        Gemeinsamer Kontext des Auswertebereichs (siehe funclocatetoe), damit die Ableitungen nur einmal
+        berechnet werden.
+        """
+        if self._context is None:
+            start, stop = self.get('window')
+            profile = self.get('sorting')[start:stop]
+            self._context = ProfileContext(profile)
+            if self.instrument.enabled:
+                # Ableitungen vorab berechnen, damit ihre Laufzeit nicht der ersten Methode zugerechnet wird
+                with self.instrument.stage('derivation', profile) as stage:
+                    stage.output([self._context.derivation(*funcderivationsettings(self.settings[key]))
+                                  for key in ['CM', 'LSM', 'IM', 'Angle']])
+        return self._context
+
+    def _compute(self, stage):
+        """Berechnet eine Stufe aus den Ergebnissen ihrer Eingänge."""
+        settings = self.settings
+        compact = settings.get('compact') == 'on'
+        if stage == 'load':
+            if not callable(self.profile):
+                return funccompactprofile(self.profile) if compact else self.profile
+            with self.instrument.stage('load') as record:
+                profile = self.profile()
+                if compact:
+                    profile = funccompactprofile(profile)
+                record.output(profile)
+            return profile
+
+        if stage in _PREPARE_STAGES:
+            profile = self.get(STAGE_PARENTS[stage][0])
+            with self.instrument.stage(stage, profile) as record:
+                profile = _PREPARE_STAGES[stage](profile, settings)
+                if compact:
+                    profile = funccompactprofile(profile)
+                record.output(profile)
+            return profile
+
+        if stage == 'window':
+            profile = self.get('sorting')
+            with self.instrument.stage(stage, profile) as record:
+                window = funclocatetoe(profile, settings['Localization'])
+                record.output(profile[window[0]:window[1]])
+            return window
+
+        # Indizes der Ergebnisse beziehen sich auf das gesamte Profil, die Auswertung auf den Auswertebereich
+        context = self.context()
+        start = self.get('window')[0]
+        with self.instrument.stage(stage, context.profile) as record:
+            if stage == 'angle':
+                # Winkel-Bewertung
+                endpoints = [funcshiftresults(self.get(method), -start)['DP_EP'] for method in ['LSM', 'IM']]
+                result = funcevalangles(context, settings["Angle"], endpoints)
+                result = [funcshiftresults(r, start) for r in result]
+                if compact:
+                    result = [ResultRecord(r) for r in result]
+            else:
+                # Radius-Bewertung
+                result = funcshiftresults(_RADIUS_STAGES[stage](context, settings[stage]), start)
+                if compact:
+                    result = ResultRecord(result)
+            record.output(result)
+        return result
+
+    def results(self):
+        """Ergebnisse wie funcevalprofile."""
+        return {
+            'profile': self.get('sorting'),
+            'radius': [self.get('CM'), self.get('LSM'), self.get('IM')],
+            'angle': self.get('angle')
+        }
+
+
+def funcresultrow(results):
+    """
+    Fasst die Radien und Winkel eines Schnitts als Zeile der Ergebnistabelle zusammen.
+
+    Parameters:
+    results (dict): Ergebnisse aus funcevalprofile.
+
+    Returns:
+    np.ndarray: [Radius CM, Radius LSM, Radius IM, Winkel MAX, Winkel END (LSM), Winkel END (IM)].
+    """
+    return np.array([r['radius'] for r in results['radius']] + [a['angle'] for a in results['angle']], dtype=float)
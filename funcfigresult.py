@@ -1,10 +1,12 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
-def funcfigresult(profile, radiusresults, angleresults):
+def funcfigresult(profile, radiusresults, angleresults, ax=None):
     """
     Erstellt ein Diagramm, das Kreise und Linien aus den Ergebnissen sowie das Profil darstellt.
 
+    Ohne ax wird eine neue Figur erstellt und angezeigt. Mit ax wird nur in die (zuvor geleerte) Achse
+    gezeichnet, z.B. für die Ausgabe als Datei (siehe funcrenderresults).
+
     Parameters:
     profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
     radiusresults (list of dict): Liste mit Radius-Ergebnissen, jedes als Dictionary mit Schlüsseln:
@@ -15,6 +17,7 @@ def funcfigresult(profile, radiusresults, angleresults):
                                    - 'angle': Winkel in Grad.
                                    - 'DP': Index des Datenpunkts für den Winkel.
                                    - 'sign': Vorzeichen des Winkels.
+    ax (matplotlib.axes.Axes): Optional, Achse für die Darstellung.
     """
     # Einstellungen
     colors = ['b', 'r', 'g']
@@ -22,7 +25,13 @@ def funcfigresult(profile, radiusresults, angleresults):
     linestyles = ['-', '--', '--']
 
     # Figur und Achse erstellen
-    fig, ax = plt.subplots(figsize=(8 / 2.54, 6 / 2.54))  # Umrechnung von cm in inch
+    show = ax is None
+    if show:
+        import matplotlib.pyplot as plt  # erst beim Anzeigen laden (Startzeit, Backend)
+        fig, ax = plt.subplots(figsize=(8 / 2.54, 6 / 2.54))  # Umrechnung von cm in inch
+    else:
+        fig = ax.figure
+        ax.clear()
 
     # Kreise plotten
     legend_entries = []
@@ -69,5 +78,7 @@ def funcfigresult(profile, radiusresults, angleresults):
         ax.legend(legend_entries, loc='best', fontsize=8)
 
     # Diagramm anzeigen
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    if show:
+        plt.show()
+
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def funcmovingaverage(values, window):
+    """
+    Zentrierter gleitender Mittelwert über die letzte Achse (wie pandas rolling(window, min_periods=1, center=True)).
+
+    Das Fenster für den Index i umfasst die Indizes i - window // 2 bis i + (window - 1) // 2. Am Rand
+    werden nur die vorhandenen Werte gemittelt, NaN-Werte werden nicht mitgezählt. Die Summen werden
+    über kumulierte Summen in O(n) unabhängig von der Fensterbreite berechnet.
+
+    Parameters:
+    values (np.ndarray): 1D-Array mit Werten oder 2D-Array mit einer Zeile je Profil (gleiche Länge).
+    window (int): Fensterbreite in Punkten.
+
+    Returns:
+    np.ndarray: Gemittelte Werte mit der Form von values.
+    """
+    window = int(window)
+    if window < 1:
+        raise ValueError('window must be at least 1')
+    values = np.asarray(values, dtype=float)
+    n = values.shape[-1]
+
+    # Bezugswert abziehen, damit die kumulierten Summen klein bleiben
+    valid = ~np.isnan(values)
+    reference = np.zeros(values.shape[:-1] + (1,))
+    has_valid = np.any(valid, axis=-1, keepdims=True)
+    np.divide(np.sum(np.where(valid, values, 0), axis=-1, keepdims=True), np.sum(valid, axis=-1, keepdims=True),
+              out=reference, where=has_valid)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    cumsum = np.pad(np.cumsum(np.where(valid, values - reference, 0), axis=-1), pad)
+    cumcount = np.pad(np.cumsum(valid, axis=-1), pad)
+
+    index = np.arange(n)
+    lower = np.maximum(index - window // 2, 0)
+    upper = np.minimum(index + (window - 1) // 2, n - 1) + 1
+    count = cumcount[..., upper] - cumcount[..., lower]
+    total = cumsum[..., upper] - cumsum[..., lower]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count + reference, np.nan)
+
+
+def funcmedianfilter(values, kernel_size):
+    """
+    Medianfilter über die letzte Achse mit Nullen am Rand (wie scipy.signal.medfilt für 1D-Daten).
+
+    Parameters:
+    values (np.ndarray): 1D-Array mit Werten oder 2D-Array mit einer Zeile je Profil (gleiche Länge).
+    kernel_size (int): Ungerade Fensterbreite in Punkten.
+
+    Returns:
+    np.ndarray: Gefilterte Werte mit der Form von values.
+    """
+    kernel_size = int(kernel_size)
+    if kernel_size < 1 or kernel_size % 2 == 0:
+        raise ValueError('kernel_size must be odd')
+    values = np.asarray(values, dtype=float)
+    half = kernel_size // 2
+    padded = np.pad(values, [(0, 0)] * (values.ndim - 1) + [(half, half)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, kernel_size, axis=-1)
+    return np.median(windows, axis=-1)
+
+
+def funcrollingmedian3(values):
+    """
+    Gleitender Median über drei Punkte (letzte Achse); am Rand und bei NaN im Fenster ist das Ergebnis NaN.
+
+    Der Median wählt einen der Werte aus, daher bleibt der Datentyp (z.B. float32) ohne Rundung erhalten.
+
+    Parameters:
+    values (np.ndarray): 1D-Array mit Werten oder 2D-Array mit einer Zeile je Profil (gleiche Länge).
+
+    Returns:
+    np.ndarray: Median der Punkte i-1, i, i+1 mit der Form von values.
+    """
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype(float)
+    result = np.full(values.shape, np.nan, dtype=values.dtype)
+    if values.shape[-1] >= 3:
+        a, b, c = values[..., :-2], values[..., 1:-1], values[..., 2:]
+        # Median aus drei Werten: max(min(a, b), min(max(a, b), c)), NaN bleibt erhalten
+        result[..., 1:-1] = np.maximum(np.minimum(a, b), np.minimum(np.maximum(a, b), c))
+    return result
@@ -1,34 +1,35 @@
 import numpy as np
-import pandas as pd
-from scipy.signal import medfilt
-from scipy.interpolate import UnivariateSpline
+from funcfilterkernels import funcmovingaverage, funcmedianfilter
 
 def funcfilterprofile(profile, settings):
+    # profile: (Punkte, 2) oder mehrere Profile gleicher Länge mit der Form (Anzahl, Punkte, 2)
     if settings['filter'] == 'Smoothing Spline':
+        from scipy.interpolate import UnivariateSpline  # SciPy nur für diesen Filter laden
         profile_filtered = profile.copy()
-        spline = UnivariateSpline(profile[:, 0], profile[:, 1], s=settings['smoothparam'])
-        profile_filtered[:, 1] = spline(profile_filtered[:, 0])
+        for single, single_filtered in zip(profile.reshape(-1, *profile.shape[-2:]), profile_filtered.reshape(-1, *profile.shape[-2:])):
+            spline = UnivariateSpline(single[:, 0], single[:, 1], s=settings['smoothparam'])
+            single_filtered[:, 1] = spline(single_filtered[:, 0])
     elif settings['filter'] == 'Moving Average':
         profile_filtered = profile.copy()
-        profile_filtered[:, 1] = pd.Series(profile[:, 1]).rolling(window=int(settings['smoothparam']), min_periods=1, center=True).mean().to_numpy()
+        profile_filtered[..., 1] = funcmovingaverage(profile[..., 1], settings['smoothparam'])
     elif settings['filter'] == 'Median':
         profile_filtered = profile.copy()
-        profile_filtered[:, 1] = medfilt(profile[:, 1], kernel_size=int(settings['smoothparam']))
+        profile_filtered[..., 1] = funcmedianfilter(profile[..., 1], settings['smoothparam'])
     elif settings['filter'] == 'Moving Average + Median':
         profile_filtered = profile.copy()
         if len(settings['smoothparam']) != 2:
             raise ValueError('A vector as Smoothparameter is required for this filter method')
-        profile_filtered[:, 1] = pd.Series(profile[:, 1]).rolling(window=int(settings['smoothparam'][0]), min_periods=1, center=True).mean().to_numpy()
-        profile_filtered[:, 1] = medfilt(profile_filtered[:, 1], kernel_size=int(settings['smoothparam'][1]))
+        profile_filtered[..., 1] = funcmovingaverage(profile[..., 1], settings['smoothparam'][0])
+        profile_filtered[..., 1] = funcmedianfilter(profile_filtered[..., 1], settings['smoothparam'][1])
     elif settings['filter'] == 'Median + Moving Average':
         profile_filtered = profile.copy()
         if len(settings['smoothparam']) != 2:
             raise ValueError('A vector as Smoothparameter is required for this filter method')
-        profile_filtered[:, 1] = medfilt(profile[:, 1], kernel_size=int(settings['smoothparam'][0]))
-        profile_filtered[:, 1] = pd.Series(profile_filtered[:, 1]).rolling(window=int(settings['smoothparam'][1]), min_periods=1, center=True).mean().to_numpy()
+        profile_filtered[..., 1] = funcmedianfilter(profile[..., 1], settings['smoothparam'][0])
+        profile_filtered[..., 1] = funcmovingaverage(profile_filtered[..., 1], settings['smoothparam'][1])
     elif settings['filter'] == 'none':
         profile_filtered = profile
     else:
         raise ValueError('Unknown filtermethod')
 
-    return profile_filtered
\ No newline at end of file
+    return profile_filtered
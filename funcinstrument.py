@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import heapq
+import cProfile
+import numpy as np
+
+
+class Instrument:
+    """
+    Erfasst Laufzeit, Punktanzahl und Speichergröße der Stufen der Auswertung je Datei.
+
+    Jede Stufe wird mit 'with instrument.stage(name, data) as stage:' umschlossen und meldet ihr
+    Ergebnis über stage.output(result). Die Messwerte werden als Dictionary mit den Schlüsseln 'file',
+    'stage', 'time' (s), 'n_in', 'n_out' (Punktanzahl) und 'bytes_out' (Größe der Ergebnis-Arrays) an
+    alle Ausgaben (sinks) weitergegeben. Ohne Messung wird NULL_INSTRUMENT verwendet, dessen Aufrufe
+    nahezu keine Kosten verursachen.
+
+    Parameters:
+        sinks (list): Ausgaben, z.B. MemorySink, JsonLinesSink oder ProfileSink.
+    """
+
+    enabled = True
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self.filename = None
+
+    def file(self, filename):
+        """Kontext für die Auswertung einer Datei; Stufen darin werden der Datei zugeordnet."""
+        return _FileContext(self, filename)
+
+    def stage(self, name, data=None):
+        """Kontext für eine Stufe mit den Eingangsdaten data."""
+        return _StageContext(self, name, data)
+
+    def record(self, record):
+        """Gibt einen Messwert an alle Ausgaben weiter (z.B. aus einem anderen Prozess)."""
+        for sink in self.sinks:
+            sink.record(record)
+
+    def close(self):
+        """Schließt alle Ausgaben."""
+        for sink in self.sinks:
+            sink.close()
+
+
+class _NullInstrument:
+    """Instrument ohne Messung, alle Aufrufe geben wiederverwendete, leere Kontexte zurück."""
+
+    enabled = False
+
+    def file(self, filename):
+        return _NULL_CONTEXT
+
+    def stage(self, name, data=None):
+        return _NULL_CONTEXT
+
+    def record(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def output(self, result):
+        pass
+
+
+_NULL_CONTEXT = _NullContext()
+NULL_INSTRUMENT = _NullInstrument()
+
+
+class _FileContext:
+    def __init__(self, instrument, filename):
+        self.instrument = instrument
+        self.filename = filename
+
+    def __enter__(self):
+        self.instrument.filename = self.filename
+        for sink in self.instrument.sinks:
+            sink.begin_file(self.filename)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        for sink in self.instrument.sinks:
+            sink.end_file(self.filename, duration)
+        self.instrument.filename = None
+        return False
+
+
+class _StageContext:
+    def __init__(self, instrument, name, data):
+        self.instrument = instrument
+        self.record = {'file': instrument.filename, 'stage': name, 'time': np.nan,
+                       'n_in': _npoints(data), 'n_out': None, 'bytes_out': None}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['time'] = time.perf_counter() - self.start
+        self.instrument.record(self.record)
+        return False
+
+    def output(self, result):
+        """Meldet das Ergebnis der Stufe für Punktanzahl und Speichergröße."""
+        self.record['n_out'] = _npoints(result)
+        self.record['bytes_out'] = _nbytes(result)
+
+
+def _npoints(data):
+    """Anzahl der Punkte eines Profils (erste Dimension), None für andere Daten."""
+    if isinstance(data, np.ndarray) and data.ndim:
+        return int(data.shape[0])
+    return None
+
+
+def _nbytes(data):
+    """Speichergröße aller Arrays in data (auch in Listen und Dictionaries)."""
+    if isinstance(data, np.ndarray):
+        return int(data.nbytes)
+    if isinstance(data, dict):
+        return sum(_nbytes(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return sum(_nbytes(value) for value in data)
+    return 0
+
+
+class _Sink:
+    """Basisklasse der Ausgaben, alle Methoden sind optional."""
+
+    def begin_file(self, filename):
+        pass
+
+    def end_file(self, filename, duration):
+        pass
+
+    def record(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemorySink(_Sink):
+    """
+    Sammelt die Messwerte im Speicher und fasst sie je Stufe zusammen.
+
+    Parameters:
+        keep_records (bool): True, um zusätzlich alle einzelnen Messwerte zu speichern.
+    """
+
+    def __init__(self, keep_records=False):
+        self.keep_records = keep_records
+        self.records = []
+        self.stages = {}
+
+    def record(self, record):
+        if self.keep_records:
+            self.records.append(record)
+        stage = self.stages.setdefault(record['stage'], {'count': 0, 'time': 0.0, 'max_time': 0.0, 'max_bytes': 0})
+        stage['count'] += 1
+        stage['time'] += record['time']
+        stage['max_time'] = max(stage['max_time'], record['time'])
+        stage['max_bytes'] = max(stage['max_bytes'], record['bytes_out'] or 0)
+
+    def summary(self):
+        """
+        Zusammenfassung je Stufe.
+
+        Returns:
+            dict: Je Stufe 'count', 'time' (Summe), 'mean_time', 'max_time' und 'max_bytes'.
+        """
+        return {name: dict(stage, mean_time=stage['time'] / stage['count']) for name, stage in self.stages.items()}
+
+
+class JsonLinesSink(_Sink):
+    """
+    Schreibt jeden Messwert als eine JSON-Zeile in eine Datei.
+
+    Parameters:
+        filepath (str): Pfad der Ausgabedatei.
+    """
+
+    def __init__(self, filepath):
+        self.file = open(filepath, 'a')
+
+    def record(self, record):
+        self.file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ProfileSink(_Sink):
+    """
+    Erstellt ein cProfile-Profil je Datei und speichert die Profile der langsamsten Dateien.
+
+    Nur im aktuellen Prozess wirksam (z.B. funcbatch mit workers=1).
+
+    Parameters:
+        folder (str): Ordner für die .prof-Dateien (auswertbar z.B. mit pstats oder snakeviz).
+        n_slowest (int): Anzahl der gespeicherten Profile.
+    """
+
+    def __init__(self, folder, n_slowest=5):
+        self.folder = folder
+        self.n_slowest = n_slowest
+        self.slowest = []  # Heap aus (Dauer, Nummer, Dateiname, Profil)
+        self.count = 0
+        self.profiler = None
+
+    def begin_file(self, filename):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def end_file(self, filename, duration):
+        self.profiler.disable()
+        self.count += 1
+        entry = (duration, self.count, filename, self.profiler)
+        if len(self.slowest) < self.n_slowest:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+        self.profiler = None
+
+    def close(self):
+        os.makedirs(self.folder, exist_ok=True)
+        for rank, (duration, _, filename, profiler) in enumerate(sorted(self.slowest, reverse=True)):
+            name = os.path.splitext(os.path.basename(str(filename)))[0]
+            profiler.dump_stats(os.path.join(self.folder, f'{rank + 1:02d}_{name}.prof'))
@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+import warnings
+import numpy as np
+from funcstagecache import funcfilehash
+
+
+def funcreadasc(filepath):
+    """
+    Liest eine ASCII-Datei mit Kopfzeilen und Punktdaten in einem Durchgang.
+
+    Kopfzeilen sind alle Zeilen am Dateianfang, die nicht mit einer Zahl beginnen. Einträge der Form
+    'Schlüssel=Wert' (z.B. 'kt=2.817') werden als Metadaten übernommen, Zahlenwerte als float.
+    Die Punktdaten werden in einem Block und ohne zeilenweise Verarbeitung in Python eingelesen.
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei.
+
+    Returns:
+    data (np.ndarray): 2D-Array mit einer Zeile je Punkt und einer Spalte je Koordinate.
+    header (dict): Metadaten aus den Kopfzeilen.
+    """
+    with open(filepath, 'r') as file:
+        text = file.read()
+
+    # Kopfzeilen abtrennen
+    header = {}
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start)
+        end = len(text) if end == -1 else end
+        line = text[start:end].strip()
+        if line and (line[0].isdigit() or line[0] in '+-.'):
+            break
+        for entry in line.replace(';', ' ').replace(',', ' ').split():
+            key, sep, value = entry.partition('=')
+            if sep:
+                try:
+                    header[key] = float(value)
+                except ValueError:
+                    header[key] = value
+        start = end + 1
+
+    # Punktdaten als Block einlesen
+    body = text[start:]
+    first_line = body.split('\n', 1)[0]
+    n_cols = len(first_line.split())
+    with warnings.catch_warnings():
+        # Nicht lesbare Werte beenden np.fromstring nur mit einer Warnung
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            data = np.fromstring(body, sep=' ')
+        except DeprecationWarning:
+            raise ValueError(f'Invalid point data in {filepath}') from None
+    if n_cols == 0 or data.size % n_cols != 0:
+        raise ValueError(f'Invalid point data in {filepath}')
+
+    return data.reshape(-1, n_cols), header
+
+
+def funcloadprofile(filepath, cache='off', cachefolder=None):
+    """
+    Liest eine ASCII-Datei, optional über einen binären Zwischenspeicher neben der Quelldatei.
+
+    Der Zwischenspeicher besteht aus einer .npy-Datei mit den Punktdaten und einer .json-Datei mit den
+    Metadaten sowie absolutem Pfad, Änderungszeit, Größe und Inhalts-Hash der Quelldatei. Die Dateien
+    sind nach dem Dateinamen und einem Hash des absoluten Pfads benannt, sodass gleichnamige Dateien
+    aus verschiedenen Ordnern in einem gemeinsamen 'cachefolder' getrennt bleiben. Ändert sich eine
+    der Angaben, wird die Quelldatei neu eingelesen und der Zwischenspeicher ersetzt. Zwischen-
+    gespeicherte Daten werden speicherabgebildet (memory-mapped, nur lesend) geladen.
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei.
+    cache (str): 'on' für den Zwischenspeicher, 'off' für direktes Einlesen.
+    cachefolder (str): Ordner für den Zwischenspeicher (None: Ordner der Quelldatei).
+
+    Returns:
+    data (np.ndarray): 2D-Array mit einer Zeile je Punkt und einer Spalte je Koordinate.
+    header (dict): Metadaten aus den Kopfzeilen.
+    """
+    if cache == 'off':
+        return funcreadasc(filepath)
+    elif cache != 'on':
+        raise ValueError('Unknown cache mode')
+
+    abspath = os.path.abspath(filepath)
+    folder = cachefolder if cachefolder is not None else os.path.dirname(abspath)
+    pathhash = hashlib.sha256(abspath.encode()).hexdigest()[:16]
+    basename = os.path.join(folder, f'{os.path.basename(filepath)}.{pathhash}')
+    datapath, metapath = basename + '.npy', basename + '.json'
+
+    stat = os.stat(filepath)
+    source = {'path': abspath, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+              'sha256': funcfilehash(filepath)}
+
+    # Gültigen Zwischenspeicher verwenden (Hash lesen ist deutlich schneller als Einlesen der Punktdaten)
+    try:
+        with open(metapath, 'r') as file:
+            meta = json.load(file)
+        if meta['source'] == source:
+            return np.load(datapath, mmap_mode='r'), meta['header']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # Quelldatei einlesen und Zwischenspeicher (atomar) schreiben
+    data, header = funcreadasc(filepath)
+    os.makedirs(folder, exist_ok=True)
+    tmp_suffix = f'.{os.getpid()}.tmp'
+    with open(datapath + tmp_suffix, 'wb') as file:
+        np.save(file, data)
+    with open(metapath + tmp_suffix, 'w') as file:
+        json.dump({'source': source, 'header': header}, file)
+    os.replace(datapath + tmp_suffix, datapath)
+    os.replace(metapath + tmp_suffix, metapath)
+
+    return data, header
@@ -0,0 +1,96 @@
+import numpy as np
+from funcderivation import func_derivation
+from funcfilterkernels import funcmovingaverage
+
+# Schlüssel der Ergebnisse, die Indizes des Profils enthalten
+_INDEX_KEYS = ['DP_SP', 'DP_EP']
+
+# Schlüssel der Ergebnisse, die Indizes von Gradient und Krümmung enthalten (Index i: Profilpunkt i + 1)
+_DERIVATIVE_KEYS = ['DP_toe', 'DP']
+
+
+def funclocatetoe(profile, settings):
+    """
+    Bestimmt einen Auswertebereich um den Nahtübergang anhand einer reduzierten, geglätteten Kopie des Profils.
+
+    Die y-Werte werden über 'decimation' Punkte gemittelt und nur jeder 'decimation'-te Punkt verwendet.
+    Der Nahtübergang ist der Punkt maximaler Krümmung dieser Kopie. Der Bereich umfasst alle
+    zusammenhängenden Punkte um den Nahtübergang, deren x-Abstand höchstens 'halfwidth' beträgt.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    settings (dict): Einstellungen settings['Localization'] mit den Schlüsseln:
+                     - 'mode': 'on' für einen Auswertebereich, 'off' für das gesamte Profil.
+                     - 'decimation': Reduktionsfaktor für die Suche des Nahtübergangs.
+                     - 'halfwidth': Halbe Breite des Auswertebereichs in x (mm).
+
+    Returns:
+    tuple: Erster Index und Index nach dem letzten Punkt des Bereichs (start, stop).
+    """
+    n_points = len(profile)
+    if settings['mode'] == 'off':
+        return 0, n_points
+    elif settings['mode'] != 'on':
+        raise ValueError('Unknown localization mode')
+
+    decimation = max(int(settings['decimation']), 1)
+    if n_points // decimation < 5:
+        return 0, n_points
+
+    # Reduzierte, geglättete Kopie (Punkt k entspricht dem Profilpunkt k * decimation)
+    coarse = np.column_stack((profile[::decimation, 0], funcmovingaverage(profile[:, 1], decimation)[::decimation]))
+    _, curvature = func_derivation(coarse, 1.0)
+    DP_toe = (np.argmax(curvature[:, 1]) + 1) * decimation
+
+    return functoewindow(profile, DP_toe, settings['halfwidth'])
+
+
+def functoewindow(profile, DP_toe, halfwidth, start=0, stop=None):
+    """
+    Zusammenhängender Bereich um einen Punkt, dessen Punkte höchstens halfwidth Abstand in x haben.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    DP_toe (int): Index des Punkts in der Mitte des Bereichs.
+    halfwidth (float): Halbe Breite des Bereichs in x (mm).
+    start, stop (int): Optional, Grenzen, die der Bereich nicht überschreitet (stop exklusiv).
+
+    Returns:
+    tuple: Erster Index und Index nach dem letzten Punkt des Bereichs (start, stop).
+    """
+    stop = len(profile) if stop is None else stop
+    outside = np.abs(profile[start:stop, 0] - profile[DP_toe, 0]) > halfwidth
+    before = np.flatnonzero(outside[:DP_toe - start])
+    after = np.flatnonzero(outside[DP_toe - start:])
+    first = start + before[-1] + 1 if len(before) else start
+    last = DP_toe + after[0] if len(after) else stop
+    return int(first), int(last)
+
+
+def funcshiftresults(results, offset, reverse=False):
+    """
+    Verschiebt die Indizes eines Ergebnisses (z.B. aus funcevalLSM) um offset.
+
+    Parameters:
+    results (dict): Ergebnis einer Auswertefunktion für einen Ausschnitt des Profils.
+    offset (int): Erster Index des Ausschnitts im Profil (negativ für die Umkehrung).
+    reverse (bool): True, wenn der Ausschnitt in umgekehrter Reihenfolge ausgewertet wurde (offset: letzter
+                    Index des Ausschnitts im Profil). Ein Index i des Profils wird dann zu offset - i, ein
+                    Index i von Gradient und Krümmung ('DP_toe', 'DP') zu offset - 2 - i, da Gradient und
+                    Krümmung um einen Punkt gegenüber dem Profil versetzt sind.
+
+    Returns:
+    dict: Kopie des Ergebnisses mit Indizes bezogen auf das gesamte Profil.
+    """
+    if offset == 0 and not reverse:
+        return results
+    shifted = dict(results)
+    for key in _INDEX_KEYS + _DERIVATIVE_KEYS:
+        if key in shifted and not np.isnan(shifted[key]):
+            if not reverse:
+                shifted[key] = shifted[key] + offset
+            elif key in _DERIVATIVE_KEYS:
+                shifted[key] = offset - 2 - shifted[key]
+            else:
+                shifted[key] = offset - shifted[key]
+    return shifted
@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class MomentIndex:
+    """
+    Kumulierte Momente eines Profils für die Kreisanpassung (Kleinste Quadrate, algebraisch) in beliebigen Bereichen.
+
+    Für die Punkte des Profils werden die Summen von 1, x, y, x², xy, y², x³, x²y, xy² und y³ einmal
+    kumuliert. Die Summen eines Indexbereichs ergeben sich daraus als Differenz zweier Einträge, sodass
+    die Anpassung für jeden Bereich unabhängig von seiner Länge in konstanter Zeit gelöst wird. Die
+    Lösung entspricht der Anpassung in funcevalLSM (np.linalg.lstsq) bis auf Rundungsfehler.
+
+    Die Summen werden vom Bezugsindex anchor aus in beide Richtungen kumuliert und die Koordinaten um den
+    Punkt an diesem Index verschoben. Bereiche nahe am Bezugsindex (z.B. um den Nahtübergang) werden
+    dadurch aus kleinen Teilsummen berechnet und bleiben frei von Auslöschungsfehlern.
+
+    Attributes:
+        profile (numpy.ndarray): 2D-Array mit den Profilpunkten (x, y).
+        anchor (int): Bezugsindex der kumulierten Momente.
+        origin (numpy.ndarray): Profilpunkt am Bezugsindex.
+    """
+
+    def __init__(self, profile, anchor=None):
+        self.profile = np.asarray(profile, dtype=float)
+        self.anchor = len(self.profile) // 2 if anchor is None else int(anchor)
+        self.origin = self.profile[self.anchor].copy()
+        x = self.profile[:, 0] - self.origin[0]
+        y = self.profile[:, 1] - self.origin[1]
+        moments = np.stack((np.ones_like(x), x, y, x * x, x * y, y * y, x**3, x * x * y, x * y * y, y**3))
+
+        # Eintrag i enthält die Summe der Punkte anchor bis i - 1 (vor anchor mit negativem Vorzeichen)
+        self._cumsum = np.zeros((moments.shape[0], len(x) + 1))
+        np.cumsum(moments[:, self.anchor:], axis=1, out=self._cumsum[:, self.anchor + 1:])
+        self._cumsum[:, :self.anchor] = -np.cumsum(moments[:, :self.anchor][:, ::-1], axis=1)[:, ::-1]
+
+    def sums(self, start, stop):
+        """
+        Summen der Momente für die Punkte start bis stop (einschließlich).
+
+        Parameters:
+            start (int or numpy.ndarray): Erster Index des Bereichs.
+            stop (int or numpy.ndarray): Letzter Index des Bereichs.
+
+        Returns:
+            numpy.ndarray: Summen von 1, x, y, x², xy, y², x³, x²y, xy², y³ (erste Achse), relativ zu origin.
+        """
+        start = np.asarray(start)
+        stop = np.maximum(np.asarray(stop) + 1, start)
+        return self._cumsum[:, stop] - self._cumsum[:, start]
+
+    def fit(self, start, stop):
+        """
+        Kreisanpassung für die Punkte start bis stop (einschließlich), auch für viele Bereiche gleichzeitig.
+
+        Parameters:
+            start (int or numpy.ndarray): Erster Index des Bereichs.
+            stop (int or numpy.ndarray): Letzter Index des Bereichs.
+
+        Returns:
+            MP (numpy.ndarray): Kreismittelpunkt(e), letzte Achse (x, y).
+            radius (float or numpy.ndarray): Radius bzw. Radien; NaN bei weniger als drei Punkten oder
+                                             Punkten auf einer Geraden.
+        """
+        n, Sx, Sy, Sxx, Sxy, Syy, Sxxx, Sxxy, Sxyy, Syyy = self.sums(start, stop)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Zentrale Momente (Koordinaten relativ zum Schwerpunkt des Bereichs)
+            mx = Sx / n
+            my = Sy / n
+            Cuu = Sxx - mx * Sx
+            Cuv = Sxy - mx * Sy
+            Cvv = Syy - my * Sy
+            Cuuu = Sxxx - 3 * mx * Sxx + 2 * n * mx**3
+            Cuuv = Sxxy - my * Sxx - 2 * mx * Sxy + 2 * n * mx**2 * my
+            Cuvv = Sxyy - mx * Syy - 2 * my * Sxy + 2 * n * mx * my**2
+            Cvvv = Syyy - 3 * my * Syy + 2 * n * my**3
+
+            # Normalgleichungen im Schwerpunktsystem: c0 = (Cuu + Cvv) / n, 2x2-System für c1 und c2
+            det = Cuu * Cvv - Cuv**2
+            b1 = Cuuu + Cuvv
+            b2 = Cuuv + Cvvv
+            c1 = (Cvv * b1 - Cuv * b2) / det
+            c2 = (Cuu * b2 - Cuv * b1) / det
+            c0 = (Cuu + Cvv) / n
+            radius = np.sqrt(c0 + (c1 / 2)**2 + (c2 / 2)**2)
+
+        # Weniger als drei Punkte oder (nahezu) auf einer Geraden
+        degenerate = (n < 3) | ~(np.abs(det) > 1e-12 * (Cuu + Cvv)**2)
+        radius = np.where(degenerate, np.nan, radius)
+        MP = np.stack((mx + c1 / 2, my + c2 / 2), axis=-1) + self.origin
+        MP = np.where(np.asarray(degenerate)[..., None], np.nan, MP)
+        return MP, radius[()]
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.interpolate import interp1d
 
 def funcprofilesorting(profile, settings):
     if settings['ordermethod'] == 'ordered':
@@ -12,13 +11,154 @@ def funcprofilesorting(profile, settings):
         profile = profile[unique_indices]
 
         xq = np.arange(xmin, xmax + xdelta, xdelta)  # Neue x-Werte mit dem gegebenen Abstand
-        interpolator = interp1d(profile[:, 0], profile[:, 1], kind=settings['interpmethod'], fill_value='extrapolate')
-        vq = interpolator(xq)
+        if settings['interpmethod'] == 'linear':
+            # Lineare Interpolation mit NumPy (wie interp1d mit Extrapolation), ohne SciPy zu laden
+            vq = _interpbatch([profile[:, 0]], [profile[:, 1:2]], xq[None])[0, :, 0]
+        else:
+            from scipy.interpolate import interp1d  # SciPy nur für nichtlineare Interpolation laden
+            interpolator = interp1d(profile[:, 0], profile[:, 1], kind=settings['interpmethod'], fill_value='extrapolate')
+            vq = interpolator(xq)
 
-        profile_new = np.column_stack((xq, vq))
+        # Ergebnis im Datentyp des Profils (float32 im kompakten Modus), Interpolation in float64
+        profile_new = np.empty((len(xq), 2), dtype=np.result_type(profile.dtype, np.float32))
+        profile_new[:, 0] = xq
+        profile_new[:, 1] = vq
     elif settings['ordermethod'] == 'none':
         profile_new = profile
     else:
         raise ValueError('Unknown ordermethod')
 
-    return profile_new
\ No newline at end of file
+    return profile_new
+
+def funcprofilesortingbatch(profiles, settings, grid='shared', arclength=False):
+    """
+    Bringt viele Schnitte (unterschiedliche Punktanzahl) auf gleiche Punktabstände in einem gemeinsamen Array.
+
+    Mit grid='shared' werden alle Schnitte auf dasselbe Raster (Abstand 'orderdistance') vom kleinsten bis
+    zum größten Bereich aller Schnitte interpoliert, Rasterpunkte außerhalb des Bereichs eines Schnitts sind
+    in mask False. Mit grid='section' erhält jeder Schnitt sein eigenes Raster wie in funcprofilesorting, die
+    Schnitte werden am Ende mit NaN aufgefüllt. Bei linearer Interpolation ('interpmethod': 'linear') werden
+    alle Schnitte gemeinsam ohne Python-Schleife interpoliert, andere Verfahren verwenden interp1d je Schnitt.
+
+    Mit arclength=True wird statt über x über die Bogenlänge entlang des Profils interpoliert (x und y), die
+    Punkte müssen dafür in der Reihenfolge entlang des Profils vorliegen. Das Raster beginnt dann bei 0.
+
+    Parameters:
+    profiles (list of np.ndarray): 2D-Arrays mit den Profilpunkten (x, y) je Schnitt.
+    settings (dict): Einstellungen aus loadsettings ('ordermethod', 'orderdistance', 'interpmethod').
+    grid (str): 'shared' oder 'section'.
+    arclength (bool): True für Interpolation über die Bogenlänge.
+
+    Returns:
+    profiles (np.ndarray): 3D-Array (n_sections, n_points, 2) mit den Profilpunkten, außerhalb von mask NaN.
+    mask (np.ndarray): 2D-Array (n_sections, n_points), True für gültige Punkte.
+    """
+    profiles = [np.asarray(profile, dtype=float)[:, :2] for profile in profiles]
+    if len(profiles) == 0:
+        return np.empty((0, 0, 2)), np.empty((0, 0), dtype=bool)
+
+    if settings['ordermethod'] == 'none':
+        return _stacksections(profiles)
+    elif settings['ordermethod'] != 'ordered':
+        raise ValueError('Unknown ordermethod')
+    if grid not in ('shared', 'section'):
+        raise ValueError('Unknown grid')
+
+    # Stützstellen je Schnitt: x ohne Duplikate (wie funcprofilesorting) oder Bogenlänge ohne doppelte Punkte
+    knots, values = [], []
+    for profile in profiles:
+        if arclength:
+            step = np.hypot(np.diff(profile[:, 0]), np.diff(profile[:, 1]))
+            keep = np.concatenate(([True], step > 0))
+            knots.append(np.concatenate(([0.0], np.cumsum(step[step > 0]))))
+            values.append(profile[keep])
+        else:
+            _, unique_indices = np.unique(profile[:, 0], return_index=True)
+            knots.append(profile[unique_indices, 0])
+            values.append(profile[unique_indices, 1:2])
+
+    # Raster je Schnitt bzw. gemeinsames Raster
+    xdelta = settings['orderdistance']
+    if arclength:
+        lower = np.zeros(len(knots))
+        upper = np.array([k[-1] for k in knots])
+    else:
+        lower = np.array([np.ceil(k[0]) for k in knots])
+        upper = np.array([np.floor(k[-1]) for k in knots])
+    if grid == 'shared':
+        xq = np.arange(np.min(lower), np.max(upper) + xdelta, xdelta)
+        queries = np.broadcast_to(xq, (len(knots), len(xq)))
+        mask = (queries >= lower[:, None] - 1e-9 * xdelta) & (queries <= upper[:, None] + 1e-9 * xdelta)
+    else:
+        grids = [np.arange(lo, hi + xdelta, xdelta) for lo, hi in zip(lower, upper)]
+        n_points = max(len(g) for g in grids)
+        queries = np.full((len(knots), n_points), np.nan)
+        mask = np.zeros((len(knots), n_points), dtype=bool)
+        for i, g in enumerate(grids):
+            queries[i, :len(g)] = g
+            mask[i, :len(g)] = True
+
+    if settings['interpmethod'] == 'linear':
+        interpolated = _interpbatch(knots, values, queries)
+    else:
+        from scipy.interpolate import interp1d  # SciPy nur für nichtlineare Interpolation laden
+        interpolated = np.full(queries.shape + (values[0].shape[1],), np.nan)
+        for i, (k, v) in enumerate(zip(knots, values)):
+            interpolator = interp1d(k, v, kind=settings['interpmethod'], axis=0, fill_value='extrapolate')
+            interpolated[i, mask[i]] = interpolator(queries[i, mask[i]])
+
+    if arclength:
+        result = interpolated
+    else:
+        result = np.concatenate((queries[..., None], interpolated), axis=-1)
+    result = np.where(mask[..., None], result, np.nan)
+    return result, mask
+
+
+def _interpbatch(knots, values, queries):
+    """
+    Lineare Interpolation (mit linearer Extrapolation wie interp1d) vieler Schnitte in einem Schritt.
+
+    Die Stützstellen aller Schnitte werden hintereinander gelegt und die Abfragepunkte mit einem
+    Versatz je Schnitt gemeinsam einsortiert.
+
+    Parameters:
+    knots (list of np.ndarray): Aufsteigende Stützstellen je Schnitt (mindestens zwei).
+    values (list of np.ndarray): Werte an den Stützstellen je Schnitt, 2D-Array (n_knots, n_values).
+    queries (np.ndarray): 2D-Array (n_sections, n_points) mit den Abfragepunkten (NaN wird ignoriert).
+
+    Returns:
+    np.ndarray: 3D-Array (n_sections, n_points, n_values) mit den interpolierten Werten.
+    """
+    lengths = np.array([len(k) for k in knots])
+    if np.any(lengths < 2):
+        raise ValueError('At least two distinct points per section are required')
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    x = np.concatenate(knots)
+    y = np.concatenate(values)
+
+    # Versatz je Schnitt, damit die Stützstellen aller Schnitte eine aufsteigende Folge bilden
+    low = min(np.min(x), np.nanmin(queries))
+    span = max(np.max(x), np.nanmax(queries)) - low + 1.0
+    offset = np.arange(len(knots))[:, None] * span
+    section = np.repeat(np.arange(len(knots)), lengths)
+    keys = x - low + section * span
+    local = np.searchsorted(keys, np.nan_to_num(queries - low + offset, nan=0.0), side='left') - starts[:, None]
+
+    # Randintervalle für die Extrapolation verwenden
+    local = np.clip(local, 1, lengths[:, None] - 1)
+    hi = local + starts[:, None]
+    lo = hi - 1
+    slope = (y[hi] - y[lo]) / (x[hi] - x[lo])[..., None]
+    return slope * (queries - x[lo])[..., None] + y[lo]
+
+
+def _stacksections(profiles):
+    """Legt Schnitte unterschiedlicher Länge in ein mit NaN aufgefülltes 3D-Array (mit Maske) ab."""
+    n_points = max(len(profile) for profile in profiles)
+    result = np.full((len(profiles), n_points, 2), np.nan)
+    mask = np.zeros((len(profiles), n_points), dtype=bool)
+    for i, profile in enumerate(profiles):
+        result[i, :len(profile)] = profile
+        mask[i, :len(profile)] = True
+    return result, mask
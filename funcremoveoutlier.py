@@ -1,15 +1,19 @@
 import numpy as np
-import pandas as pd
+from funcfilterkernels import funcrollingmedian3
 
 def funcremoveoutlier(profile, settings):
     if settings['outliermethod'] == 'remove':
-        # Verwenden von Pandas zur Entfernung von Ausreißern mittels gleitendem Median
-        df = pd.DataFrame(profile, columns=['x', 'y'])
-        df['y'] = df['y'].rolling(window=3, center=True).median()  # Verwenden von gleitendem Median mit Fenstergröße 3
-        mask = df['y'].notna()  # Maske für nicht-NaN-Werte
-        profile_new = df[mask].values  # Nur die Werte ohne NaN zurückgeben
+        # Gleitender Median mit Fenstergröße 3, Punkte ohne vollständiges Fenster (NaN) werden entfernt
+        median_y = funcrollingmedian3(profile[..., 1])
+        if profile.ndim == 2:
+            mask = ~np.isnan(median_y)  # Maske für nicht-NaN-Werte
+            profile_new = profile[mask, :2]  # eine Kopie im Datentyp des Profils (float32 im kompakten Modus)
+            profile_new[:, 1] = median_y[mask]
+        else:
+            # Mehrere Profile gleicher Länge (Form (Anzahl, Punkte, 2)): nur die Randpunkte entfernen
+            profile_new = np.stack((profile[..., 0], median_y), axis=-1)[..., 1:-1, :]
     elif settings['outliermethod'] == 'none':
         profile_new = profile
     else:
         raise ValueError('Unknown removemode')
-    return profile_new
\ No newline at end of file
+    return profile_new
@@ -0,0 +1,146 @@
+import os
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from funcfigresult import funcfigresult
+
+# Figur je Prozess, wird für alle Diagramme wiederverwendet
+_FIGURE = None
+
+
+def funcplotselect(radiusresults, settings):
+    """
+    Prüft, ob für einen Schnitt ein Diagramm ausgegeben werden soll.
+
+    Mit 'plotselect': 'outliers' werden nur auffällige Schnitte ausgegeben: eine Methode liefert
+    kein Ergebnis, 'maxdist' einer Methode ist größer als 'plotmaxdist' oder die Radien der Methoden
+    weichen um mehr als den Anteil 'plotdisagree' vom mittleren Radius (Median) ab.
+
+    Parameters:
+    radiusresults (list of dict): Radius-Ergebnisse [CM, LSM, IM].
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    bool: True, wenn ein Diagramm ausgegeben werden soll.
+    """
+    if settings['plotselect'] == 'all':
+        return True
+    elif settings['plotselect'] != 'outliers':
+        raise ValueError('Unknown plotselect')
+
+    radii = np.array([r['radius'] for r in radiusresults], dtype=float)
+    maxdist = np.array([r['maxdist'] for r in radiusresults], dtype=float)
+    if np.any(~np.isfinite(radii)) or np.any(np.isnan(maxdist)):
+        return True
+    if np.any(maxdist > settings['plotmaxdist']):
+        return True
+    return (np.max(radii) - np.min(radii)) > settings['plotdisagree'] * np.median(radii)
+
+
+def funcplotpath(filepath, settings):
+    """
+    Pfad der Diagrammdatei für eine ausgewertete Datei.
+
+    Der Dateiname enthält einen Hash des absoluten Pfads, damit gleichnamige Dateien aus verschiedenen
+    Ordnern sich nicht überschreiben.
+    """
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    pathhash = hashlib.sha256(os.path.abspath(filepath).encode()).hexdigest()[:8]
+    return os.path.join(settings['plotfolder'], f"{name}_{pathhash}.{settings['plotformat']}")
+
+
+def funcrenderresult(outputpath, profile, radiusresults, angleresults):
+    """
+    Speichert das Ergebnisdiagramm eines Schnitts als Datei (PNG, SVG, PDF, je nach Dateiendung).
+
+    Es wird kein interaktives Backend verwendet. Die Figur wird je Prozess einmal erstellt und für
+    alle weiteren Diagramme wiederverwendet.
+
+    Parameters:
+    outputpath (str): Pfad der Diagrammdatei.
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y).
+    radiusresults (list of dict): Radius-Ergebnisse (siehe funcfigresult).
+    angleresults (list of dict): Winkel-Ergebnisse (siehe funcfigresult).
+    """
+    global _FIGURE
+    if _FIGURE is None:
+        from matplotlib.figure import Figure
+        _FIGURE = Figure(figsize=(8 / 2.54, 6 / 2.54))  # Umrechnung von cm in inch
+        _FIGURE.add_subplot()
+    funcfigresult(profile, radiusresults, angleresults, ax=_FIGURE.axes[0])
+    os.makedirs(os.path.dirname(os.path.abspath(outputpath)), exist_ok=True)
+    _FIGURE.savefig(outputpath)
+
+
+def _renderjob(job):
+    """Erstellt ein Diagramm aus einem Auftrag (outputpath, profile, radiusresults, angleresults)."""
+    try:
+        funcrenderresult(*job)
+        return None
+    except Exception as error:
+        return f'{type(error).__name__}: {error}'
+
+
+class RenderQueue:
+    """
+    Erstellt Diagramme in einem eigenen Prozesspool, während die Auswertung weiterläuft.
+
+    Aufträge werden sofort übergeben, sodass Profile und Ergebnisse nicht bis zum Ende eines Laufs
+    gehalten werden. Warten mehr als maxpending Aufträge, blockiert submit, bis der älteste erstellt
+    ist (begrenzter Speicher bei langsamer Ausgabe). Mit workers = 1 wird direkt im Prozess gezeichnet.
+
+    Parameters:
+        workers (int): Anzahl der Prozesse (None: Anzahl der CPU-Kerne, 1: ohne Prozesspool).
+        maxpending (int): Größte Anzahl wartender Aufträge (None: 4 je Prozess).
+    """
+
+    def __init__(self, workers=None, maxpending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.maxpending = maxpending or 4 * self.workers
+        self.errors = {}
+        self._pending = deque()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def submit(self, key, job):
+        """
+        Übergibt einen Auftrag.
+
+        Parameters:
+            key: Schlüssel für die Fehlermeldung in errors (z.B. Index der Datei).
+            job (tuple): Pfad der Diagrammdatei (str), Profilpunkte (np.ndarray), Radius-Ergebnisse und
+                         Winkel-Ergebnisse (list of dict), siehe funcrenderresult.
+        """
+        if self._executor is None:
+            self.errors[key] = _renderjob(job)
+            return
+        self._pending.append((key, self._executor.submit(_renderjob, job)))
+        while len(self._pending) > self.maxpending:
+            self._collect()
+
+    def _collect(self):
+        key, future = self._pending.popleft()
+        try:
+            self.errors[key] = future.result()
+        except Exception as error:  # z.B. abgebrochener Prozess
+            self.errors[key] = f'{type(error).__name__}: {error}'
+
+    def close(self):
+        """
+        Wartet auf alle Aufträge und beendet den Prozesspool.
+
+        Returns:
+            dict: Fehlermeldung (oder None) je Schlüssel.
+        """
+        while self._pending:
+            self._collect()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return self.errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
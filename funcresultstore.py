@@ -0,0 +1,285 @@
+import os
+import shutil
+import numpy as np
+
+# Spalten des Ergebnisspeichers: Name, Datentyp und Form je Schnitt (Indizes ohne Ergebnis: -1)
+_POINT = (2,)
+STORE_FIELDS = [
+    ('CM.radius', 'f8', ()), ('CM.DP_toe', 'i8', ()), ('CM.SP', 'f8', _POINT), ('CM.MP', 'f8', _POINT),
+    ('CM.maxdist', 'f8', ()),
+    ('LSM.radius', 'f8', ()), ('LSM.DP_toe', 'i8', ()), ('LSM.DP_SP', 'i8', ()), ('LSM.DP_EP', 'i8', ()),
+    ('LSM.MP', 'f8', _POINT), ('LSM.SP', 'f8', _POINT), ('LSM.EP', 'f8', _POINT), ('LSM.maxdist', 'f8', ()),
+    ('IM.radius', 'f8', ()), ('IM.DP_SP', 'i8', ()), ('IM.DP_EP', 'i8', ()), ('IM.MP', 'f8', _POINT),
+    ('IM.SP', 'f8', _POINT), ('IM.EP', 'f8', _POINT), ('IM.maxdist', 'f8', ()),
+    ('angle_MAX.angle', 'f8', ()), ('angle_MAX.DP', 'i8', ()), ('angle_MAX.sign', 'f8', ()),
+    ('angle_END_LSM.angle', 'f8', ()), ('angle_END_LSM.DP', 'i8', ()), ('angle_END_LSM.sign', 'f8', ()),
+    ('angle_END_IM.angle', 'f8', ()), ('angle_END_IM.DP', 'i8', ()), ('angle_END_IM.sign', 'f8', ())
+]
+
+# Spalten der Ergebnistabelle (RESULT_COLUMNS in funcbatch) im Ergebnisspeicher
+TABLE_FIELDS = ['CM.radius', 'LSM.radius', 'IM.radius', 'angle_MAX.angle', 'angle_END_LSM.angle', 'angle_END_IM.angle']
+
+
+def funcsourcestamp(filepath):
+    """
+    Kennung des Stands einer Quelldatei aus Größe und Änderungszeit ('' wenn die Datei fehlt).
+
+    Parameters:
+    filepath (str): Pfad der Quelldatei.
+
+    Returns:
+    str: Kennung 'Größe:Änderungszeit in ns'.
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return ''
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def funcresultrecord(results):
+    """
+    Fasst alle Ergebnisse der Auswertemethoden eines Schnitts als flaches Dictionary zusammen.
+
+    Parameters:
+    results (dict): Ergebnisse aus funcevalprofile (None bei Fehler).
+
+    Returns:
+    dict: Ein Eintrag je Spalte aus STORE_FIELDS.
+    """
+    sources = {}
+    if results is not None:
+        sources.update(zip(['CM', 'LSM', 'IM'], results['radius']))
+        sources.update(zip(['angle_MAX', 'angle_END_LSM', 'angle_END_IM'], results['angle']))
+
+    record = {}
+    for name, dtype, shape in STORE_FIELDS:
+        method, key = name.split('.')
+        value = sources.get(method, {}).get(key)
+        if dtype == 'i8':
+            value = -1 if value is None or np.isnan(value) else int(value)
+        else:
+            value = np.full(shape, np.nan) if value is None else np.asarray(value, dtype=float).reshape(shape)
+        record[name] = value
+    return record
+
+
+class ResultStore:
+    """
+    Spaltenweiser Ergebnisspeicher, der während eines Laufs blockweise fortgeschrieben wird.
+
+    Jeder Block ist ein Ordner mit einer .npy-Datei je Spalte (STORE_FIELDS sowie 'key', 'error',
+    'source' und 'settings'). 'source' ist der Stand der Quelldatei (funcsourcestamp), 'settings' der
+    Schlüssel der Einstellungen (funcsettingskey). Blöcke werden zunächst in einen temporären Ordner
+    geschrieben und dann umbenannt, sodass nach einem Abbruch nur vollständige Blöcke vorhanden sind.
+    Über completed() lässt sich ein Lauf fortsetzen. consolidate() fasst am Ende eines Laufs alle Blöcke
+    zu einem zusammen, sodass column() die Spalte speicherabgebildet liefert; bei mehreren Blöcken
+    kopiert column() die Werte, columnchunks() liest dagegen blockweise speicherabgebildet.
+
+    Parameters:
+        folder (str): Ordner des Ergebnisspeichers.
+        chunkrows (int): Anzahl der Schnitte je Block.
+    """
+
+    def __init__(self, folder, chunkrows=256):
+        self.folder = folder
+        self.chunkrows = chunkrows
+        self._buffer = []
+        os.makedirs(folder, exist_ok=True)
+
+    def _chunks(self):
+        """Pfade der vollständigen Blöcke in der Reihenfolge des Schreibens."""
+        return sorted(entry.path for entry in os.scandir(self.folder)
+                      if entry.is_dir() and entry.name.startswith('chunk_') and '.' not in entry.name)
+
+    def _newchunk(self):
+        """Name und temporärer Ordner für den nächsten Block (Nummer nach dem letzten vorhandenen Block)."""
+        chunks = self._chunks()
+        name = f'chunk_{int(os.path.basename(chunks[-1])[6:]) + 1 if chunks else 0:06d}'
+        tmp_folder = os.path.join(self.folder, f'{name}.{os.getpid()}.tmp')
+        os.makedirs(tmp_folder, exist_ok=True)
+        return name, tmp_folder
+
+    def append(self, key, record, error=None, source='', settings=''):
+        """
+        Fügt das Ergebnis eines Schnitts hinzu; volle Blöcke werden sofort geschrieben.
+
+        Parameters:
+            key (str): Eindeutiger Schlüssel des Schnitts (z.B. Dateipfad).
+            record (dict): Ergebnis aus funcresultrecord.
+            error (str): Fehlermeldung oder None.
+            source (str): Stand der Quelldatei (funcsourcestamp).
+            settings (str): Schlüssel der Einstellungen (funcsettingskey).
+        """
+        self._buffer.append((key, record, error, source, settings))
+        if len(self._buffer) >= self.chunkrows:
+            self.flush()
+
+    def flush(self):
+        """Schreibt die gepufferten Ergebnisse als neuen Block."""
+        if not self._buffer:
+            return
+        keys, records, errors, sources, settings = zip(*self._buffer)
+        name, tmp_folder = self._newchunk()
+        columns = {'key': np.array(keys, dtype=str), 'error': np.array([e or '' for e in errors], dtype=str),
+                   'source': np.array(sources, dtype=str), 'settings': np.array(settings, dtype=str)}
+        for field, dtype, shape in STORE_FIELDS:
+            columns[field] = np.array([record[field] for record in records], dtype=dtype).reshape((-1,) + shape)
+        for field, values in columns.items():
+            np.save(os.path.join(tmp_folder, field + '.npy'), values)
+        os.rename(tmp_folder, os.path.join(self.folder, name))
+        self._buffer = []
+
+    def keys(self):
+        """Menge der Schlüssel aller gespeicherten Schnitte (ohne Puffer)."""
+        return set(key for keys in self.columnchunks('key') for key in keys.tolist())
+
+    def completed(self, sources, settings):
+        """
+        Schlüssel, deren zuletzt gespeichertes Ergebnis ohne Fehler mit demselben Stand der Quelldatei und
+        denselben Einstellungen berechnet wurde und daher nicht erneut ausgewertet werden muss.
+
+        Parameters:
+            sources (dict): Aktueller Stand der Quelldatei (funcsourcestamp) je Schlüssel.
+            settings (str): Schlüssel der aktuellen Einstellungen (funcsettingskey).
+
+        Returns:
+            completed (set): Schlüssel mit gültigem Ergebnis.
+            other_settings (int): Anzahl der Schlüssel, deren letztes Ergebnis andere Einstellungen hat.
+        """
+        latest = {}
+        for chunk in self._chunks():
+            columns = {}
+            for field in ['key', 'error', 'source', 'settings']:
+                path = os.path.join(chunk, field + '.npy')
+                columns[field] = np.load(path).tolist() if os.path.exists(path) else None
+            n_rows = len(columns['key'])
+            for field in ['source', 'settings']:
+                if columns[field] is None:
+                    columns[field] = [''] * n_rows  # Block ohne Stand und Einstellungen: nie gültig
+            latest.update((key, (error, source, key_settings)) for key, error, source, key_settings
+                          in zip(columns['key'], columns['error'], columns['source'], columns['settings']))
+
+        completed = set()
+        other_settings = 0
+        for key, source in sources.items():
+            if key not in latest:
+                continue
+            error, stored_source, stored_settings = latest[key]
+            if stored_settings != settings:
+                other_settings += 1
+            elif not error and source and stored_source == source:
+                completed.add(key)
+        return completed, other_settings
+
+    def consolidate(self):
+        """
+        Fasst alle Blöcke zu einem Block zusammen (spaltenweise, ohne alle Werte gleichzeitig zu laden).
+
+        Der neue Block wird wie in flush() erst nach dem vollständigen Schreiben umbenannt und erhält die
+        nächste Nummer, die alten Blöcke werden danach gelöscht. Nach einem Abbruch dazwischen enthält
+        der neue Block dieselben Ergebnisse wie die alten, das zuletzt geschriebene Ergebnis je Schlüssel
+        bleibt also unverändert.
+        """
+        self.flush()
+        chunks = self._chunks()
+        if len(chunks) < 2:
+            return
+        n_rows = [len(np.load(os.path.join(chunk, 'key.npy'), mmap_mode='r')) for chunk in chunks]
+        name, tmp_folder = self._newchunk()
+        for field in ['key', 'error', 'source', 'settings'] + [f for f, _, _ in STORE_FIELDS]:
+            paths = [os.path.join(chunk, field + '.npy') for chunk in chunks]
+            parts = [np.load(path, mmap_mode='r') if os.path.exists(path) else None for path in paths]
+            present = [part for part in parts if part is not None]
+            dtype = np.result_type(*[part.dtype for part in present]) if present else np.dtype('U1')
+            shape = present[0].shape[1:] if present else ()
+            values = np.lib.format.open_memmap(os.path.join(tmp_folder, field + '.npy'), mode='w+',
+                                               dtype=dtype, shape=(sum(n_rows),) + shape)
+            start = 0
+            for part, n in zip(parts, n_rows):
+                # Blöcke ohne Stand und Einstellungen (ältere Speicher) erhalten leere Werte
+                values[start:start + n] = part if part is not None else ''
+                start += n
+            values.flush()
+            del values
+        os.rename(tmp_folder, os.path.join(self.folder, name))
+        for chunk in chunks:
+            shutil.rmtree(chunk, ignore_errors=True)
+
+    def columnchunks(self, field, mmap=True):
+        """
+        Liest eine Spalte blockweise, z.B. um Abfragen über große Speicher je Block auszuwerten.
+
+        Parameters:
+            field (str): Name der Spalte (aus STORE_FIELDS, 'key', 'error', 'source' oder 'settings').
+            mmap (bool): True, um die Blöcke speicherabgebildet zu lesen.
+
+        Yields:
+            np.ndarray: Werte eines Blocks in der Reihenfolge des Schreibens.
+        """
+        for chunk in self._chunks():
+            yield np.load(os.path.join(chunk, field + '.npy'), mmap_mode='r' if mmap else None)
+
+    def column(self, field, mmap=True):
+        """
+        Liest eine Spalte über alle Blöcke.
+
+        Nur bei einem Block (z.B. nach consolidate()) ist das Ergebnis speicherabgebildet, bei mehreren
+        Blöcken werden die Werte in ein neues Array kopiert (blockweise Abfragen: columnchunks()).
+
+        Parameters:
+            field (str): Name der Spalte (aus STORE_FIELDS, 'key', 'error', 'source' oder 'settings').
+            mmap (bool): True, um die Blöcke speicherabgebildet zu lesen.
+
+        Returns:
+            np.ndarray: Werte aller Schnitte in der Reihenfolge des Schreibens.
+        """
+        parts = list(self.columnchunks(field, mmap))
+        if not parts:
+            dtype, shape = next(((d, s) for f, d, s in STORE_FIELDS if f == field), ('U1', ()))
+            return np.empty((0,) + shape, dtype=dtype)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def table(self, keys):
+        """
+        Werte der Ergebnistabelle (TABLE_FIELDS) und Fehler für die angegebenen Schlüssel.
+
+        Die Blöcke werden nacheinander gelesen, aus jedem Block nur die Zeilen der angegebenen Schlüssel.
+        Bei mehrfach gespeicherten Schlüsseln wird das zuletzt geschriebene Ergebnis verwendet.
+
+        Returns:
+            rows (np.ndarray): Form (Anzahl Schlüssel, 6), NaN für fehlende Schlüssel.
+            errors (list): Fehlermeldung je Schlüssel oder None.
+        """
+        positions = {}
+        for n, key in enumerate(keys):
+            positions.setdefault(key, []).append(n)
+        rows = np.full((len(keys), len(TABLE_FIELDS)), np.nan)
+        errors = [None] * len(keys)
+        for chunk in self._chunks():
+            # Letzte Zeile je gesuchtem Schlüssel im Block
+            found = {key: i for i, key in enumerate(np.load(os.path.join(chunk, 'key.npy')).tolist())
+                     if key in positions}
+            if not found:
+                continue
+            targets = [n for key in found for n in positions[key]]
+            rows_in_chunk = [found[key] for key in found for _ in positions[key]]
+            for column_nr, field in enumerate(TABLE_FIELDS):
+                column = np.load(os.path.join(chunk, field + '.npy'), mmap_mode='r')
+                rows[targets, column_nr] = column[rows_in_chunk]
+            error_column = np.load(os.path.join(chunk, 'error.npy'), mmap_mode='r')
+            for n, i in zip(targets, rows_in_chunk):
+                errors[n] = str(error_column[i]) or None
+        return rows, errors
+
+    def clear(self):
+        """Löscht alle gespeicherten Blöcke."""
+        self._buffer = []
+        shutil.rmtree(self.folder, ignore_errors=True)
+        os.makedirs(self.folder, exist_ok=True)
+
+    def info(self):
+        """Anzahl der Blöcke und der gespeicherten Schnitte."""
+        chunks = self._chunks()
+        rows = sum(len(keys) for keys in self.columnchunks('key'))
+        return {'chunks': len(chunks), 'rows': rows, 'fields': [f for f, _, _ in STORE_FIELDS]}
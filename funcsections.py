@@ -0,0 +1,186 @@
+import os
+import numpy as np
+from funcevalprofile import funcevalprofile
+
+# Datensatz eines Dreiecks in binären STL-Dateien
+_STL_DTYPE = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attr', '<u2')])
+
+
+def funcreadpoints(filepath, chunksize=1000000):
+    """
+    Liest die Punkte einer 3D-Punktwolke oder STL-Datei blockweise.
+
+    Unterstützt werden ASCII-Punktwolken (eine Zeile je Punkt mit x, y, z; Kopfzeilen werden
+    übersprungen), .npy-Dateien mit einem (n, 3)-Array sowie binäre und ASCII-STL-Dateien
+    (Eckpunkte der Dreiecke). Binäre Formate werden speicherabgebildet gelesen, sodass nie mehr als
+    ein Block im Speicher liegt.
+
+    Parameters:
+    filepath (str): Pfad der Datei.
+    chunksize (int): Anzahl der Punkte je Block.
+
+    Yields:
+    np.ndarray: 2D-Array mit bis zu chunksize Punkten (x, y, z).
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+
+    if extension == '.npy':
+        points = np.load(filepath, mmap_mode='r')
+        for start in range(0, len(points), chunksize):
+            yield np.asarray(points[start:start + chunksize, :3], dtype=float)
+
+    elif extension == '.stl' and _isbinarystl(filepath):
+        n_triangles = int(np.fromfile(filepath, dtype='<u4', count=1, offset=80)[0])
+        triangles = np.memmap(filepath, dtype=_STL_DTYPE, mode='r', offset=84, shape=(n_triangles,))
+        step = max(1, chunksize // 3)
+        for start in range(0, n_triangles, step):
+            yield triangles['vertices'][start:start + step].reshape(-1, 3).astype(float)
+
+    elif extension == '.stl':
+        with open(filepath, 'r') as file:
+            lines = []
+            for line in file:
+                line = line.strip()
+                if line.startswith('vertex'):
+                    lines.append(line[6:])
+                    if len(lines) >= chunksize:
+                        yield np.fromstring(' '.join(lines), sep=' ').reshape(-1, 3)
+                        lines = []
+            if lines:
+                yield np.fromstring(' '.join(lines), sep=' ').reshape(-1, 3)
+
+    else:
+        with open(filepath, 'r') as file:
+            lines = []
+            for line in file:
+                if not lines and not _isdataline(line):
+                    continue  # Kopfzeile oder Leerzeile
+                lines.append(line)
+                if len(lines) >= chunksize:
+                    yield np.fromstring(''.join(lines), sep=' ').reshape(len(lines), -1)[:, :3]
+                    lines = []
+            if lines:
+                yield np.fromstring(''.join(lines), sep=' ').reshape(len(lines), -1)[:, :3]
+
+
+def _isdataline(line):
+    """Prüft, ob eine Zeile mit einem Zahlenwert beginnt."""
+    try:
+        float(line.split()[0])
+        return True
+    except (IndexError, ValueError):
+        return False
+
+
+def _isbinarystl(filepath):
+    """Prüft anhand der Dateigröße, ob eine STL-Datei binär gespeichert ist."""
+    size = os.path.getsize(filepath)
+    if size < 84:
+        return False
+    n_triangles = int(np.fromfile(filepath, dtype='<u4', count=1, offset=80)[0])
+    return size == 84 + n_triangles * _STL_DTYPE.itemsize
+
+
+def funcsections(filepath, settings):
+    """
+    Zerlegt eine 3D-Punktwolke oder STL-Datei in 2D-Schnitte entlang der Nahtachse.
+
+    Die Schnitte liegen im Abstand 'pitch' entlang der Koordinate 'axis'. Ein Punkt gehört zu einem
+    Schnitt, wenn sein Abstand zur Schnittebene höchstens 'width'/2 beträgt. Die Datei wird blockweise
+    gelesen und die Schnitte werden nacheinander zurückgegeben:
+    - 'sorted': True: Die Punkte liegen aufsteigend entlang der Nahtachse vor (z.B. Linienscanner).
+      Ein Lesedurchgang genügt; jeder Schnitt wird ausgegeben, sobald er vollständig ist.
+    - 'sorted': False: Es werden jeweils 'maxsections' Schnitte in einem Lesedurchgang gesammelt.
+    Der Speicherbedarf hängt damit nur von 'chunksize' und der Punktzahl der offenen Schnitte ab.
+
+    Parameters:
+    filepath (str): Pfad der Datei (siehe funcreadpoints).
+    settings (dict): Einstellungen aus loadsettings, verwendet wird settings['Sections'] mit den Schlüsseln:
+                     - 'axis': Index der Koordinate entlang der Naht (0, 1 oder 2).
+                     - 'columns': Indizes der Koordinaten für x (quer zur Naht) und y (Höhe) der Schnitte.
+                     - 'pitch': Abstand der Schnitte entlang der Naht.
+                     - 'width': Dicke der Schnitte entlang der Naht.
+                     - 'start', 'stop': Bereich entlang der Naht (None: aus den Daten).
+                     - 'scale': Faktor für die Umrechnung der Koordinaten in mm.
+                     - 'flip': True, um die Reihenfolge der Profilpunkte umzukehren.
+                     - 'sorted', 'maxsections', 'chunksize': Steuerung des Einlesens (siehe oben).
+
+    Yields:
+    tuple: Position des Schnitts entlang der Naht (in Einheiten der Datei) und 2D-Array mit den
+           Profilpunkten (x, y) in mm, aufsteigend nach x sortiert.
+    """
+    s = settings['Sections']
+    axis = s['axis']
+    pitch = s['pitch']
+    halfwidth = s['width'] / 2
+    chunksize = s['chunksize']
+
+    start, stop = s['start'], s['stop']
+    if start is None or stop is None:
+        bounds = [(chunk[:, axis].min(), chunk[:, axis].max())
+                  for chunk in funcreadpoints(filepath, chunksize) if len(chunk)]
+        if not bounds:
+            return
+        start = min(b[0] for b in bounds) if start is None else start
+        stop = max(b[1] for b in bounds) if stop is None else stop
+    n_sections = int(np.floor((stop - start) / pitch + 1e-9)) + 1
+
+    def binpoints(chunk, first, last):
+        # Schnittnummer je Punkt, nur Punkte innerhalb der Schnittdicke und im Bereich [first, last)
+        position = (chunk[:, axis] - start) / pitch
+        section_nr = np.rint(position).astype(int)
+        keep = (np.abs(position - section_nr) * pitch <= halfwidth) & (section_nr >= first) & (section_nr < last)
+        section_nr = section_nr[keep]
+        order = np.argsort(section_nr, kind='stable')
+        points = chunk[keep][order][:, s['columns']]
+        nrs, splits = np.unique(section_nr[order], return_index=True)
+        return zip(nrs, np.split(points, splits[1:]))
+
+    def makesection(section_nr, parts):
+        profile = np.unique(np.concatenate(parts), axis=0) * s['scale']  # sortiert nach x, ohne doppelte Punkte
+        if s['flip']:
+            profile = np.flipud(profile)
+        return start + section_nr * pitch, profile
+
+    if s['sorted']:
+        buffers = {}
+        last_axis = -np.inf
+        for chunk in funcreadpoints(filepath, chunksize):
+            if len(chunk) == 0:
+                continue
+            if chunk[0, axis] < last_axis or np.any(np.diff(chunk[:, axis]) < 0):
+                raise ValueError('Points are not sorted along the weld axis')
+            last_axis = chunk[-1, axis]
+            for section_nr, points in binpoints(chunk, 0, n_sections):
+                buffers.setdefault(section_nr, []).append(points)
+            # Schnitte, deren Bereich vollständig gelesen wurde, ausgeben
+            for section_nr in sorted(buffers):
+                if start + section_nr * pitch + halfwidth >= last_axis:
+                    break
+                yield makesection(section_nr, buffers.pop(section_nr))
+        for section_nr in sorted(buffers):
+            yield makesection(section_nr, buffers.pop(section_nr))
+    else:
+        for first in range(0, n_sections, s['maxsections']):
+            last = min(first + s['maxsections'], n_sections)
+            buffers = {}
+            for chunk in funcreadpoints(filepath, chunksize):
+                for section_nr, points in binpoints(chunk, first, last):
+                    buffers.setdefault(section_nr, []).append(points)
+            for section_nr in sorted(buffers):
+                yield makesection(section_nr, buffers.pop(section_nr))
+
+
+def funcevalsections(filepath, settings):
+    """
+    Wertet alle Schnitte einer 3D-Punktwolke oder STL-Datei nacheinander aus.
+
+    Parameters:
+    filepath (str): Pfad der Datei (siehe funcreadpoints).
+    settings (dict): Einstellungen aus loadsettings.
+
+    Yields:
+    tuple: Position des Schnitts entlang der Naht und Ergebnisse aus funcevalprofile.
+    """
+    for position, profile in funcsections(filepath, settings):
+        yield position, funcevalprofile(profile, settings)
@@ -0,0 +1,237 @@
+import os
+import json
+import pickle
+import hashlib
+
+# Version der zwischengespeicherten Ergebnisse; erhöhen, wenn sich Ergebnisse einer Stufe ändern
+CACHE_VERSION = 1
+
+# Einstellungen, von denen das Ergebnis einer Stufe abhängt (Schlüssel aus loadsettings)
+STAGE_SETTINGS = {
+    'load': ['compact'],
+    'outlier': ['outliermethod'],
+    'filter': ['filter', 'smoothparam'],
+    'sorting': ['ordermethod', 'orderdistance', 'interpmethod'],
+    'window': ['Localization'],
+    'CM': ['CM'],
+    'LSM': ['LSM'],
+    'IM': ['IM'],
+    'angle': ['Angle']
+}
+
+# Stufen, deren Ergebnisse eine Stufe verwendet
+STAGE_PARENTS = {
+    'load': [],
+    'outlier': ['load'],
+    'filter': ['outlier'],
+    'sorting': ['filter'],
+    'window': ['sorting'],
+    'CM': ['window'],
+    'LSM': ['window'],
+    'IM': ['window'],
+    'angle': ['window', 'LSM', 'IM']
+}
+
+# Einstellungen ohne Einfluss auf die Ergebnisse (z.B. nur Laufzeit oder Speicher)
+_IGNORED_SETTINGS = {'IM': ['batchsize']}
+
+
+def funcstagesettings(stage, settings):
+    """
+    Auszug der Einstellungen, von denen das Ergebnis einer Stufe abhängt.
+
+    Parameters:
+    stage (str): Name der Stufe (siehe STAGE_SETTINGS).
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    dict: Relevante Einstellungen der Stufe.
+    """
+    relevant = {}
+    for key in STAGE_SETTINGS[stage]:
+        value = settings.get(key)
+        if isinstance(value, dict) and key in _IGNORED_SETTINGS:
+            value = {k: v for k, v in value.items() if k not in _IGNORED_SETTINGS[key]}
+        relevant[key] = value
+    return relevant
+
+
+def funcstagekey(stage, settings, parent_keys):
+    """
+    Schlüssel eines Stufenergebnisses aus den relevanten Einstellungen und den Schlüsseln der Eingänge.
+
+    Da die Schlüssel der Eingänge enthalten sind, ändert eine Einstellung die Schlüssel der Stufe und
+    aller nachfolgenden Stufen, aber nicht die der vorherigen oder unabhängigen Stufen.
+
+    Parameters:
+    stage (str): Name der Stufe.
+    settings (dict): Einstellungen aus loadsettings.
+    parent_keys (list of str): Schlüssel der Eingänge (für 'load' der Inhalts-Hash der Datei).
+
+    Returns:
+    str: Hexadezimaler SHA-256-Hash.
+    """
+    content = {'version': CACHE_VERSION, 'stage': stage, 'settings': funcstagesettings(stage, settings),
+               'parents': list(parent_keys)}
+    text = json.dumps(content, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def funcsettingskey(settings):
+    """
+    Schlüssel aller Einstellungen, von denen die Ergebnisse einer Datei abhängen (alle Stufen).
+
+    Parameters:
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    str: Hexadezimaler SHA-256-Hash.
+    """
+    content = {'version': CACHE_VERSION,
+               'settings': {stage: funcstagesettings(stage, settings) for stage in STAGE_SETTINGS}}
+    text = json.dumps(content, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def funcfilehash(filepath, blocksize=1 << 20):
+    """SHA-256-Hash des Inhalts einer Datei."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for block in iter(lambda: file.read(blocksize), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Zwischenspeicher der Stufenergebnisse auf der Festplatte, adressiert über den Inhalt (funcstagekey).
+
+    Jedes Ergebnis wird als Pickle-Datei unter seinem Schlüssel gespeichert. Überschreitet die Größe
+    aller Dateien maxbytes, werden die am längsten nicht verwendeten Ergebnisse gelöscht (LRU über die
+    Änderungszeit der Dateien, die bei jedem Treffer aktualisiert wird). Mehrere Prozesse können
+    denselben Ordner verwenden, da Dateien atomar geschrieben werden. Jeder Prozess zählt nur seine
+    eigenen Schreibvorgänge mit und ermittelt die tatsächliche Gesamtgröße neu, sobald er seit der
+    letzten Ermittlung rescanfraction * maxbytes geschrieben hat. Mit n Prozessen überschreitet der
+    Ordner maxbytes daher höchstens um etwa n * rescanfraction * maxbytes.
+
+    Parameters:
+        folder (str): Ordner des Zwischenspeichers.
+        maxbytes (int): Größte Gesamtgröße in Byte.
+    """
+
+    enabled = True
+    rescanfraction = 1 / 32
+
+    def __init__(self, folder, maxbytes=1 << 30):
+        self.folder = folder
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._written = 0  # Seit der letzten Ermittlung der Gesamtgröße selbst geschriebene Bytes
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], key + '.pkl')
+
+    def get(self, key):
+        """
+        Liest ein Ergebnis.
+
+        Returns:
+        tuple: (True, Ergebnis) bei einem Treffer, sonst (False, None).
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        """Speichert ein Ergebnis und löscht bei Bedarf die ältesten Einträge."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            old_size = os.path.getsize(path)  # Ein vorhandener Eintrag wird ersetzt, nicht hinzugefügt
+        except OSError:
+            old_size = 0
+        os.replace(tmp_path, path)
+
+        written = os.path.getsize(path) - old_size
+        self._written += written
+        if self._size is None or self._written > self.maxbytes * self.rescanfraction:
+            # Gesamtgröße einschließlich der Einträge anderer Prozesse neu ermitteln
+            self._size = sum(size for _, size, _ in self._entries())
+            self._written = 0
+        else:
+            self._size += written
+        if self._size > self.maxbytes:
+            self.evict()
+
+    def evict(self):
+        """Löscht die am längsten nicht verwendeten Einträge, bis die Größe unter maxbytes liegt."""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        self._written = 0
+        for _, size, path in entries:
+            if self._size <= self.maxbytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._size -= size
+
+    def _entries(self):
+        """(Änderungszeit, Größe, Pfad) aller Einträge."""
+        entries = []
+        if not os.path.isdir(self.folder):
+            return entries
+        for subfolder in os.scandir(self.folder):
+            if not subfolder.is_dir():
+                continue
+            for entry in os.scandir(subfolder.path):
+                if entry.name.endswith('.pkl'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+
+class _NullCache:
+    """Zwischenspeicher ohne Funktion, alle Ergebnisse werden neu berechnet."""
+
+    enabled = False
+
+    def get(self, key):
+        return False, None
+
+    def put(self, key, value):
+        pass
+
+
+NULL_CACHE = _NullCache()
+
+# Zwischenspeicher je Ordner und Prozess, damit die Gesamtgröße nur einmal ermittelt wird
+_CACHES = {}
+
+
+def funcstagecache(settings):
+    """Zwischenspeicher nach den Einstellungen 'stagecache', 'stagecachefolder' und 'stagecachesize'."""
+    if settings.get('stagecache', 'off') == 'off':
+        return NULL_CACHE
+    elif settings['stagecache'] != 'on':
+        raise ValueError('Unknown stagecache mode')
+    key = (os.path.abspath(settings['stagecachefolder']), int(settings['stagecachesize']))
+    if key not in _CACHES:
+        _CACHES[key] = StageCache(*key)
+    return _CACHES[key]
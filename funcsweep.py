@@ -0,0 +1,126 @@
+import os
+import csv
+import copy
+import itertools
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from funcevalprofile import funcloadfile, StagePipeline, funcresultrow
+from funcbatch import RESULT_COLUMNS
+from funcstagecache import funcstagecache, funcfilehash
+
+
+def funcsweepgrid(grid, settings):
+    """
+    Erstellt die Einstellungen für alle Kombinationen eines Rasters.
+
+    Parameters:
+    grid (dict): Zu variierende Einstellungen und ihre Werte, verschachtelte Schlüssel mit Punkt
+                 getrennt, z.B. {'smoothparam': [0.99, 0.995], 'LSM.factor': [0.2, 0.3], 'IM.crit2': [0.02]}.
+    settings (dict): Einstellungen aus loadsettings als Grundlage.
+
+    Returns:
+    list of tuple: Je Kombination (Werte als Dictionary mit den Schlüsseln aus grid, Einstellungen).
+    """
+    names = list(grid)
+    variants = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        variant = copy.deepcopy(settings)
+        for name, value in zip(names, values):
+            *path, key = name.split('.')
+            target = variant
+            for part in path:
+                target = target[part]
+            if key not in target:
+                raise KeyError(f'Unknown setting {name}')
+            target[key] = value
+        variants.append((dict(zip(names, values)), variant))
+    return variants
+
+
+def funcsweepfile(filepath, variants, settings):
+    """
+    Wertet eine Datei für alle Kombinationen aus; gemeinsame Stufenergebnisse werden nur einmal berechnet.
+
+    Alle Kombinationen verwenden einen gemeinsamen Speicher der Stufenergebnisse (StagePipeline, memo).
+    Da die Schlüssel nur von den Einstellungen abhängen, die eine Stufe und ihre vorherigen Stufen
+    verwenden, wird z.B. das gefilterte Profil für alle Werte von 'LSM.factor' nur einmal berechnet.
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei.
+    variants (list of tuple): Kombinationen aus funcsweepgrid.
+    settings (dict): Einstellungen aus loadsettings (für Einlesen und Zwischenspeicher).
+
+    Returns:
+    list of dict: Je Kombination eine Zeile mit 'file', den Werten der Kombination, den Spalten aus
+                  RESULT_COLUMNS und 'error' (None bei Erfolg).
+    """
+    rows = []
+    memo = {}
+    cache = funcstagecache(settings)
+    try:
+        source_key = funcfilehash(filepath)
+    except OSError as error:
+        source_key, file_error = None, f'{type(error).__name__}: {error}'
+    for values, variant in variants:
+        row = {'file': filepath, **values}
+        try:
+            if source_key is None:
+                raise OSError(file_error)
+            pipeline = StagePipeline(lambda: funcloadfile(filepath, settings)[0], variant, cache=cache,
+                                     source_key=source_key, memo=memo)
+            result, error = funcresultrow(pipeline.results()), None
+        except Exception as exception:
+            result, error = np.full(len(RESULT_COLUMNS), np.nan), f'{type(exception).__name__}: {exception}'
+        row.update(zip(RESULT_COLUMNS, result))
+        row['error'] = error
+        rows.append(row)
+    return rows
+
+
+def funcsweep(file_list, grid, settings, workers=None, chunksize=None):
+    """
+    Wertet viele Dateien für alle Kombinationen eines Rasters von Einstellungen aus (Sensitivitätsanalyse).
+
+    Die Dateien werden wie in funcbatch in einem Prozesspool verteilt; je Datei werden die Kombinationen
+    nacheinander ausgewertet und teilen sich die Ergebnisse gemeinsamer Stufen.
+
+    Parameters:
+    file_list (list of str): Pfade der auszuwertenden Dateien.
+    grid (dict): Zu variierende Einstellungen (siehe funcsweepgrid).
+    settings (dict): Einstellungen aus loadsettings als Grundlage.
+    workers (int): Anzahl der Prozesse (None: Anzahl der CPU-Kerne, 1: ohne Prozesspool).
+    chunksize (int): Anzahl der Dateien je Auftrag an einen Prozess (None: automatisch).
+
+    Returns:
+    list of dict: Eine Zeile je Datei und Kombination (siehe funcsweepfile), nach Dateien geordnet.
+    """
+    variants = funcsweepgrid(grid, settings)
+    workers = workers or os.cpu_count() or 1
+    sweepfile = functools.partial(funcsweepfile, variants=variants, settings=settings)
+
+    if workers == 1 or len(file_list) <= 1:
+        results = map(sweepfile, file_list)
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(file_list) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(sweepfile, file_list, chunksize=chunksize))
+    return [row for rows in results for row in rows]
+
+
+def funcwritesweep(outputpath, rows, grid):
+    """
+    Schreibt die Ergebnisse einer Sensitivitätsanalyse als CSV-Datei (eine Zeile je Datei und Kombination).
+
+    Parameters:
+    outputpath (str): Pfad der CSV-Datei.
+    rows (list of dict): Ergebnisse aus funcsweep.
+    grid (dict): Raster aus funcsweep (für die Spalten der Einstellungen).
+    """
+    with open(outputpath, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['file'] + list(grid) + RESULT_COLUMNS + ['error'])
+        for row in rows:
+            writer.writerow([row['file']] + [row[name] for name in grid]
+                            + [f'{row[column]:.6f}' for column in RESULT_COLUMNS] + [row['error'] or ''])
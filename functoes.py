@@ -0,0 +1,181 @@
+import os
+import csv
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from funcevalprofile import funcloadfile, StagePipeline, funcresultrow
+from funcevalCM import funcevalCM
+from funcevalLSM import funcevalLSM
+from funcevalIM import funcevalIM
+from funcevalangle import funcevalangles
+from funcderivation import ProfileContext, funcderivationsettings
+from funclocatetoe import functoewindow, funcshiftresults
+from funcbatch import RESULT_COLUMNS
+from funcstagecache import funcstagecache, funcfilehash
+
+
+def funcfindtoes(profile, settings):
+    """
+    Findet alle Nahtübergänge eines Profils als Maxima der Krümmung (eine Ableitungsberechnung).
+
+    Ein lokales Maximum der Krümmung gilt als Nahtübergang, wenn es mindestens 'threshold' mal der
+    größten Krümmung erreicht. Maxima mit weniger als 'separation' Abstand in x zu einem stärkeren
+    Maximum werden verworfen. Der stärkste Nahtübergang entspricht dem von funcevalCM.
+
+    Parameters:
+    profile (np.ndarray or ProfileContext): 2D-Array mit den Profilpunkten (x, y).
+    settings (dict): Einstellungen aus loadsettings, settings['Toes'] mit 'threshold', 'separation' und
+                     'maxtoes'; die Krümmung wird mit den Einstellungen von settings['CM'] berechnet.
+
+    Returns:
+    list of int: Indizes der Nahtübergänge wie 'DP_toe' aus funcevalCM (Index der Krümmung, entspricht
+                 dem Profilpunkt Index + 1), aufsteigend sortiert.
+    """
+    s = settings['Toes']
+    context = ProfileContext.wrap(profile)
+    curvature = context.curvature(*funcderivationsettings(settings['CM']))[:, 1]
+    x = context.profile[1:-1, 0]  # Punkte passend zur Krümmung
+    if len(curvature) == 0 or not np.nanmax(curvature) > 0:
+        return []
+
+    # Lokale Maxima über der Schwelle, nach der Krümmung absteigend (bei gleichen Werten der erste Index)
+    padded = np.concatenate(([-np.inf], np.nan_to_num(curvature, nan=-np.inf), [-np.inf]))
+    peak = (padded[1:-1] >= padded[:-2]) & (padded[1:-1] >= padded[2:])
+    candidates = np.flatnonzero(peak & (curvature >= s['threshold'] * np.nanmax(curvature)))
+    candidates = candidates[np.argsort(-curvature[candidates], kind='stable')]
+
+    toes = []
+    for candidate in candidates:
+        if all(abs(x[candidate] - x[toe]) >= s['separation'] for toe in toes):
+            toes.append(candidate)
+            if len(toes) == s['maxtoes']:
+                break
+    return sorted(int(toe) for toe in toes)
+
+
+def funcevaltoes(profile, settings):
+    """
+    Wertet alle Nahtübergänge eines Profils aus (z.B. beide Seiten einer Stumpfnaht).
+
+    Je Nahtübergang wird ein Bereich mit höchstens settings['Toes']['halfwidth'] Abstand in x
+    ausgewertet, der nicht über die Mitte zum benachbarten Nahtübergang hinausgeht. Die Auswerte-
+    methoden erwarten den Grundwerkstoff vor und die Naht nach dem Nahtübergang; liegt die Naht
+    (höhere Punkte) davor, wird der Bereich in umgekehrter Reihenfolge ausgewertet (gespiegelte Seite).
+    Alle Indizes der Ergebnisse beziehen sich auf das gesamte Profil.
+
+    Parameters:
+    profile (np.ndarray or ProfileContext): Aufbereitetes Profil (z.B. aus funcprepareprofile).
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    list of dict: Je Nahtübergang (nach Index sortiert) mit den Schlüsseln:
+          - 'DP_toe': Index des Nahtübergangs wie in funcevalCM (Profilpunkt 'DP_toe' + 1).
+          - 'window': Auswertebereich (start, stop) im Profil.
+          - 'reversed': True für die in umgekehrter Reihenfolge ausgewertete Seite.
+          - 'radius', 'angle': Ergebnisse wie in funcevalprofile (None bei Fehler).
+          - 'error': Fehlermeldung oder None.
+    """
+    context = ProfileContext.wrap(profile)
+    profile = context.profile
+    toes = funcfindtoes(context, settings)
+
+    # Bereiche enden in der Mitte zwischen benachbarten Nahtübergängen (Indizes der Profilpunkte)
+    points = [DP_toe + 1 for DP_toe in toes]
+    limits = [0] + [(a + b + 1) // 2 for a, b in zip(points[:-1], points[1:])] + [len(profile)]
+    results = []
+    for nr, (DP_toe, point) in enumerate(zip(toes, points)):
+        start, stop = functoewindow(profile, point, settings['Toes']['halfwidth'], limits[nr], limits[nr + 1])
+        before = profile[start:point, 1]
+        after = profile[point + 1:stop, 1]
+        reverse = bool(len(before) and len(after) and np.mean(before) > np.mean(after))
+        result = {'DP_toe': DP_toe, 'window': (start, stop), 'reversed': reverse,
+                  'radius': None, 'angle': None, 'error': None}
+        try:
+            local = ProfileContext(profile[start:stop][::-1] if reverse else profile[start:stop])
+            radius = [funcevalCM(local, settings['CM']), funcevalLSM(local, settings['LSM']),
+                      funcevalIM(local, settings['IM'])]
+            angle = funcevalangles(local, settings['Angle'], [radius[1]['DP_EP'], radius[2]['DP_EP']])
+            offset = (stop - 1, True) if reverse else (start, False)
+            result['radius'] = [funcshiftresults(r, *offset) for r in radius]
+            result['angle'] = [funcshiftresults(a, *offset) for a in angle]
+        except Exception as error:
+            result['error'] = f'{type(error).__name__}: {error}'
+        results.append(result)
+    return results
+
+
+def funcevaltoesfile(filepath, settings):
+    """
+    Wertet alle Nahtübergänge einer Datei aus und fängt Fehler ab, damit ein Batchlauf nicht abbricht.
+
+    Die Datenaufbereitung erfolgt einmal für alle Nahtübergänge über StagePipeline (mit
+    settings['stagecache'] = 'on' aus dem Zwischenspeicher).
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei.
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    list of dict: Je Nahtübergang eine Zeile mit 'file', 'toe' (Nummer), 'DP_toe', 'reversed', den Spalten
+                  aus RESULT_COLUMNS und 'error'; bei einem Fehler der Datei eine Zeile mit 'toe' = -1.
+    """
+    try:
+        cache = funcstagecache(settings)
+        source_key = funcfilehash(filepath) if cache.enabled else None
+        pipeline = StagePipeline(lambda: funcloadfile(filepath, settings)[0], settings, cache=cache,
+                                 source_key=source_key)
+        toes = funcevaltoes(pipeline.get('sorting'), settings)
+    except Exception as error:
+        row = {'file': filepath, 'toe': -1, 'DP_toe': -1, 'reversed': False,
+               'error': f'{type(error).__name__}: {error}'}
+        row.update(zip(RESULT_COLUMNS, np.full(len(RESULT_COLUMNS), np.nan)))
+        return [row]
+
+    rows = []
+    for nr, toe in enumerate(toes):
+        row = {'file': filepath, 'toe': nr, 'DP_toe': toe['DP_toe'], 'reversed': toe['reversed'], 'error': toe['error']}
+        values = funcresultrow(toe) if toe['error'] is None else np.full(len(RESULT_COLUMNS), np.nan)
+        row.update(zip(RESULT_COLUMNS, values))
+        rows.append(row)
+    return rows
+
+
+def funcevaltoesbatch(file_list, settings, workers=None, chunksize=None):
+    """
+    Wertet alle Nahtübergänge vieler Dateien in einem Prozesspool aus (wie funcbatch).
+
+    Parameters:
+    file_list (list of str): Pfade der auszuwertenden Dateien.
+    settings (dict): Einstellungen aus loadsettings.
+    workers (int): Anzahl der Prozesse (None: Anzahl der CPU-Kerne, 1: ohne Prozesspool).
+    chunksize (int): Anzahl der Dateien je Auftrag an einen Prozess (None: automatisch).
+
+    Returns:
+    list of dict: Zeilen aus funcevaltoesfile, nach Dateien geordnet.
+    """
+    workers = workers or os.cpu_count() or 1
+    toesfile = functools.partial(funcevaltoesfile, settings=settings)
+    if workers == 1 or len(file_list) <= 1:
+        results = map(toesfile, file_list)
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(file_list) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(toesfile, file_list, chunksize=chunksize))
+    return [row for rows in results for row in rows]
+
+
+def funcwritetoes(outputpath, rows):
+    """
+    Schreibt die Ergebnisse je Nahtübergang als CSV-Datei.
+
+    Parameters:
+    outputpath (str): Pfad der CSV-Datei.
+    rows (list of dict): Ergebnisse aus funcevaltoesbatch.
+    """
+    with open(outputpath, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['file', 'toe', 'DP_toe', 'reversed'] + RESULT_COLUMNS + ['error'])
+        for row in rows:
+            writer.writerow([row['file'], row['toe'], row['DP_toe'], int(row['reversed'])]
+                            + [f'{row[column]:.6f}' for column in RESULT_COLUMNS] + [row['error'] or ''])
@@ -0,0 +1,222 @@
+import os
+import csv
+import warnings
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from funcevalprofile import funcloadfile, StagePipeline
+from funcevalbatch import funcevalCMbatch, funcevalLSMbatch, funcevalanglesbatch
+from funcevalIM import funcevalIM
+from funcderivation import ProfileContext
+from funcbatch import RESULT_COLUMNS
+from funcstagecache import funcstagecache, funcfilehash
+
+
+def funcuncertaintysettings(settings):
+    """
+    Einstellungen für die Monte-Carlo-Simulation: Ableitungsverfahren aus settings['Uncertainty'].
+
+    Differenzenquotienten ohne Glättung vertragen kein Rauschen (die Krümmung wird vom Rauschen
+    bestimmt), daher verwendet die Simulation standardmäßig für alle Methoden das in
+    settings['Uncertainty'] angegebene glättende Verfahren ('derivative' und 'smoothparam', None
+    behält die Einstellungen der Methoden). Bleiben ungeglättete Differenzenquotienten, wird gewarnt.
+
+    Parameters:
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    dict: Einstellungen für funcuncertainty (Kopie).
+    """
+    s = settings['Uncertainty']
+    settings = dict(settings)
+    for key in ['CM', 'LSM', 'IM', 'Angle']:
+        if s.get('derivative') is not None:
+            settings[key] = dict(settings[key], derivative=s['derivative'], smoothparam=s['smoothparam'])
+        method = settings[key].get('derivative', 'difference')
+        if method == 'difference' and settings[key]['smoothparam'] >= 1 and s['noise'] > 0:
+            warnings.warn(f"Uncertainty of {key} with unsmoothed difference quotients is dominated by the "
+                          f"simulated noise; use a smoothing derivative method")
+    return settings
+
+
+def funcperturb(profile, settings, rng):
+    """
+    Erzeugt gestörte Kopien eines Profils als ein 3D-Array (simuliertes Rauschen des Scanners).
+
+    Die Punkte werden entlang des Profils um einen normalverteilten Anteil des Punktabstands
+    verschoben ('jitter', auf ±0.45 begrenzt, damit die Reihenfolge erhalten bleibt) und quadratisch
+    über den nächsten Punkt und seine Nachbarn interpoliert. Anschließend wird normalverteiltes
+    Rauschen mit der Standardabweichung 'noise' mal Punktabstand auf die y-Werte addiert. Als
+    Punktabstand dient der Median der Abstände benachbarter Punkte.
+
+    Parameters:
+    profile (np.ndarray): 2D-Array mit den Profilpunkten (x, y), mindestens 3 Punkte.
+    settings (dict): Einstellungen settings['Uncertainty'] mit 'samples', 'noise' und 'jitter'
+                     (Standardabweichungen als Anteil des Punktabstands).
+    rng (np.random.Generator): Zufallszahlengenerator.
+
+    Returns:
+    np.ndarray: 3D-Array (samples, n_points, 2).
+    """
+    n_samples = int(settings['samples'])
+    n_points = len(profile)
+    if n_points < 3:
+        raise ValueError('Profile has less than 3 points!')
+    spacing = np.median(np.hypot(*np.diff(profile[:, :2], axis=0).T))
+    index = np.arange(n_points, dtype=float)
+    shift = np.clip(rng.normal(0.0, settings['jitter'], (n_samples, n_points)), -0.45, 0.45)
+    position = np.clip(index + shift, 0, n_points - 1)
+
+    # Quadratische Interpolation für alle Kopien gemeinsam (linear zwischen zwei Punkten würde die
+    # Punkte auf die Sehne legen und die Krümmung zusätzlich verfälschen)
+    center = np.clip(np.rint(position).astype(int), 1, n_points - 2)
+    t = (position - center)[..., None]
+    perturbed = (profile[center - 1] * (t * (t - 1) / 2) + profile[center] * (1 - t**2)
+                 + profile[center + 1] * (t * (t + 1) / 2))
+    perturbed[..., 1] += rng.normal(0.0, settings['noise'] * spacing, (n_samples, n_points))
+    return perturbed
+
+
+def _evalsamples(profiles, settings, n_IM):
+    """Ergebnisse je Spalte aus RESULT_COLUMNS für alle Profile (IM nur für die ersten n_IM)."""
+    n_samples = len(profiles)
+    results_CM = funcevalCMbatch(profiles, settings['CM'])
+    results_LSM = funcevalLSMbatch(profiles, settings['LSM'])
+
+    # IM einzeln für höchstens n_IM Profile
+    radius_IM = np.full(n_samples, np.nan)
+    DP_EP_IM = np.full(n_samples, np.nan)
+    for i in range(min(n_IM, n_samples)):
+        try:
+            result = funcevalIM(ProfileContext(profiles[i]), settings['IM'])
+        except Exception:
+            continue  # Profil ohne Ergebnis, zählt nicht zu 'valid'
+        radius_IM[i], DP_EP_IM[i] = result['radius'], result['DP_EP']
+
+    angle_MAX, angle_END_LSM, angle_END_IM = funcevalanglesbatch(
+        profiles, settings['Angle'], [results_LSM['DP_EP'], DP_EP_IM])
+    return dict(zip(RESULT_COLUMNS, [results_CM['radius'], results_LSM['radius'], radius_IM,
+                                     angle_MAX['angle'], angle_END_LSM['angle'], angle_END_IM['angle']]))
+
+
+def funcuncertainty(profile, settings, rng=None):
+    """
+    Schätzt die Unsicherheit der Radien und Winkel eines Profils über eine Monte-Carlo-Simulation.
+
+    Alle gestörten Kopien (funcperturb) werden gemeinsam mit funcevalCMbatch, funcevalLSMbatch und
+    funcevalanglesbatch ausgewertet. 'IM' ist deutlich aufwendiger und wird nur für die ersten
+    'IMsamples' Kopien einzeln berechnet (0: keine Auswertung). Alle Methoden verwenden das
+    Ableitungsverfahren aus funcuncertaintysettings.
+
+    Das ungestörte Profil wird mit denselben Einstellungen ausgewertet ('nominal'). Liegt dieses
+    Ergebnis nicht zwischen dem kleinsten und größten Perzentil, ist 'covered' False: Die Methode
+    wird durch das Rauschen systematisch verschoben (z.B. CM bei großen Radien, da das Maximum der
+    verrauschten Krümmung gesucht wird) und das Intervall beschreibt nicht die Streuung um das Ergebnis.
+
+    Parameters:
+    profile (np.ndarray or ProfileContext): Aufbereitetes Profil (z.B. aus funcprepareprofile).
+    settings (dict): Einstellungen aus loadsettings, settings['Uncertainty'] mit 'samples', 'noise',
+                     'jitter', 'derivative', 'smoothparam', 'IMsamples', 'percentiles' und 'seed'.
+    rng (np.random.Generator): Optional, Zufallszahlengenerator (Standard: aus 'seed').
+
+    Returns:
+    dict: Je Spalte aus RESULT_COLUMNS ein 1D-Array der Perzentile (NaN ohne gültige Ergebnisse) sowie
+          'valid' (Anzahl der gültigen Ergebnisse), 'nominal' (Ergebnis des ungestörten Profils) und
+          'covered' (nominal innerhalb der Perzentile) je Spalte.
+    """
+    s = settings['Uncertainty']
+    settings = funcuncertaintysettings(settings)
+    profile = ProfileContext.wrap(profile).profile
+    rng = rng if rng is not None else np.random.default_rng(s['seed'])
+    perturbed = funcperturb(profile, s, rng)
+    n_IM = int(s['IMsamples'])
+
+    values = _evalsamples(perturbed, settings, n_IM)
+    nominal = _evalsamples(profile[None], settings, n_IM)
+
+    uncertainty = {'valid': {}, 'nominal': {}, 'covered': {}}
+    for column, value in values.items():
+        finite = value[np.isfinite(value)]
+        uncertainty['valid'][column] = len(finite)
+        uncertainty[column] = (np.percentile(finite, s['percentiles']) if len(finite)
+                               else np.full(len(s['percentiles']), np.nan))
+        uncertainty['nominal'][column] = float(nominal[column][0])
+        uncertainty['covered'][column] = bool(uncertainty[column][0] <= nominal[column][0] <= uncertainty[column][-1])
+    return uncertainty
+
+
+def funcuncertaintyfile(filepath, settings):
+    """
+    Unsicherheit der Ergebnisse einer Datei; Fehler werden abgefangen, damit ein Batchlauf nicht abbricht.
+
+    Das aufbereitete Profil (Auswertebereich nach Filter und Sortierung) stammt aus StagePipeline
+    und wird mit settings['stagecache'] = 'on' aus dem Zwischenspeicher gelesen.
+
+    Parameters:
+    filepath (str): Pfad der ASCII-Datei.
+    settings (dict): Einstellungen aus loadsettings.
+
+    Returns:
+    dict: Zeile mit 'file', den Perzentilen je Spalte aus RESULT_COLUMNS (siehe funcuncertainty),
+          'valid', 'nominal', 'covered' und 'error' (None bei Erfolg).
+    """
+    row = {'file': filepath, 'error': None}
+    try:
+        cache = funcstagecache(settings)
+        source_key = funcfilehash(filepath) if cache.enabled else None
+        pipeline = StagePipeline(lambda: funcloadfile(filepath, settings)[0], settings, cache=cache,
+                                 source_key=source_key)
+        row.update(funcuncertainty(pipeline.context(), settings))
+    except Exception as error:
+        row['error'] = f'{type(error).__name__}: {error}'
+        n_percentiles = len(settings['Uncertainty']['percentiles'])
+        row.update({column: np.full(n_percentiles, np.nan) for column in RESULT_COLUMNS})
+        row['valid'] = dict.fromkeys(RESULT_COLUMNS, 0)
+        row['nominal'] = dict.fromkeys(RESULT_COLUMNS, np.nan)
+        row['covered'] = dict.fromkeys(RESULT_COLUMNS, False)
+    return row
+
+
+def funcuncertaintybatch(file_list, settings, workers=None, chunksize=None):
+    """
+    Schätzt die Unsicherheit für viele Dateien in einem Prozesspool (wie funcbatch).
+
+    Parameters:
+    file_list (list of str): Pfade der auszuwertenden Dateien.
+    settings (dict): Einstellungen aus loadsettings.
+    workers (int): Anzahl der Prozesse (None: Anzahl der CPU-Kerne, 1: ohne Prozesspool).
+    chunksize (int): Anzahl der Dateien je Auftrag an einen Prozess (None: automatisch).
+
+    Returns:
+    list of dict: Eine Zeile je Datei (siehe funcuncertaintyfile) in der Reihenfolge von file_list.
+    """
+    workers = workers or os.cpu_count() or 1
+    uncertaintyfile = functools.partial(funcuncertaintyfile, settings=settings)
+    if workers == 1 or len(file_list) <= 1:
+        return list(map(uncertaintyfile, file_list))
+    if chunksize is None:
+        chunksize = max(1, len(file_list) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(uncertaintyfile, file_list, chunksize=chunksize))
+
+
+def funcwriteuncertainty(outputpath, rows, percentiles):
+    """
+    Schreibt die Perzentile als CSV-Datei (eine Zeile je Datei, eine Spalte je Ergebnis und Perzentil,
+    dazu Anzahl gültiger Ergebnisse, Ergebnis des ungestörten Profils und ob es im Intervall liegt).
+
+    Parameters:
+    outputpath (str): Pfad der CSV-Datei.
+    rows (list of dict): Ergebnisse aus funcuncertaintybatch.
+    percentiles (list of float): Perzentile aus settings['Uncertainty'].
+    """
+    with open(outputpath, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['file'] + [f'{column}_p{q:g}' for column in RESULT_COLUMNS for q in percentiles]
+                        + [f'{column}_n' for column in RESULT_COLUMNS] + [f'{column}_nominal' for column in RESULT_COLUMNS]
+                        + [f'{column}_covered' for column in RESULT_COLUMNS] + ['error'])
+        for row in rows:
+            writer.writerow([row['file']] + [f'{value:.6f}' for column in RESULT_COLUMNS for value in row[column]]
+                            + [row['valid'][column] for column in RESULT_COLUMNS]
+                            + [f"{row['nominal'][column]:.6f}" for column in RESULT_COLUMNS]
+                            + [int(row['covered'][column]) for column in RESULT_COLUMNS] + [row['error'] or ''])
@@ -0,0 +1,312 @@
+import os
+import glob
+import time
+import queue
+import signal
+import fnmatch
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from funcevalprofile import funcloadfile, funcevalprofile, funcresultrow
+from funcbatch import RESULT_COLUMNS
+
+# Einstellungen je Arbeitsprozess (einmal beim Start übergeben)
+_SETTINGS = None
+
+# Barriere für den Start aller Arbeitsprozesse (einmal beim Start übergeben)
+_BARRIER = None
+
+
+class WatchStats:
+    """
+    Kennwerte des Überwachungsmodus: Latenz je Datei (Erkennung bis Ergebnis) und Warteschlangenlänge.
+
+    Parameters:
+        window (int): Anzahl der letzten Dateien für die Perzentile der Latenz.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.latencies = []
+        self.count = 0
+        self.errors = 0
+        self.current_depth = 0
+        self.max_depth = 0
+
+    def record(self, latency, error):
+        """Erfasst die Latenz einer Datei in Sekunden."""
+        self.count += 1
+        self.errors += error is not None
+        self.latencies.append(latency)
+        if len(self.latencies) > self.window:
+            del self.latencies[0]
+
+    def depth(self, depth):
+        """Erfasst die aktuelle Anzahl gefundener, geladener und laufender Dateien."""
+        self.current_depth = depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def summary(self):
+        """
+        Zusammenfassung.
+
+        Returns:
+            dict: 'count', 'errors', 'current_depth', 'max_depth' und Perzentile 'p50', 'p90', 'p99', 'max' der Latenz in s.
+        """
+        result = {'count': self.count, 'errors': self.errors, 'current_depth': self.current_depth,
+                  'max_depth': self.max_depth}
+        if self.latencies:
+            p50, p90, p99 = np.percentile(self.latencies, [50, 90, 99])
+            result.update(p50=p50, p90=p90, p99=p99, max=max(self.latencies))
+        return result
+
+
+def funcpollfolder(folder, pattern, seen, paths=None):
+    """
+    Sucht neue oder geänderte Dateien, deren Größe und Änderungszeit sich seit der letzten Suche nicht geändert haben.
+
+    Eine Datei gilt erst als fertig geschrieben, wenn sie bei zwei aufeinanderfolgenden Suchen
+    unverändert ist. seen enthält je Pfad den zuletzt gesehenen Zustand und ob er ausgewertet wurde.
+    Ohne paths wird der gesamte Ordner durchsucht und Einträge nicht mehr vorhandener Dateien werden
+    aus seen entfernt. Mit paths (z.B. aus Ereignissen von watchdog) werden nur diese Pfade geprüft,
+    sodass der Aufwand nicht mit der Anzahl der Dateien im Ordner wächst.
+
+    Parameters:
+    folder (str): Überwachter Ordner.
+    pattern (str): Dateimuster.
+    seen (dict): Zustand je Pfad: (Änderungszeit, Größe, ausgewertet), wird aktualisiert.
+    paths (iterable of str): Optional, zu prüfende Pfade; Pfade außerhalb von folder oder ohne
+                             passendes Muster werden ignoriert.
+
+    Returns:
+    list of str: Pfade der fertigen, noch nicht ausgewerteten Dateien (nach Änderungszeit sortiert).
+    """
+    if paths is None:
+        candidates = glob.glob(os.path.join(folder, pattern))
+        for path in set(seen).difference(candidates):
+            del seen[path]
+    else:
+        candidates = [os.path.join(folder, os.path.basename(path)) for path in set(paths)
+                      if os.path.dirname(os.path.abspath(path)) == os.path.abspath(folder)
+                      and fnmatch.fnmatch(os.path.basename(path), pattern)]
+
+    ready = []
+    for path in candidates:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            seen.pop(path, None)  # Datei entfernt
+            continue
+        state = (stat.st_mtime_ns, stat.st_size)
+        previous = seen.get(path)
+        if previous is None or previous[:2] != state:
+            seen[path] = state + (False,)
+        elif not previous[2]:
+            seen[path] = state + (True,)
+            ready.append((stat.st_mtime_ns, path))
+    return [path for _, path in sorted(ready)]
+
+
+def _startobserver(folder, wakeup, changed, lock):
+    """
+    Startet einen watchdog-Observer, der geänderte Pfade in changed sammelt und wakeup setzt (None ohne watchdog).
+    """
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        return None
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            with lock:
+                changed.add(os.fsdecode(event.src_path))
+                if getattr(event, 'dest_path', None):
+                    changed.add(os.fsdecode(event.dest_path))
+            wakeup.set()
+
+    observer = Observer()
+    observer.schedule(Handler(), folder, recursive=False)
+    observer.start()
+    return observer
+
+
+def _initworker(settings, barrier=None):
+    """Übernimmt die Einstellungen einmal je Arbeitsprozess; Strg+C beendet nur den Hauptprozess."""
+    global _SETTINGS, _BARRIER
+    _SETTINGS = settings
+    _BARRIER = barrier
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _warmupworker(timeout):
+    """
+    Wartet, bis alle Arbeitsprozesse diese Aufgabe erreicht haben.
+
+    Da jede Aufgabe ihren Prozess bis zum Erreichen der Barriere blockiert, muss der Prozesspool
+    für jede Aufgabe einen eigenen Prozess starten.
+    """
+    try:
+        _BARRIER.wait(timeout)
+    except threading.BrokenBarrierError:
+        pass  # Start nicht vollständig, die Auswertung funktioniert trotzdem
+
+
+def _evalworker(filepath, profile):
+    """Auswertung eines geladenen Profils im Arbeitsprozess."""
+    try:
+        return funcresultrow(funcevalprofile(profile, _SETTINGS)), None
+    except Exception as error:
+        return np.full(len(RESULT_COLUMNS), np.nan), f'{type(error).__name__}: {error}'
+
+
+def funcwatchfolder(folder, settings, callback, pattern='*.asc', workers=None, interval=0.2, maxqueue=16,
+                    stop=None, stats=None, rescan=60.0):
+    """
+    Überwacht einen Ordner und wertet neue Dateien aus, sobald sie fertig geschrieben sind.
+
+    Ablauf: Ein Thread sucht neue Dateien (mit watchdog ereignisgesteuert nur unter den geänderten
+    Pfaden und alle rescan Sekunden im gesamten Ordner, sonst alle interval Sekunden im gesamten Ordner),
+    ein Lese-Thread lädt sie in eine begrenzte Warteschlange (maxqueue) und die Auswertung erfolgt in
+    dauerhaft laufenden Arbeitsprozessen, sodass Module nur einmal importiert werden. Laden und
+    Auswertung überlappen sich. Jedes Ergebnis wird sofort über callback ausgegeben.
+
+    Parameters:
+    folder (str): Überwachter Ordner.
+    settings (dict): Einstellungen aus loadsettings.
+    callback (callable): Wird je Datei mit (filepath, row, error, latency) aufgerufen; row enthält die
+                         Werte aus RESULT_COLUMNS, latency die Zeit von der Erkennung bis zum Ergebnis in s.
+    pattern (str): Dateimuster.
+    workers (int): Anzahl der Arbeitsprozesse (None: Anzahl der CPU-Kerne).
+    interval (float): Abstand der Suchen in s (mit watchdog nur als Rückfallebene).
+    maxqueue (int): Größte Anzahl geladener, noch nicht ausgewerteter Dateien.
+    stop (threading.Event): Optional, beendet die Überwachung, wenn gesetzt.
+    stats (WatchStats): Optional, erfasst Latenz und Warteschlangenlänge.
+    rescan (float): Abstand vollständiger Suchen in s mit watchdog (falls Ereignisse verloren gehen).
+
+    Returns:
+    WatchStats: Kennwerte der Überwachung.
+    """
+    stop = stop or threading.Event()
+    stats = stats or WatchStats()
+    workers = workers or os.cpu_count() or 1
+    found = queue.Queue()
+    loaded = queue.Queue(maxsize=maxqueue)
+    in_flight = threading.Semaphore(workers * 2)
+    wakeup = threading.Event()
+    changed = set()
+    changed_lock = threading.Lock()
+    observer = _startobserver(folder, wakeup, changed, changed_lock)
+
+    def watch():
+        # Suche neuer Dateien; Dateien im Ordner beim Start werden ebenfalls ausgewertet
+        seen = {}
+        waiting = set()  # Dateien, deren Größe beim nächsten Vergleich noch geprüft werden muss
+        last_scan = None
+        while not stop.is_set():
+            now = time.perf_counter()
+            if observer is None or last_scan is None or now - last_scan >= rescan:
+                with changed_lock:
+                    changed.clear()
+                ready = funcpollfolder(folder, pattern, seen)
+                last_scan = now
+                waiting = {path for path, state in seen.items() if not state[2]}
+            else:
+                with changed_lock:
+                    paths = waiting | changed
+                    changed.clear()
+                ready = funcpollfolder(folder, pattern, seen, paths)
+                waiting = {path for path in paths if path in seen and not seen[path][2]}
+            for path in ready:
+                found.put((path, time.perf_counter()))
+            wakeup.wait(interval)
+            wakeup.clear()
+            if observer is not None:
+                # Kurz warten, damit die Größe beim nächsten Vergleich stabil ist
+                stop.wait(min(interval, 0.05))
+        found.put(None)
+
+    def load():
+        # Dateien laden, während die Arbeitsprozesse auswerten
+        while True:
+            item = found.get()
+            if item is None:
+                loaded.put(None)
+                return
+            path, detected = item
+            try:
+                profile, error = funcloadfile(path, settings)[0], None
+            except Exception as exception:
+                profile, error = None, f'{type(exception).__name__}: {exception}'
+            loaded.put((path, detected, profile, error))
+
+    threads = [threading.Thread(target=watch, daemon=True), threading.Thread(target=load, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    results = queue.Queue()
+    pending = 0
+
+    def done(future, path, detected):
+        try:
+            results.put((path, detected) + future.result())
+        except Exception as error:
+            results.put((path, detected, np.full(len(RESULT_COLUMNS), np.nan), f'{type(error).__name__}: {error}'))
+
+    def emit(item):
+        path, detected, row, error = item
+        in_flight.release()
+        latency = time.perf_counter() - detected
+        stats.record(latency, error)
+        callback(path, row, error, latency)
+
+    try:
+        barrier = multiprocessing.Barrier(workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initworker,
+                                 initargs=(settings, barrier)) as executor:
+            # Alle Prozesse vorab starten, damit die erste Datei nicht auf den Start eines Prozesses wartet
+            list(executor.map(_warmupworker, [30.0] * workers))
+            finished = False
+            while not finished:
+                # Fertige Ergebnisse sofort ausgeben
+                while True:
+                    try:
+                        item = results.get_nowait()
+                    except queue.Empty:
+                        break
+                    pending -= 1
+                    emit(item)
+
+                # Nächste geladene Datei übergeben, höchstens zwei je Arbeitsprozess gleichzeitig
+                if not in_flight.acquire(timeout=0.01):
+                    continue
+                try:
+                    item = loaded.get(timeout=0.01)
+                except queue.Empty:
+                    in_flight.release()
+                    continue
+                if item is None:
+                    in_flight.release()
+                    finished = True
+                    continue
+                path, detected, profile, error = item
+                pending += 1
+                stats.depth(found.qsize() + loaded.qsize() + pending)
+                if error is not None:
+                    results.put((path, detected, np.full(len(RESULT_COLUMNS), np.nan), error))
+                    continue
+                future = executor.submit(_evalworker, path, profile)
+                future.add_done_callback(lambda f, path=path, detected=detected: done(f, path, detected))
+
+            # Laufende Auswertungen abschließen
+            while pending:
+                pending -= 1
+                emit(results.get())
+    finally:
+        stop.set()
+        wakeup.set()
+        if observer is not None:
+            observer.stop()
+            observer.join()
+    return stats
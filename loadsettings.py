@@ -1,12 +1,46 @@
-def loadsettings():
+import json
+
+
+def loadsettings(filepath=None):
     """
     Load settings for data processing and evaluation.
+    Args:
+        filepath (str): Optional JSON file whose entries override the defaults below.
+            Nested dictionaries (e.g. 'IM') are merged key by key.
     Returns:
         dict: Dictionary containing all settings.
     """
     settings = {
         # Plot settings
-        'plotresult': 'on',  # 'on' to enable plotting, 'off' to disable
+        'plotresult': 'on',  # 'on' to enable plotting, 'file' to save plots without display, 'off' to disable
+        'plotformat': 'png',  # File format for 'file': 'png', 'svg' or 'pdf'
+        'plotfolder': 'plots',  # Output folder for 'file'
+        'plotselect': 'all',  # 'all' sections or only 'outliers' (see plotmaxdist, plotdisagree)
+        'plotmaxdist': 0.05,  # Outlier if maxdist of a radius method exceeds this value (in mm)
+        'plotdisagree': 0.2,  # Outlier if the radii of the methods differ by more than this share of their median
+
+        # Data import
+        'loadcache': 'off',  # 'on' to keep a binary copy (.npy/.json) of each ASCII file, 'off' to disable
+        'cachefolder': None,  # Folder for the binary copies (None: next to the ASCII file)
+        'compact': 'off',  # 'on' to hold profiles as float32 (n, 2) arrays and results as slotted records (funccompact.py)
+        'stagecache': 'off',  # 'on' to keep the results of every evaluation stage in 'stagecachefolder'
+        'stagecachefolder': '.stagecache',  # Folder of the stage result cache
+        'stagecachesize': 1000000000,  # Max size of the stage result cache in bytes (least recently used are deleted)
+
+        # Section extraction from 3D point clouds and STL files (funcsections.py)
+        'Sections': {
+            'axis': 2,  # Coordinate index along the weld axis
+            'columns': [0, 1],  # Coordinate indices used as x (across the weld) and y (height) of a section
+            'pitch': 1.0,  # Distance between sections along the weld axis
+            'width': 0.05,  # Thickness of a section along the weld axis
+            'start': None,  # First section position (None: minimum of the data)
+            'stop': None,  # Last section position (None: maximum of the data)
+            'scale': 1.0,  # Factor converting coordinates to mm
+            'flip': False,  # True to reverse the point order of each section
+            'sorted': False,  # True if points are ordered along the weld axis (single read pass)
+            'maxsections': 64,  # Sections collected per read pass if points are not sorted
+            'chunksize': 1000000  # Points read per block
+        },
 
         # Data processing
         'outliermethod': 'none',  # 'remove' or 'none'
@@ -17,23 +51,67 @@ def loadsettings():
         'interpmethod': 'linear',  # Interpolation method
 
         # Data evaluation
+        'Localization': {
+            'mode': 'off',  # 'on' to evaluate only a window around the toe found on a decimated copy of the profile
+            'decimation': 4,  # Every n-th point (after a moving average over n points) is used to find the toe
+            'halfwidth': 4.0  # Half width of the evaluation window in x (mm) around the toe
+        },
+        'Toes': {
+            'threshold': 0.5,  # Curvature peaks above this share of the max curvature are weld toes (--toes, functoes.py)
+            'separation': 1.0,  # Min distance in x (mm) between two weld toes
+            'maxtoes': 2,  # Max number of weld toes per section
+            'halfwidth': 4.0  # Half width of the evaluation window in x (mm) around each toe
+        },
         'CM': {
-            'smoothparam': 1  # Curvature method smooth parameter
+            'smoothparam': 1,  # Curvature method smooth parameter
+            'derivative': 'difference'  # 'difference', 'spline' (smoothing spline, smoothparam 0.8-1) or 'savgol' (smoothparam = odd window >= 5)
         },
         'LSM': {
             'smoothparam': 1,  # Least Squares Method smooth parameter
+            'derivative': 'difference',  # Derivative method, see 'CM'
             'factor': 0.3  # Factor for LSM
         },
         'IM': {
             'smoothparam': 1,  # Iteration Method smooth parameter
+            'derivative': 'difference',  # Derivative method, see 'CM'
             'crit1': 0.01,  # End point criterion (factor of weld toe radius)
             'crit2': 0.02,  # Max distance between profile and circle
-            'crit3': 3  # Data points between starting and end point
+            'crit3': 3,  # Data points between starting and end point
+            'batchsize': 250  # Radii evaluated together per starting point (limits memory)
+        },
+        'Incremental': {
+            'toewindow': 0.5,  # Half width (mm in x) of the toe search window around the previous section
+            'radiusspan': 0.5  # Half width (mm) of the IM radius range around the previous section
+        },
+        'Uncertainty': {
+            'samples': 200,  # Perturbed copies per profile (Monte Carlo, see funcuncertainty.py)
+            'noise': 0.01,  # Standard deviation of the simulated scanner noise in y (share of the point spacing)
+            'jitter': 0.05,  # Standard deviation of the point position along the profile (share of the point spacing)
+            'derivative': 'savgol',  # Derivative method of all evaluators in the simulation (None: keep their settings)
+            'smoothparam': 15,  # Smooth parameter for 'derivative' (savgol: odd window length in points)
+            'IMsamples': 10,  # Copies also evaluated with IM (slow, 0 to skip)
+            'percentiles': [2.5, 50, 97.5],  # Reported percentiles
+            'seed': 0  # Seed of the random number generator
         },
         'Angle': {
             'smoothparam': 1,  # Angle methods smooth parameter
+            'derivative': 'difference',  # Derivative method, see 'CM'
             'smoothlen': 0.2  # Smooth length for angle methods
         }
     }
 
+    if filepath is not None:
+        with open(filepath) as file:
+            _mergesettings(settings, json.load(file))
+
+    return settings
+
+
+def _mergesettings(settings, overrides):
+    """Merge overrides into settings, descending into nested dictionaries."""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(settings.get(key), dict):
+            _mergesettings(settings[key], value)
+        else:
+            settings[key] = value
     return settings
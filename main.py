@@ -1,20 +1,25 @@
 import os
+import sys
+import csv
+import json
+import argparse
 import numpy as np
-import pandas as pd
 from loadsettings import loadsettings
-from funcremoveoutlier import funcremoveoutlier
-from funcfilterprofile import funcfilterprofile
-from funcprofilesorting import funcprofilesorting
-from funcevalCM import funcevalCM
-from funcevalLSM import funcevalLSM
-from funcevalIM import funcevalIM
-from funcevalangle import funcevalangle
+from funcevalprofile import funcloadfile, funcevalprofile, funcresultrow
+from funcbatch import RESULT_COLUMNS, funcexpandpaths, funcbatch, funcwriteresults
+from funcresultstore import ResultStore
+from functoes import funcevaltoesbatch, funcwritetoes
+from funcuncertainty import funcuncertaintybatch, funcwriteuncertainty
 from funcfigresult import funcfigresult
+from funcrenderresults import funcplotselect, funcplotpath, funcrenderresult
+from funcinstrument import Instrument, MemorySink, JsonLinesSink, ProfileSink, NULL_INSTRUMENT
+from funcsweep import funcsweep, funcwritesweep
+from funcwatch import funcwatchfolder, WatchStats
 
 
 def main():
     # Liste der Dateien für die Auswertung
-    folder = os.path.join(r'C:\temp\Python\Weld_Toe_Determination\examples')
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples')
     file_list = [f for f in os.listdir(folder) if f.endswith('.asc')]
 
     # Einstellungen für die Datenverarbeitung laden
@@ -26,31 +31,16 @@ def main():
     for loop_nr, filename in enumerate(file_list):
         # Daten importieren
         filepath = os.path.join(folder, filename)
-        data = np.loadtxt(filepath, skiprows=1)  # Annahme: Daten als ASCII-Datei
-        profile = data[:, :2]
+        profile, header = funcloadfile(filepath, settings)
 
-        # Profil anpassen (cm zu mm und Matrix umdrehen)
-        profile *= 10  # Umrechnung von cm zu mm
-        profile = np.flipud(profile)  # Matrix umdrehen
-
-        # Datenverarbeitung
-        profile = funcremoveoutlier(profile, settings)
-        profile = funcfilterprofile(profile, settings)
-        profile = funcprofilesorting(profile, settings)
-
-        # Radius-Bewertung
-        results_CM = funcevalCM(profile, settings["CM"])
-        results_LSM = funcevalLSM(profile, settings["LSM"])
-        results_IM = funcevalIM(profile, settings["IM"])
-
-        # Winkel-Bewertung
-        angle_MAX = funcevalangle('MAX', profile, settings["Angle"], None)
-        angle_END_LSM = funcevalangle('END', profile, settings["Angle"], results_LSM)
-        angle_END_IM = funcevalangle('END', profile, settings["Angle"], results_IM)
+        # Datenverarbeitung und Auswertung
+        results = funcevalprofile(profile, settings)
+        profile = results['profile']
+        results_CM, results_LSM, results_IM = results['radius']
+        angle_MAX, angle_END_LSM, angle_END_IM = results['angle']
 
         # Ergebnisse speichern
-        allresults[loop_nr, [0, 1, 2]] = [results_CM["radius"], results_LSM["radius"], results_IM["radius"]]
-        allresults[loop_nr, [3, 4, 5]] = [angle_MAX["angle"], angle_END_LSM["angle"], angle_END_IM["angle"]]
+        allresults[loop_nr, :] = funcresultrow(results)
 
          # Ergebnisse im gewünschten Format ausgeben
         print(f"Results for File: {filename}")
@@ -69,6 +59,160 @@ def main():
         if settings.get("plotresult") == 'on':
             funcfigresult(profile, [results_CM, results_LSM, results_IM],
                           [angle_MAX, angle_END_LSM, angle_END_IM])
+        elif settings.get("plotresult") == 'file' and funcplotselect(results['radius'], settings):
+            funcrenderresult(funcplotpath(filepath, settings), profile, results['radius'], results['angle'])
+
+
+def main_batch(argv=None):
+    """
+    Kommandozeilen-Batchmodus: wertet Dateien parallel aus und schreibt die Ergebnistabelle in eine Datei.
+
+    Parameters:
+    argv (list of str): Kommandozeilenargumente (None: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description='Batch evaluation of weld toe radius and angle.')
+    parser.add_argument('paths', nargs='+', help='ASCII files, folders or glob patterns')
+    parser.add_argument('-s', '--settings', help='JSON file overriding entries of loadsettings')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: CPU count)')
+    parser.add_argument('-c', '--chunksize', type=int, default=None, help='files per task sent to a worker')
+    parser.add_argument('-o', '--output', default='results.csv', help='CSV file for the result table')
+    parser.add_argument('--timings', action='store_true', help='print run time per stage')
+    parser.add_argument('--trace', help='JSON lines file receiving one record per file and stage')
+    parser.add_argument('--profile-dir', help='folder for cProfile dumps of the slowest files '
+                                                 '(profiles in-process, implies --workers 1)')
+    parser.add_argument('--profile-slowest', type=int, default=5, help='number of cProfile dumps')
+    parser.add_argument('--sweep', help='JSON file with lists of values per setting (e.g. {"LSM.factor": [0.2, 0.3]}); '
+                                        'writes one row per file and combination')
+    parser.add_argument('--toes', action='store_true', help='evaluate every weld toe of a section (e.g. both sides '
+                        'of a butt weld); writes one row per file and toe (settings under "Toes")')
+    parser.add_argument('--uncertainty', action='store_true', help='estimate percentiles of all results per file from '
+                        'perturbed copies of the profile (settings under "Uncertainty")')
+    parser.add_argument('--store', help='folder of a columnar store receiving all results per file; '
+                        'files already stored there are skipped (resume an interrupted run)')
+    parser.add_argument('--watch', action='store_true', help='watch the folder given as path and evaluate new files '
+                                                            'as they arrive (stop with Ctrl+C)')
+    args = parser.parse_args(argv)
+    if args.profile_dir:
+        # cProfile misst nur den eigenen Prozess, daher ohne Prozesspool auswerten
+        if args.workers not in (None, 1):
+            parser.error('--profile-dir requires --workers 1')
+        args.workers = 1
+
+    settings = loadsettings(args.settings)
+    if args.watch:
+        watch_batch(args.paths[0], settings, args.output, args.workers)
+        return
+    file_list = funcexpandpaths(args.paths)
+
+    if args.sweep:
+        with open(args.sweep) as file:
+            grid = json.load(file)
+        rows = funcsweep(file_list, grid, settings, workers=args.workers, chunksize=args.chunksize)
+        funcwritesweep(args.output, rows, grid)
+        n_errors = sum(row['error'] is not None for row in rows)
+        print(f"Evaluated {len(file_list)} files x {len(rows) // max(len(file_list), 1)} combinations "
+              f"({n_errors} failed), results written to {args.output}")
+        return
+
+    if args.toes:
+        rows = funcevaltoesbatch(file_list, settings, workers=args.workers, chunksize=args.chunksize)
+        funcwritetoes(args.output, rows)
+        n_errors = sum(row['error'] is not None for row in rows)
+        print(f"Evaluated {len(file_list)} files, {sum(row['toe'] >= 0 for row in rows)} weld toes "
+              f"({n_errors} failed), results written to {args.output}")
+        return
+
+    if args.uncertainty:
+        rows = funcuncertaintybatch(file_list, settings, workers=args.workers, chunksize=args.chunksize)
+        funcwriteuncertainty(args.output, rows, settings['Uncertainty']['percentiles'])
+        n_errors = sum(row['error'] is not None for row in rows)
+        print(f"Evaluated {len(file_list)} files x {settings['Uncertainty']['samples']} perturbed copies "
+              f"({n_errors} failed), results written to {args.output}")
+        uncovered = [(os.path.basename(row['file']), column) for row in rows if row['error'] is None
+                     for column in RESULT_COLUMNS if row['valid'][column] and not row['covered'][column]]
+        if uncovered:
+            print(f"Warning: {len(uncovered)} results of the unperturbed profile lie outside their interval "
+                  f"(biased by the simulated noise, see *_covered): "
+                  + ', '.join(f'{name} {column}' for name, column in uncovered[:10])
+                  + (' ...' if len(uncovered) > 10 else ''))
+        return
+
+    # Optionale Messung der Stufen
+    sinks = []
+    if args.timings:
+        sinks.append(MemorySink())
+    if args.trace:
+        sinks.append(JsonLinesSink(args.trace))
+    if args.profile_dir:
+        sinks.append(ProfileSink(args.profile_dir, args.profile_slowest))
+    instrument = Instrument(sinks) if sinks else NULL_INSTRUMENT
+
+    store = ResultStore(args.store) if args.store else None
+    allresults, errors, plot_errors = funcbatch(file_list, settings, workers=args.workers, chunksize=args.chunksize,
+                                                instrument=instrument, store=store)
+    instrument.close()
+    plotting = settings.get('plotresult') == 'file'
+    funcwriteresults(args.output, file_list, allresults, errors, plot_errors if plotting else None)
+
+    n_errors = sum(error is not None for error in errors)
+    print(f"Evaluated {len(file_list)} files ({n_errors} failed), results written to {args.output}")
+    if plotting and any(plot_errors):
+        print(f"{sum(error is not None for error in plot_errors)} plots failed (see column plot_error)")
+
+    if args.timings:
+        print(f"{'stage':12s} {'count':>6s} {'total [s]':>10s} {'mean [ms]':>10s} {'max [ms]':>10s}")
+        for name, stage in sinks[0].summary().items():
+            print(f"{name:12s} {stage['count']:6d} {stage['time']:10.3f} "
+                  f"{stage['mean_time'] * 1e3:10.2f} {stage['max_time'] * 1e3:10.2f}")
+
+
+def watch_batch(folder, settings, outputpath, workers=None):
+    """
+    Überwachungsmodus: wertet neue Dateien im Ordner laufend aus und hängt jedes Ergebnis sofort an die CSV-Datei an.
+
+    Parameters:
+    folder (str): Überwachter Ordner.
+    settings (dict): Einstellungen aus loadsettings.
+    outputpath (str): CSV-Datei für die Ergebnisse (wird fortgeschrieben).
+    workers (int): Anzahl der Arbeitsprozesse.
+    """
+    stats = WatchStats()
+    new_file = not os.path.exists(outputpath)
+    with open(outputpath, 'a', newline='') as file:
+        writer = csv.writer(file)
+        if new_file:
+            writer.writerow(['file'] + RESULT_COLUMNS + ['error', 'latency'])
+
+        def emit(filepath, row, error, latency):
+            writer.writerow([filepath] + [f'{value:.6f}' for value in row] + [error or '', f'{latency:.3f}'])
+            file.flush()
+            print(f"{os.path.basename(filepath)}: radius CM/LSM/IM = {row[0]:.3f}/{row[1]:.3f}/{row[2]:.3f} mm, "
+                  f"angle MAX/END = {row[3]:.2f}/{row[4]:.2f}/{row[5]:.2f} deg, {latency * 1e3:.0f} ms"
+                  + (f", {error}" if error else ''))
+            if stats.count % 50 == 0:
+                print_watchstats(stats)
+
+        print(f"Watching {folder} (Ctrl+C to stop)")
+        try:
+            funcwatchfolder(folder, settings, emit, workers=workers, stats=stats)
+        except KeyboardInterrupt:
+            pass
+    print_watchstats(stats)
+
+
+def print_watchstats(stats):
+    """Gibt Anzahl, Warteschlangenlänge und Latenz-Perzentile des Überwachungsmodus aus."""
+    summary = stats.summary()
+    line = (f"{summary['count']} files ({summary['errors']} failed), queue depth {summary['current_depth']} "
+            f"(max {summary['max_depth']})")
+    if 'p50' in summary:
+        line += (f", latency p50/p90/p99/max = {summary['p50'] * 1e3:.0f}/{summary['p90'] * 1e3:.0f}/"
+                 f"{summary['p99'] * 1e3:.0f}/{summary['max'] * 1e3:.0f} ms")
+    print(line)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        main_batch()
+    else:
+        main()